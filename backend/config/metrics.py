@@ -0,0 +1,336 @@
+"""
+경량 in-process metrics registry (counter / histogram)
+
+- 각 모듈에서 metric을 정의해서 사용 (counter 이름은 _total로 끝나도록)
+    INFERENCE_SECONDS = metrics.histogram("vision_inference_seconds", "...", labelnames=("backend",))
+    with INFERENCE_SECONDS.time(backend="torch"): ...
+- GET /metrics/ : Prometheus text exposition 형식으로 출력
+
+/metrics/ 접근 제한 (아래 중 하나를 만족해야 함, 아무것도 설정하지 않으면 staff 로그인만 허용)
+- settings.METRICS_TOKEN: 요청 헤더 Authorization: Bearer <token> 이 일치 (Prometheus scrape 설정의 authorization)
+- settings.METRICS_ALLOWED_IPS: REMOTE_ADDR가 목록에 포함 (reverse proxy 뒤라면 proxy 주소가 보이므로 token 사용)
+- Django admin staff 로그인 세션
+
+Gunicorn 멀티 worker (multiprocess mode)
+- settings.METRICS_MULTIPROC_DIR (또는 환경변수 METRICS_MULTIPROC_DIR) 지정 시
+  각 프로세스가 자기 값을 {dir}/metrics_{pid}.json 으로 주기적으로 저장 (METRICS_FLUSH_INTERVAL초, 기본 1초)
+- /metrics/ 를 받은 worker가 디렉터리의 모든 파일을 합산해서 출력 (counter/histogram 모두 합)
+- 종료된 worker의 파일도 누적값으로 계속 합산됨 -> 배포 시 디렉터리를 비우고 시작
+- 디렉터리를 지정하지 않으면 요청을 받은 프로세스의 값만 출력
+"""
+from __future__ import annotations
+
+import atexit
+import hmac
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, registry: "Registry", name: str, help: str, labelnames: Sequence[str] = ()):
+        self._registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: labels must be {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _describe(self) -> Dict[str, Any]:
+        return {"type": self.type, "help": self.help, "labelnames": list(self.labelnames)}
+
+    def _reset(self) -> None:
+        self._values = {}
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._registry._lock:
+            self._registry._check_fork()
+            self._values[key] = self._values.get(key, 0.0) + amount
+        self._registry._changed()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            **self._describe(),
+            "values": {json.dumps(k): v for k, v in self._values.items()},
+        }
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, registry, name, help, labelnames=(), buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        # bucket별 개수 (마지막 칸 = +Inf), 출력할 때 누적으로 변환
+        index = bisect_left(self.buckets, value)
+        with self._registry._lock:
+            self._registry._check_fork()
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            state["counts"][index] += 1
+            state["sum"] += value
+            state["count"] += 1
+        self._registry._changed()
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels):
+        """
+        함수 실행 시간 decorator
+        """
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            **self._describe(),
+            "buckets": list(self.buckets),
+            "values": {
+                json.dumps(k): {"counts": list(v["counts"]), "sum": v["sum"], "count": v["count"]}
+                for k, v in self._values.items()
+            },
+        }
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+        self._last_flush = 0.0
+
+    def _register(self, cls, name: str, help: str, **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(self, name, help, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} is already registered as {metric.type}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help, labelnames=labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, help, labelnames=labelnames, buckets=buckets)
+
+    def _check_fork(self) -> None:
+        # gunicorn --preload 등으로 fork된 worker는 부모의 값을 물려받으므로 초기화 (부모 파일과 중복 합산 방지)
+        pid = os.getpid()
+        if pid != self._pid:
+            for metric in self._metrics.values():
+                metric._reset()
+            self._pid = pid
+            self._last_flush = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._check_fork()
+            return {name: metric._snapshot() for name, metric in self._metrics.items()}
+
+    # ====================================
+    # multiprocess mode
+    # ====================================
+    def _multiproc_dir(self) -> Optional[Path]:
+        raw = getattr(settings, "METRICS_MULTIPROC_DIR", None) or os.environ.get("METRICS_MULTIPROC_DIR")
+        return Path(raw) if raw else None
+
+    def _changed(self) -> None:
+        directory = self._multiproc_dir()
+        if directory is None:
+            return
+        interval = float(getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0))
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        현재 프로세스 값을 {dir}/metrics_{pid}.json 으로 저장 (임시파일 -> rename으로 원자적 교체)
+        """
+        directory = self._multiproc_dir()
+        if directory is None:
+            return
+        self._last_flush = time.monotonic()
+        data = json.dumps(self.snapshot())
+
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"metrics_{os.getpid()}.json"
+            tmp = path.with_suffix(f".json.tmp{threading.get_ident()}")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        현재 프로세스 값 + (multiprocess mode면) 다른 프로세스 파일들을 합산
+        """
+        merged = self.snapshot()
+        directory = self._multiproc_dir()
+        if directory is None or not directory.is_dir():
+            return merged
+
+        self.flush()
+        own = f"metrics_{os.getpid()}.json"
+        for path in directory.glob("metrics_*.json"):
+            if path.name == own:
+                continue
+            try:
+                other = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            _merge(merged, other)
+        return merged
+
+    def render(self) -> str:
+        return render_text(self.collect())
+
+
+def _merge(into: Dict[str, Any], other: Dict[str, Any]) -> None:
+    for name, metric in other.items():
+        target = into.get(name)
+        if target is None:
+            into[name] = metric
+            continue
+        if target["type"] != metric["type"]:
+            continue
+
+        for key, value in metric["values"].items():
+            if target["type"] == "counter":
+                target["values"][key] = target["values"].get(key, 0.0) + value
+                continue
+            if target.get("buckets") != metric.get("buckets"):
+                continue
+            state = target["values"].get(key)
+            if state is None:
+                target["values"][key] = value
+                continue
+            state["counts"] = [a + b for a, b in zip(state["counts"], value["counts"])]
+            state["sum"] += value["sum"]
+            state["count"] += value["count"]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labelnames: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(labelnames, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_text(data: Dict[str, Any]) -> str:
+    """
+    Prometheus text exposition format (0.0.4)
+    """
+    lines = []
+    for name in sorted(data):
+        metric = data[name]
+        labelnames = metric["labelnames"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+
+        for key in sorted(metric["values"]):
+            values = json.loads(key)
+            value = metric["values"][key]
+
+            if metric["type"] == "counter":
+                lines.append(f"{name}{_labels(labelnames, values)} {_fmt(value)}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip(list(metric["buckets"]) + ["+Inf"], value["counts"]):
+                cumulative += count
+                le = bound if bound == "+Inf" else _fmt(bound)
+                lines.append(f"{name}_bucket{_labels(labelnames, values, ('le', le))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labelnames, values)} {_fmt(value['sum'])}")
+            lines.append(f"{name}_count{_labels(labelnames, values)} {value['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+counter = REGISTRY.counter
+histogram = REGISTRY.histogram
+
+# 종료 직전 값 저장 (multiprocess mode)
+atexit.register(REGISTRY.flush)
+
+
+def _is_allowed(request) -> bool:
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token:
+        auth = request.META.get("HTTP_AUTHORIZATION", "")
+        if auth.startswith("Bearer ") and hmac.compare_digest(auth[len("Bearer "):].encode(), str(token).encode()):
+            return True
+
+    if request.META.get("REMOTE_ADDR") in set(getattr(settings, "METRICS_ALLOWED_IPS", ())):
+        return True
+
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+def metrics_view(request):
+    """
+    GET /metrics/ (METRICS_TOKEN / METRICS_ALLOWED_IPS / staff 세션 중 하나 필요)
+    """
+    if not _is_allowed(request):
+        return HttpResponseForbidden("metrics access denied", content_type=CONTENT_TYPE)
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
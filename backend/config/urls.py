@@ -23,6 +23,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from config.metrics import metrics_view
+
 # Swagger / Redoc
 schema_view = get_schema_view(
     openapi.Info(
@@ -43,6 +45,7 @@ urlpatterns = [
     path("api/policy/", include("policy.urls")),    # GET
     path("api/vision/", include("vision.urls")),           # POST
     path("api/estimates/", include("estimates.urls")),        # POST
+    path("metrics/", metrics_view, name="metrics"),           # GET (counter/histogram)
 ]
 
 # Django는 기본적으로 media/ 파일을 서빙하지 않음
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import os
+import time
 import requests
 from dataclasses import dataclass
+from functools import wraps
 from typing import Optional
+
+from config import metrics
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -18,6 +22,37 @@ class DistanceError(Exception):
     pass
 
 
+DISTANCE_API_SECONDS = metrics.histogram(
+    "estimate_distance_api_seconds",
+    "Kakao 거리 API 호출 소요 시간",
+    labelnames=("api",),
+)
+DISTANCE_API_FAILURES = metrics.counter(
+    "estimate_distance_api_failures_total",
+    "Kakao 거리 API 호출 실패 수 (네트워크/HTTP 오류, 응답 형식 오류)",
+    labelnames=("api",),
+)
+
+
+def _observe_api(api: str):
+    """
+    API 호출 함수의 소요 시간/실패 수 집계
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                DISTANCE_API_FAILURES.inc(api=api)
+                raise
+            finally:
+                DISTANCE_API_SECONDS.observe(time.perf_counter() - start, api=api)
+        return wrapper
+    return decorator
+
+
 def _get_kakao_rest_key() -> str:
     key = os.getenv("KAKAO_REST_API_KEY")
     if not key:
@@ -25,6 +60,7 @@ def _get_kakao_rest_key() -> str:
     return key
 
 
+@_observe_api("geocode")
 def geocode_address(address: str) -> Optional[KakaoCoord]:
     """
     도로명/지번 주소 -> 좌표(x,y)로 변환
@@ -49,6 +85,7 @@ def geocode_address(address: str) -> Optional[KakaoCoord]:
     return KakaoCoord(x=x, y=y)
 
 
+@_observe_api("directions")
 def directions_distance_m(origin: KakaoCoord, dest: KakaoCoord, priority: str = "DISTANCE") -> int:
     """
     출발/도착 좌표 -> 자동차 길찾기 거리(m)
@@ -3,6 +3,8 @@ from __future__ import annotations
 from typing import Optional, Dict
 from django.db import transaction
 
+from config import metrics
+
 from estimates.models import EstimatePrice, EstimatePriceSection, EstimatePriceLine
 from policy.models import BasePrice
 
@@ -17,6 +19,12 @@ class PricingError(Exception):
   """견적 요금 산출 중 정책 누락/데이터 오류 등으로 실패할 때 사용."""
 
 
+PRICING_SECONDS = metrics.histogram(
+  "estimate_pricing_seconds",
+  "build_pricing(견적 요금 산출) 소요 시간",
+)
+
+
 def _pick_main_truck_type(ctx: EstimateContext) -> Optional[str]:
   """
   트럭 선정 시 큰 트럭 기준으로 먼저 사용
@@ -72,6 +80,7 @@ def _truck_type_label(truck_type: str) -> str:
 
 
 
+@PRICING_SECONDS.timed()
 @transaction.atomic
 def build_pricing(ctx: EstimateContext) -> Dict[str, int]:
   """
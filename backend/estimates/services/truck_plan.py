@@ -7,9 +7,14 @@ from typing import List, Tuple, Dict, Any, Optional
 
 from django.db import transaction
 
+from config import metrics
 from estimates.models import Estimate, EstimateTruckPlan, EstimateItem
 from policy.models import TruckSpec, BoxRule, Furniture
 
+TRUCK_PLAN_SECONDS = metrics.histogram(
+    "estimate_truck_plan_seconds",
+    "build_truck_plan(트럭 적재 계산) 소요 시간",
+)
 
 Q2 = Decimal("0.01")
 Q1 = Decimal("0.1")
@@ -261,6 +266,7 @@ def can_pack_combo(items: List[VirtualItem], specs: List[TruckSpec]) -> bool:
 # ------------------------------
 # Main: build_truck_plan
 # ------------------------------
+@TRUCK_PLAN_SECONDS.timed()
 @transaction.atomic
 def build_truck_plan(
     *,
@@ -5,3 +5,7 @@ class PolicyConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "policy"
     verbose_name = "요금 정책 관리"
+
+    def ready(self):
+        # Furniture 변경 시 정책 버전 증가 (다른 worker의 가구 매핑 캐시 무효화)
+        from . import signals  # noqa: F401
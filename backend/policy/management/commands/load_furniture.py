@@ -7,6 +7,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 
 from policy.models import Furniture
+from policy.versioning import FURNITURE, suppress_version_bumps
 
 
 def _normalize_str(v):
@@ -91,6 +92,11 @@ class Command(BaseCommand):
 
   @transaction.atomic
   def handle(self, *args, **options):
+    # row마다 발생하는 signal 대신 로드가 끝나고(commit 후) 가구 정책 버전을 1번만 올림
+    with suppress_version_bumps(FURNITURE):
+      self._load(options)
+
+  def _load(self, options):
     strict_dimensions = options["strict_dimensions"]
 
     # policy/management/commands/ -> policy/
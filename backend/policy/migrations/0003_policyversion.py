@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("policy", "0002_rename_policy_base_move_ty_457da7_idx_policy_base_move_ty_d01244_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PolicyVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=32, unique=True)),
+                ("version", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "정책 버전",
+                "verbose_name_plural": "10. 정책 버전",
+                "db_table": "policy_version",
+            },
+        ),
+    ]
@@ -345,4 +345,22 @@ class SpecialItemFee(models.Model):
     ]
 
   def __str__(self):
-    return f"{self.furniture.name_en}({self.description}) - {self.unit_amount}원"
\ No newline at end of file
+    return f"{self.furniture.name_en}({self.description}) - {self.unit_amount}원"
+
+
+class PolicyVersion(models.Model):
+  """
+  정책 데이터 버전 (key별 카운터)
+  데이터가 바뀔 때마다 version이 증가 -> 각 worker 프로세스가 자기 캐시를 다시 만들지 판단 (policy/versioning.py)
+  """
+  key = models.CharField(max_length=32, unique=True)
+  version = models.PositiveBigIntegerField(default=0)
+  updated_at = models.DateTimeField(auto_now=True)
+
+  class Meta:
+    db_table = "policy_version"
+    verbose_name = "정책 버전"
+    verbose_name_plural = "10. 정책 버전"
+
+  def __str__(self):
+    return f"{self.key} v{self.version}"
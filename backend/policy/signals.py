@@ -0,0 +1,13 @@
+# policy/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Furniture
+from .versioning import FURNITURE, schedule_bump
+
+
+# Furniture 변경(관리자 수정/삭제, 로더 커맨드 등) -> 가구 매핑 캐시 버전 증가
+@receiver(post_save, sender=Furniture, dispatch_uid="policy_furniture_saved")
+@receiver(post_delete, sender=Furniture, dispatch_uid="policy_furniture_deleted")
+def bump_furniture_version(sender, **kwargs):
+  schedule_bump(FURNITURE)
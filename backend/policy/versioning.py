@@ -0,0 +1,100 @@
+# policy/versioning.py
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Set
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import PolicyVersion
+
+
+# 정책 데이터 버전 카운터
+# - 데이터 변경(post_save/post_delete signal, CSV 로더 커맨드) -> commit 후 version + 1
+# - 각 worker는 요청마다 get_version()으로 확인해서 바뀐 경우에만 프로세스 캐시 재생성
+#   (vision.services.yolo_to_furniture.ensure_furniture_cache_fresh)
+# - get_version()은 Django cache 우선 (POLICY_VERSION_CACHE_TIMEOUT초, 기본 5초), 없을 때만 DB 조회
+#   공유 cache backend면 bump 즉시 반영, 프로세스별 LocMem cache면 최대 timeout만큼 늦게 반영
+
+FURNITURE = "furniture"
+
+CACHE_PREFIX = "policy:version:"
+
+_local = threading.local()
+
+
+def _cache_key(key: str) -> str:
+  return CACHE_PREFIX + key
+
+
+def _get_timeout() -> int:
+  return int(getattr(settings, "POLICY_VERSION_CACHE_TIMEOUT", 5))
+
+
+def get_version(key: str) -> int:
+  """
+  현재 버전 (row가 없으면 0)
+  """
+  cache_key = _cache_key(key)
+  version = cache.get(cache_key)
+  if version is not None:
+    return version
+
+  version = PolicyVersion.objects.filter(key=key).values_list("version", flat=True).first() or 0
+  cache.set(cache_key, version, timeout=_get_timeout())
+  return version
+
+
+def bump_version(key: str) -> None:
+  """
+  버전 + 1 (즉시 실행, 보통은 schedule_bump 사용)
+  """
+  updated = PolicyVersion.objects.filter(key=key).update(version=F("version") + 1)
+  if not updated:
+    try:
+      with transaction.atomic():
+        PolicyVersion.objects.create(key=key, version=1)
+    except IntegrityError:
+      # 동시에 다른 프로세스가 먼저 생성
+      PolicyVersion.objects.filter(key=key).update(version=F("version") + 1)
+  cache.delete(_cache_key(key))
+
+
+def _suppressed() -> Set[str]:
+  keys = getattr(_local, "suppressed", None)
+  if keys is None:
+    keys = _local.suppressed = set()
+  return keys
+
+
+def schedule_bump(key: str) -> None:
+  """
+  현재 트랜잭션 commit 후 버전 + 1 (commit 전 데이터로 다른 worker가 캐시를 다시 만들지 않도록)
+  suppress_version_bumps 안에서는 무시 (블록이 끝날 때 1번만 올림)
+  """
+  if key in _suppressed():
+    return
+  transaction.on_commit(lambda: bump_version(key))
+
+
+@contextmanager
+def suppress_version_bumps(key: str) -> Iterator[None]:
+  """
+  CSV 로드처럼 row마다 signal이 발생하는 작업을 감싸서 버전은 마지막에 1번만 올림
+  """
+  suppressed = _suppressed()
+  if key in suppressed:
+    # 중첩된 경우 바깥 블록이 올림
+    yield
+    return
+
+  suppressed.add(key)
+  try:
+    yield
+  finally:
+    suppressed.discard(key)
+    schedule_bump(key)
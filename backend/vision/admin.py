@@ -1,14 +1,49 @@
 from django.contrib import admin
-from .models import VisionImage, VisionDetection
+from django.db.models import Count, Q
+from django.utils.html import format_html, format_html_join
+
+from .models import VisionImage, VisionDetection, VisionDetectionCache, VisionUploadJob
+from .services.detection_storage import get_image_detections, packed_count
 
 
 @admin.register(VisionImage)
 class VisionImageAdmin(admin.ModelAdmin):
-  list_display = ("id", "room_type", "image_file_name", "sort_order", "created_at")
+  list_display = ("id", "room_type", "image_file_name", "detections_count", "sort_order", "created_at")
   list_filter = ("room_type",)
-  search_fields = ("image_file_name", "image_url")
+  search_fields = ("image_file_name", "image_url", "content_sha256")
+  readonly_fields = ("detections_preview",)
   ordering = ("sort_order", "-id")
 
+  def get_queryset(self, request):
+    # 목록의 탐지 수: rows는 annotate 1번, packed는 header만 읽음 (이미지별 추가 쿼리 없음)
+    return super().get_queryset(request).annotate(
+      _detection_rows=Count("detections", filter=Q(detections__furniture__isnull=False)),
+    )
+
+  @admin.display(description="탐지 수")
+  def detections_count(self, obj):
+    if obj.detections_packed is not None:
+      return packed_count(obj.detections_packed)
+    return obj._detection_rows
+
+  @admin.display(description="탐지 결과")
+  def detections_preview(self, obj):
+    # 저장 방식(rows/packed)과 관계없이 API 응답과 같은 dict
+    detections = get_image_detections(obj) if obj.pk else []
+    if not detections:
+      return "-"
+    return format_html(
+      "<table><tr><th>detection_id</th><th>가구</th><th>confidence</th><th>bbox</th></tr>{}</table>",
+      format_html_join(
+        "",
+        "<tr><td>{}</td><td>{} ({})</td><td>{}</td><td>{}</td></tr>",
+        (
+          (d["detection_id"], d["name_kr"], d["name_en"], d["confidence"], d["bbox"])
+          for d in detections
+        ),
+      ),
+    )
+
 
 @admin.register(VisionDetection)
 class VisionDetectionAdmin(admin.ModelAdmin):
@@ -18,3 +53,22 @@ class VisionDetectionAdmin(admin.ModelAdmin):
   autocomplete_fields = ("vision_image", "furniture")
   raw_id_fields = ("vision_image", "furniture")
   ordering = ("-id",)
+
+
+
+@admin.register(VisionDetectionCache)
+class VisionDetectionCacheAdmin(admin.ModelAdmin):
+  list_display = ("id", "content_sha256", "model_version", "img_size", "conf", "hit_count", "created_at", "last_hit_at")
+  list_filter = ("model_version", "img_size")
+  search_fields = ("content_sha256", "cache_key")
+  readonly_fields = ("cache_key", "content_sha256", "model_version", "img_size", "conf", "detections", "created_at")
+  ordering = ("-id",)
+
+
+@admin.register(VisionUploadJob)
+class VisionUploadJobAdmin(admin.ModelAdmin):
+  list_display = ("id", "job_id", "status", "rooms_done", "rooms_total", "created_at", "finished_at")
+  list_filter = ("status",)
+  search_fields = ("job_id",)
+  readonly_fields = ("job_id", "rooms", "result", "error", "created_at", "updated_at", "finished_at")
+  ordering = ("-id",)
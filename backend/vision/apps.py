@@ -1,7 +1,62 @@
+import os
+import sys
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
+
+
+def _should_warmup() -> bool:
+    """
+    웹 서버 프로세스에서만 warm-up
+    - manage.py migrate 등 일반 커맨드에서는 모델 로딩하지 않음
+    - runserver는 autoreload 자식 프로세스(RUN_MAIN=true)에서만
+    """
+    if not getattr(settings, "VISION_WARMUP", False):
+        return False
+
+    if str(getattr(settings, "VISION_INFERENCE_MODE", "local")).lower() == "server":
+        # 모델은 추론 서버 프로세스가 로딩 (run_inference_server)
+        return False
+
+    if os.path.basename(sys.argv[0]) == "manage.py":
+        command = sys.argv[1] if len(sys.argv) > 1 else ""
+        if command != "runserver":
+            return False
+        return os.environ.get("RUN_MAIN") == "true"
+
+    return True
+
+
+def _warmup_quietly() -> None:
+    from vision.services.model_inference import warmup_model
+
+    try:
+        warmup_model()
+    except Exception:
+        # warmup_model에서 이미 로깅, 상태는 /api/vision/ready/ 응답에 error로 노출
+        pass
 
 
 class VisionConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "vision"
-    verbose_name = "AI 이미지 분석 관리"
\ No newline at end of file
+    verbose_name = "AI 이미지 분석 관리"
+
+    def ready(self):
+        from vision.services import fusion
+
+        # 잘못된 VISION_FUSION_RULES는 요청마다 실패하지 않도록 시작 시점에 ImproperlyConfigured
+        if fusion.is_enabled():
+            fusion.get_rules()
+
+        if not _should_warmup():
+            return
+
+        # 기본은 백그라운드 스레드 (worker 부팅을 막지 않음, /api/vision/ready/ 로 상태 확인)
+        # VISION_WARMUP_BLOCKING=True면 warm-up이 끝난 뒤 요청 받기 시작
+        if getattr(settings, "VISION_WARMUP_BLOCKING", False):
+            _warmup_quietly()
+            return
+
+        threading.Thread(target=_warmup_quietly, name="vision-warmup", daemon=True).start()
@@ -0,0 +1,112 @@
+import json
+import multiprocessing
+import resource
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from vision.services.image_io import decode_image, get_decode_size
+
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+def _current_rss_kb() -> int:
+  # /proc/self/statm: pages 단위 (Linux)
+  try:
+    with open("/proc/self/statm") as f:
+      rss_pages = int(f.read().split()[1])
+    return rss_pages * resource.getpagesize() // 1024
+  except (OSError, IndexError, ValueError):
+    return 0
+
+
+def _measure(path: str, draft: bool, repeat: int, queue) -> None:
+  """
+  자식 프로세스에서 실행 (peak RSS가 다른 측정과 섞이지 않도록)
+  """
+  data = Path(path).read_bytes()
+  base_rss = _current_rss_kb()
+
+  with override_settings(VISION_DECODE_DRAFT=draft):
+    cpu_start = time.process_time()
+    for _ in range(repeat):
+      arr = decode_image(data)
+    cpu_ms = (time.process_time() - cpu_start) * 1000 / repeat
+
+  peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  queue.put({
+    "cpu_ms": round(cpu_ms, 2),
+    "peak_rss_mb": round(max(0, peak_kb - base_rss) / 1024, 1),
+    "shape": list(arr.shape),
+  })
+
+
+def _run_isolated(path: str, draft: bool, repeat: int) -> dict:
+  ctx = multiprocessing.get_context("fork")
+  queue = ctx.Queue()
+  proc = ctx.Process(target=_measure, args=(path, draft, repeat, queue))
+  proc.start()
+  result = queue.get()
+  proc.join()
+  return result
+
+
+class Command(BaseCommand):
+  help = "이미지 전체 해상도 디코딩 vs 축소(draft) 디코딩의 이미지별 CPU 시간/peak RSS를 비교합니다."
+
+  def add_arguments(self, parser):
+    parser.add_argument("images", type=str, help="벤치마크할 이미지 폴더")
+    parser.add_argument("--repeat", type=int, default=3, help="이미지별 반복 디코딩 횟수 (기본 3)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+
+  def handle(self, *args, **options):
+    image_dir = Path(options["images"])
+    if not image_dir.is_dir():
+      raise CommandError(f"Directory not found: {image_dir}")
+
+    paths = sorted(p for p in image_dir.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+    if not paths:
+      raise CommandError(f"No images in {image_dir}")
+
+    repeat = max(1, options["repeat"])
+    rows = []
+    for p in paths:
+      full = _run_isolated(str(p), False, repeat)
+      reduced = _run_isolated(str(p), True, repeat)
+      rows.append({"image": p.name, "full": full, "reduced": reduced})
+
+    def _avg(key, mode):
+      return round(sum(r[mode][key] for r in rows) / len(rows), 2)
+
+    summary = {
+      "images": len(rows),
+      "decode_size": get_decode_size(),
+      "full_cpu_ms": _avg("cpu_ms", "full"),
+      "reduced_cpu_ms": _avg("cpu_ms", "reduced"),
+      "full_peak_rss_mb": _avg("peak_rss_mb", "full"),
+      "reduced_peak_rss_mb": _avg("peak_rss_mb", "reduced"),
+    }
+
+    if options["json"]:
+      self.stdout.write(json.dumps({"summary": summary, "images": rows}, ensure_ascii=False, indent=2))
+      return
+
+    self.stdout.write(f"{'image':<32} {'shape(full)':>16} {'shape(draft)':>16} {'cpu ms':>17} {'peak rss MB':>17}")
+    for r in rows:
+      full, reduced = r["full"], r["reduced"]
+      self.stdout.write(
+        f"{r['image'][:32]:<32} "
+        f"{'x'.join(map(str, full['shape'][:2])):>16} "
+        f"{'x'.join(map(str, reduced['shape'][:2])):>16} "
+        f"{full['cpu_ms']:>8} -> {reduced['cpu_ms']:<6} "
+        f"{full['peak_rss_mb']:>8} -> {reduced['peak_rss_mb']:<6}"
+      )
+
+    self.stdout.write(self.style.SUCCESS(
+      f"\n평균 ({summary['images']}장, decode_size={summary['decode_size']}): "
+      f"CPU {summary['full_cpu_ms']}ms -> {summary['reduced_cpu_ms']}ms, "
+      f"peak RSS {summary['full_peak_rss_mb']}MB -> {summary['reduced_peak_rss_mb']}MB"
+    ))
@@ -0,0 +1,311 @@
+import itertools
+import json
+import multiprocessing
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from vision.services.backends import BACKENDS
+from vision.services.benchmark import current_rss_mb, peak_rss_mb, percentile
+from vision.services.model_inference import (
+  reset_model,
+  run_vision_inference,
+  run_vision_inference_batch,
+  warmup_model,
+)
+from vision.services.pipeline import process_rooms_upload
+from vision.services.yolo_to_furniture import invalidate_furniture_cache
+
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+def _int_list(value: str):
+  try:
+    return [int(v) for v in value.split(",") if v.strip()]
+  except ValueError:
+    raise CommandError(f"Invalid integer list: {value}")
+
+
+def _latency_summary(latencies, images: int, wall_s: float) -> dict:
+  return {
+    "calls": len(latencies),
+    "images": images,
+    "p50_ms": round(percentile(latencies, 50), 1),
+    "p95_ms": round(percentile(latencies, 95), 1),
+    "p99_ms": round(percentile(latencies, 99), 1),
+    "images_per_sec": round(images / wall_s, 2) if wall_s > 0 else None,
+  }
+
+
+def _make_synthetic_images(out_dir: Path, count: int, width: int, height: int, seed: int = 0):
+  """
+  고정 seed로 만든 JPEG (그라데이션 배경 + 사각형 몇 개) -> 실행할 때마다 같은 이미지
+  """
+  import numpy as np
+  from PIL import Image
+
+  rng = np.random.default_rng(seed)
+  paths = []
+  for i in range(count):
+    base = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    img = np.broadcast_to(base, (height, width, 3)).copy()
+    img *= rng.uniform(0.3, 1.0, 3)
+    for _ in range(int(rng.integers(2, 6))):
+      x1, y1 = int(rng.integers(0, width // 2)), int(rng.integers(0, height // 2))
+      x2, y2 = x1 + int(rng.integers(width // 10, width // 2)), y1 + int(rng.integers(height // 10, height // 2))
+      img[y1:y2, x1:x2] = rng.uniform(0, 255, 3)
+
+    path = out_dir / f"synthetic_{i:03d}.jpg"
+    Image.fromarray(img.astype(np.uint8)).save(path, format="JPEG", quality=90)
+    paths.append(path)
+  return paths
+
+
+def _measure_config(config: dict, paths, repeat: int, fake: bool, queue) -> None:
+  """
+  자식 프로세스에서 실행 (cold start/peak RSS가 다른 설정과 섞이지 않도록)
+  threads개의 요청 스레드가 batch장씩 run_vision_inference(_batch)를 동시에 호출
+  """
+  batch, threads = config["batch"], config["threads"]
+  overrides = {
+    "VISION_BACKEND": config["backend"],
+    "VISION_IMG_SIZE": config["imgsz"],
+    "VISION_BATCH_SIZE": batch,
+    "VISION_FAKE_MODEL": fake,
+    "VISION_INFERENCE_MODE": "local",
+  }
+
+  try:
+    with override_settings(**overrides):
+      base_rss = current_rss_mb()
+
+      # cold start = 모델 로딩 + 첫 forward
+      start = time.perf_counter()
+      warmup_model()
+      cold_start_ms = (time.perf_counter() - start) * 1000
+
+      sources = [str(p) for p in paths]
+      chunks = [sources[i:i + batch] for i in range(0, len(sources), batch)] * repeat
+      latencies = []
+
+      def _call(chunk):
+        t = time.perf_counter()
+        if len(chunk) == 1:
+          run_vision_inference(chunk[0])
+        else:
+          run_vision_inference_batch(chunk)
+        latencies.append((time.perf_counter() - t) * 1000)
+
+      wall_start = time.perf_counter()
+      with ThreadPoolExecutor(max_workers=threads) as ex:
+        list(ex.map(_call, chunks))
+      wall_s = time.perf_counter() - wall_start
+
+    queue.put({
+      **config,
+      "cold_start_ms": round(cold_start_ms, 1),
+      **_latency_summary(latencies, sum(len(c) for c in chunks), wall_s),
+      "peak_rss_mb": round(peak_rss_mb(), 1),
+      "rss_delta_mb": round(current_rss_mb() - base_rss, 1),
+    })
+  except Exception as e:
+    queue.put({**config, "error": f"{type(e).__name__}: {e}"})
+
+
+def _run_isolated(config: dict, paths, repeat: int, fake: bool) -> dict:
+  # 자식 프로세스가 부모의 DB 연결을 같이 쓰지 않도록 fork 전에 정리
+  connections.close_all()
+
+  ctx = multiprocessing.get_context("fork")
+  queue = ctx.Queue()
+  proc = ctx.Process(target=_measure_config, args=(config, paths, repeat, fake, queue))
+  proc.start()
+  result = queue.get()
+  proc.join()
+  return result
+
+
+class Command(BaseCommand):
+  help = (
+    "imgsz/batch/스레드 수/backend 조합별로 vision 추론을 벤치마크합니다. "
+    "cold start, p50/p95/p99 latency, images/sec, peak RSS를 표와 JSON으로 출력하고 "
+    "--e2e면 테스트 DB에서 process_rooms_upload 전체 흐름도 측정합니다."
+  )
+
+  def add_arguments(self, parser):
+    parser.add_argument("--images", type=str, default=None, help="벤치마크할 이미지 폴더 (없으면 synthetic 이미지 생성)")
+    parser.add_argument("--synthetic", type=int, default=16, help="synthetic 이미지 수 (기본 16)")
+    parser.add_argument("--synthetic-size", type=str, default="1600x1200", help="synthetic 이미지 크기 WxH (기본 1600x1200)")
+    parser.add_argument("--imgsz", type=str, default=None, help="콤마 구분 imgsz 목록. Default: settings.VISION_IMG_SIZE")
+    parser.add_argument("--batch", type=str, default="1,4,8", help="콤마 구분 batch size 목록 (기본 1,4,8)")
+    parser.add_argument("--threads", type=str, default="1,4", help="콤마 구분 동시 요청 스레드 수 목록 (기본 1,4)")
+    parser.add_argument(
+      "--backend",
+      type=str,
+      default=None,
+      help=f"콤마 구분 backend 목록 ({', '.join(BACKENDS)}). Default: settings.VISION_BACKEND",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="설정별 이미지 전체 반복 횟수 (기본 3)")
+    parser.add_argument("--fake", action="store_true", help="실제 weight 대신 결정적인 가짜 모델 사용 (fake_model.py)")
+    parser.add_argument("--e2e", action="store_true", help="테스트 DB에서 process_rooms_upload 전체 흐름 측정")
+    parser.add_argument("--rooms-per-request", type=int, default=4, help="--e2e 요청 1건당 방(이미지) 수 (기본 4)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로만 출력")
+    parser.add_argument("--output", type=str, default=None, help="결과 JSON 저장 경로")
+
+  def _load_paths(self, options, tmp_dir: Path):
+    if options["images"]:
+      image_dir = Path(options["images"])
+      if not image_dir.is_dir():
+        raise CommandError(f"Directory not found: {image_dir}")
+      paths = sorted(p for p in image_dir.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+      if not paths:
+        raise CommandError(f"No images in {image_dir}")
+      return paths
+
+    try:
+      width, height = (int(v) for v in options["synthetic_size"].lower().split("x"))
+    except ValueError:
+      raise CommandError(f"Invalid --synthetic-size: {options['synthetic_size']} (e.g. 1600x1200)")
+    return _make_synthetic_images(tmp_dir, max(1, options["synthetic"]), width, height)
+
+  def _bench_e2e(self, paths, rooms_per_request: int, repeat: int, fake: bool) -> dict:
+    """
+    테스트 DB 생성 -> furniture 정책 로드 -> process_rooms_upload 반복 호출 -> 테스트 DB 삭제
+    탐지 캐시는 끄고 매번 실제 추론 (같은 이미지 반복이므로 캐시가 켜져 있으면 추론이 생략됨)
+    """
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    media_root = tempfile.mkdtemp(prefix="bench_vision_media_")
+    overrides = {
+      "MEDIA_ROOT": media_root,
+      "ALLOWED_HOSTS": [*getattr(settings, "ALLOWED_HOSTS", []), "testserver"],
+      "VISION_FAKE_MODEL": fake,
+      "VISION_DETECTION_CACHE": False,
+      "VISION_INFERENCE_MODE": "local",
+    }
+
+    try:
+      with override_settings(**overrides):
+        call_command("load_furniture", stdout=StringIO())
+        invalidate_furniture_cache()
+        reset_model()
+
+        start = time.perf_counter()
+        warmup_model()
+        cold_start_ms = (time.perf_counter() - start) * 1000
+
+        uploads = [(p.name, p.read_bytes()) for p in paths]
+        groups = [uploads[i:i + rooms_per_request] for i in range(0, len(uploads), rooms_per_request)]
+        factory = RequestFactory()
+        latencies, detections = [], 0
+
+        wall_start = time.perf_counter()
+        for group in itertools.chain.from_iterable(itertools.repeat(groups, repeat)):
+          files = [SimpleUploadedFile(name, data, content_type="image/jpeg") for name, data in group]
+          rooms = [{"room_type": f"ROOM{i + 1}", "file_index": i, "sort_order": i} for i in range(len(group))]
+
+          t = time.perf_counter()
+          payload = process_rooms_upload(request=factory.post("/api/vision/"), rooms=rooms, files=files)
+          latencies.append((time.perf_counter() - t) * 1000)
+          detections += sum(len(r["detections"]) for r in payload["results"])
+        wall_s = time.perf_counter() - wall_start
+
+      return {
+        "rooms_per_request": rooms_per_request,
+        "cold_start_ms": round(cold_start_ms, 1),
+        **_latency_summary(latencies, len(uploads) * repeat, wall_s),
+        "detections": detections,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+      }
+    finally:
+      connection.creation.destroy_test_db(old_name, verbosity=0)
+      shutil.rmtree(media_root, ignore_errors=True)
+      invalidate_furniture_cache()
+      reset_model()
+
+  def handle(self, *args, **options):
+    fake = options["fake"]
+    repeat = max(1, options["repeat"])
+
+    backends = [
+      b.strip().lower()
+      for b in (options["backend"] or str(getattr(settings, "VISION_BACKEND", "torch"))).split(",")
+      if b.strip()
+    ]
+    invalid = [b for b in backends if b not in BACKENDS]
+    if invalid:
+      raise CommandError(f"Invalid backend: {', '.join(invalid)} (choices={', '.join(BACKENDS)})")
+
+    imgszs = _int_list(options["imgsz"]) if options["imgsz"] else [int(getattr(settings, "VISION_IMG_SIZE", 640))]
+    batches = [max(1, b) for b in _int_list(options["batch"])]
+    threads = [max(1, t) for t in _int_list(options["threads"])]
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="bench_vision_"))
+    try:
+      paths = self._load_paths(options, tmp_dir)
+
+      # ====================================
+      # 1. 설정 조합별 추론 (조합마다 자식 프로세스)
+      # ====================================
+      rows = []
+      for backend, imgsz, batch, n_threads in itertools.product(backends, imgszs, batches, threads):
+        config = {"backend": backend, "imgsz": imgsz, "batch": batch, "threads": n_threads}
+        rows.append(_run_isolated(config, paths, repeat, fake))
+
+      # ====================================
+      # 2. process_rooms_upload 전체 흐름
+      # ====================================
+      e2e = None
+      if options["e2e"]:
+        e2e = self._bench_e2e(paths, max(1, options["rooms_per_request"]), repeat, fake)
+    finally:
+      shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    report = {
+      "images": len(paths),
+      "source": options["images"] or f"synthetic {options['synthetic_size']}",
+      "fake_model": fake,
+      "repeat": repeat,
+      "inference": rows,
+      "e2e": e2e,
+    }
+
+    if options["output"]:
+      Path(options["output"]).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if options["json"]:
+      self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+      return
+
+    self.stdout.write(
+      f"{'backend':<12} {'imgsz':>5} {'batch':>5} {'thr':>3} {'cold ms':>9} "
+      f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'img/s':>8} {'peak MB':>8}"
+    )
+    for r in rows:
+      prefix = f"{r['backend']:<12} {r['imgsz']:>5} {r['batch']:>5} {r['threads']:>3} "
+      if "error" in r:
+        self.stdout.write(prefix + self.style.ERROR(r["error"]))
+        continue
+      self.stdout.write(
+        prefix
+        + f"{r['cold_start_ms']:>9} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} "
+        f"{r['images_per_sec']:>8} {r['peak_rss_mb']:>8}"
+      )
+
+    if e2e:
+      self.stdout.write(self.style.SUCCESS(
+        f"\nprocess_rooms_upload ({e2e['rooms_per_request']}장/요청, {e2e['calls']}회): "
+        f"cold {e2e['cold_start_ms']}ms, p50 {e2e['p50_ms']}ms, p95 {e2e['p95_ms']}ms, "
+        f"p99 {e2e['p99_ms']}ms, {e2e['images_per_sec']} img/s, peak RSS {e2e['peak_rss_mb']}MB"
+      ))
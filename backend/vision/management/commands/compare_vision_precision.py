@@ -0,0 +1,188 @@
+import json
+import multiprocessing
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from vision.services.backends import (
+  EXPORT_FORMATS,
+  PRECISION_FP32,
+  PRECISION_INT8,
+  load_model,
+  predict_kwargs,
+)
+from vision.services.benchmark import current_rss_mb, match_detections, peak_rss_mb, percentile
+from vision.services.model_inference import YOLO, _result_to_detections
+from vision.services.yolo_to_furniture import map_to_furniture
+
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+def _run(model, paths, backend, imgsz, conf):
+  """
+  이미지 1장씩 추론 (latency 측정 목적이므로 batch 사용 안 함)
+  """
+  # 첫 추론은 그래프 초기화 비용이 포함되므로 제외
+  model.predict(source=str(paths[0]), imgsz=imgsz, conf=conf, save=False, verbose=False, **predict_kwargs(backend))
+
+  detections, latencies = [], []
+  for p in paths:
+    start = time.perf_counter()
+    results = model.predict(source=str(p), imgsz=imgsz, conf=conf, save=False, verbose=False, **predict_kwargs(backend))
+    latencies.append((time.perf_counter() - start) * 1000)
+    detections.append(_result_to_detections(results[0]) if results else [])
+  return detections, latencies
+
+
+def _measure_precision(backend: str, precision: str, paths, imgsz: int, conf: float, queue) -> None:
+  """
+  자식 프로세스에서 실행
+  ru_maxrss는 프로세스 전체 최대값이라 한 프로세스에서 FP32 -> INT8 순서로 재면
+  INT8 peak가 FP32보다 낮게 나올 수 없으므로 정밀도마다 별도 프로세스에서 측정
+  """
+  try:
+    rss_before = current_rss_mb()
+    model = load_model(YOLO, backend, precision)
+    rss_loaded = current_rss_mb()
+
+    detections, latencies = _run(model, paths, backend, imgsz, conf)
+
+    queue.put({
+      "detections": detections,
+      "latency_ms": {
+        "p50": round(percentile(latencies, 50), 2),
+        "p95": round(percentile(latencies, 95), 2),
+      },
+      "memory_mb": {
+        # fork 시점 RSS 대비 증가량 / 이 프로세스의 peak RSS (fork 시점 부모 RSS 포함, 정밀도 간 기준 동일)
+        "model_load_rss_delta": round(rss_loaded - rss_before, 1),
+        "after_inference_rss_delta": round(current_rss_mb() - rss_before, 1),
+        "peak_rss": round(peak_rss_mb(), 1),
+      },
+    })
+  except Exception as e:
+    queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def _run_isolated(backend: str, precision: str, paths, imgsz: int, conf: float) -> dict:
+  # 자식 프로세스가 부모의 DB 연결을 같이 쓰지 않도록 fork 전에 정리
+  connections.close_all()
+
+  ctx = multiprocessing.get_context("fork")
+  queue = ctx.Queue()
+  proc = ctx.Process(target=_measure_precision, args=(backend, precision, paths, imgsz, conf, queue))
+  proc.start()
+  result = queue.get()
+  proc.join()
+  return result
+
+
+class Command(BaseCommand):
+  help = (
+    "샘플 이미지 폴더로 FP32/INT8 모델을 각각 추론해서 "
+    "클래스별 탐지 일치율(yolo_id + IoU), p50/p95 latency, 메모리를 비교합니다."
+  )
+
+  def add_arguments(self, parser):
+    parser.add_argument("images", type=str, help="샘플 이미지 폴더")
+    parser.add_argument(
+      "--backend",
+      type=str,
+      choices=sorted(EXPORT_FORMATS),
+      default=None,
+      help="비교할 backend. Default: settings.VISION_BACKEND",
+    )
+    parser.add_argument("--iou", type=float, default=0.5, help="같은 탐지로 볼 최소 IoU (기본 0.5)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+
+  def handle(self, *args, **options):
+    if YOLO is None:
+      raise CommandError("ultralytics가 설치되어 있지 않습니다. pip install ultralytics")
+
+    image_dir = Path(options["images"])
+    if not image_dir.is_dir():
+      raise CommandError(f"Directory not found: {image_dir}")
+    paths = sorted(p for p in image_dir.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+    if not paths:
+      raise CommandError(f"No images in {image_dir}")
+
+    backend = options["backend"] or str(getattr(settings, "VISION_BACKEND", "")).lower()
+    if backend not in EXPORT_FORMATS:
+      raise CommandError(f"--backend is required (choices={', '.join(sorted(EXPORT_FORMATS))})")
+
+    imgsz = int(getattr(settings, "VISION_IMG_SIZE", 640))
+    conf = float(getattr(settings, "VISION_CONF", 0.25))
+
+    # ====================================
+    # 1. 정밀도별 추론 + latency/메모리
+    # ====================================
+    runs = {}
+    for precision in (PRECISION_FP32, PRECISION_INT8):
+      result = _run_isolated(backend, precision, paths, imgsz, conf)
+      if "error" in result:
+        raise CommandError(f"{precision} 측정 실패: {result['error']}")
+      runs[precision] = result
+
+    # ====================================
+    # 2. 클래스별 탐지 일치율
+    # ====================================
+    per_class = defaultdict(lambda: {"fp32": 0, "int8": 0, "matched": 0, "iou_sum": 0.0})
+    for ref, other in zip(runs[PRECISION_FP32]["detections"], runs[PRECISION_INT8]["detections"]):
+      for d in ref:
+        per_class[d["yolo_id"]]["fp32"] += 1
+      for d in other:
+        per_class[d["yolo_id"]]["int8"] += 1
+      for i, _, iou in match_detections(ref, other, options["iou"]):
+        stats = per_class[ref[i]["yolo_id"]]
+        stats["matched"] += 1
+        stats["iou_sum"] += iou
+
+    classes = []
+    for yolo_id in sorted(per_class):
+      stats = per_class[yolo_id]
+      furniture = map_to_furniture(yolo_id)
+      classes.append({
+        "yolo_id": yolo_id,
+        "name_en": furniture.name_en if furniture else None,
+        "fp32": stats["fp32"],
+        "int8": stats["int8"],
+        "matched": stats["matched"],
+        # fp32 탐지 중 int8도 찾은 비율 / int8 탐지 중 fp32와 일치한 비율
+        "recall_vs_fp32": round(stats["matched"] / stats["fp32"], 4) if stats["fp32"] else None,
+        "precision_vs_fp32": round(stats["matched"] / stats["int8"], 4) if stats["int8"] else None,
+        "mean_iou": round(stats["iou_sum"] / stats["matched"], 4) if stats["matched"] else None,
+      })
+
+    report = {
+      "backend": backend,
+      "images": len(paths),
+      "iou_threshold": options["iou"],
+      "latency_ms": {k: v["latency_ms"] for k, v in runs.items()},
+      "memory_mb": {k: v["memory_mb"] for k, v in runs.items()},
+      "classes": classes,
+    }
+
+    if options["json"]:
+      self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+      return
+
+    self.stdout.write(self.style.MIGRATE_HEADING(f"\n▶ {backend} FP32 vs INT8 ({len(paths)}장, IoU>={options['iou']})"))
+    for precision in (PRECISION_FP32, PRECISION_INT8):
+      lat, mem = report["latency_ms"][precision], report["memory_mb"][precision]
+      self.stdout.write(
+        f"{precision}: p50={lat['p50']}ms p95={lat['p95']}ms "
+        f"model_rss_delta={mem['model_load_rss_delta']}MB after_inference_rss_delta={mem['after_inference_rss_delta']}MB "
+        f"peak_rss={mem['peak_rss']}MB"
+      )
+
+    self.stdout.write(f"\n{'yolo_id':>7} {'name_en':<24} {'fp32':>5} {'int8':>5} {'match':>5} {'recall':>7} {'prec':>7} {'iou':>6}")
+    for c in classes:
+      self.stdout.write(
+        f"{c['yolo_id']:>7} {str(c['name_en'])[:24]:<24} {c['fp32']:>5} {c['int8']:>5} {c['matched']:>5} "
+        f"{str(c['recall_vs_fp32']):>7} {str(c['precision_vs_fp32']):>7} {str(c['mean_iou']):>6}"
+      )
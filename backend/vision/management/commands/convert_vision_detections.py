@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from policy.models import Furniture
+from vision.models import VisionDetection, VisionImage
+from vision.services.detection_storage import (
+  STORAGE_MODES,
+  STORAGE_PACKED,
+  convert_packed_to_rows,
+  convert_rows_to_packed,
+  get_storage_mode,
+)
+
+
+class Command(BaseCommand):
+  help = (
+    "저장된 탐지 결과를 VisionDetection 행 <-> VisionImage.detections_packed 사이에서 변환합니다. "
+    "VISION_DETECTION_STORAGE를 바꾼 뒤 기존 데이터도 같은 방식으로 맞출 때 사용 (읽기 API는 두 방식 모두 지원)"
+  )
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--to",
+      choices=STORAGE_MODES,
+      default=None,
+      help="변환할 저장 방식 (기본 settings.VISION_DETECTION_STORAGE)",
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="트랜잭션 1개에서 변환할 이미지 수 (기본 500)")
+
+  def handle(self, *args, **options):
+    batch_size = options["batch_size"]
+    if batch_size < 1:
+      raise CommandError("--batch-size must be >= 1")
+
+    target = options["to"] or get_storage_mode()
+    if target == STORAGE_PACKED:
+      converted = convert_rows_to_packed(VisionImage, VisionDetection, batch_size=batch_size)
+    else:
+      converted = convert_packed_to_rows(VisionImage, VisionDetection, Furniture, batch_size=batch_size)
+
+    self.stdout.write(self.style.SUCCESS(f"{target}: {converted} images converted"))
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from vision.services.backends import EXPORT_FORMATS, export_int8_model, export_model
+from vision.services.model_inference import YOLO
+
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+class Command(BaseCommand):
+  help = "VISION_MODEL_PATH 모델을 CPU 추론 backend(onnxruntime/openvino) 형식으로 export 합니다."
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--backend",
+      type=str,
+      choices=sorted(EXPORT_FORMATS),
+      default=None,
+      help="export할 backend. Default: settings.VISION_BACKEND",
+    )
+    parser.add_argument(
+      "--imgsz",
+      type=int,
+      default=None,
+      help="export 입력 크기. Default: settings.VISION_IMG_SIZE",
+    )
+    parser.add_argument(
+      "--int8",
+      action="store_true",
+      help="INT8 양자화 모델로 export (VISION_PRECISION=\"int8\"로 사용)",
+    )
+    parser.add_argument(
+      "--calibration-images",
+      type=str,
+      default=None,
+      help="onnxruntime static 양자화용 샘플 이미지 폴더 (없으면 dynamic 양자화)",
+    )
+    parser.add_argument(
+      "--calibration-data",
+      type=str,
+      default=None,
+      help="openvino INT8 양자화용 ultralytics dataset yaml",
+    )
+
+  def handle(self, *args, **options):
+    if YOLO is None:
+      raise CommandError("ultralytics가 설치되어 있지 않습니다. pip install ultralytics")
+
+    backend = options["backend"] or str(getattr(settings, "VISION_BACKEND", "")).lower()
+    if backend not in EXPORT_FORMATS:
+      raise CommandError(f"--backend is required (choices={', '.join(sorted(EXPORT_FORMATS))})")
+
+    imgsz = options["imgsz"] or int(getattr(settings, "VISION_IMG_SIZE", 640))
+
+    if not options["int8"]:
+      path = export_model(YOLO, backend, imgsz)
+      self.stdout.write(self.style.SUCCESS(
+        f"{backend} 모델 export 완료: {path} (settings.VISION_BACKEND=\"{backend}\"로 사용)"
+      ))
+      return
+
+    calibration_images = None
+    if options["calibration_images"]:
+      image_dir = Path(options["calibration_images"])
+      if not image_dir.is_dir():
+        raise CommandError(f"Directory not found: {image_dir}")
+      calibration_images = sorted(p for p in image_dir.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+
+    path = export_int8_model(
+      YOLO,
+      backend,
+      imgsz,
+      calibration_images=calibration_images,
+      calibration_data=options["calibration_data"],
+    )
+    self.stdout.write(self.style.SUCCESS(
+      f"{backend} INT8 모델 export 완료: {path} "
+      f"(settings.VISION_BACKEND=\"{backend}\", VISION_PRECISION=\"int8\"로 사용)"
+    ))
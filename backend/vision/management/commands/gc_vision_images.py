@@ -0,0 +1,71 @@
+import json
+from dataclasses import asdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vision.services.cleanup import collect_orphan_images, get_ttl
+
+
+def _format_bytes(n: int) -> str:
+  size = float(n)
+  for unit in ("B", "KB", "MB", "GB"):
+    if size < 1024 or unit == "GB":
+      return f"{size:.1f}{unit}" if unit != "B" else f"{int(size)}B"
+    size /= 1024
+
+
+class Command(BaseCommand):
+  help = (
+    "견적에 연결되지 않고 TTL이 지난 VisionImage(+VisionDetection, 이미지/썸네일 파일)를 batch 단위로 삭제합니다. "
+    "cron 등으로 주기 실행 가능 (업로드와 동시에 실행해도 안전)"
+  )
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--ttl-days",
+      type=float,
+      default=None,
+      help="이 기간보다 오래된 이미지만 삭제 (기본 settings.VISION_GC_TTL_DAYS, 없으면 7)",
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="트랜잭션 1개에서 삭제할 이미지 수 (기본 500)")
+    parser.add_argument("--max-batches", type=int, default=0, help="최대 batch 수 (기본 0=끝까지)")
+    parser.add_argument("--sleep", type=float, default=0.0, help="batch 사이 대기 초 (기본 0)")
+    parser.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상 개수/용량만 출력")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+
+  def handle(self, *args, **options):
+    batch_size = options["batch_size"]
+    if batch_size < 1:
+      raise CommandError("--batch-size must be >= 1")
+
+    ttl = timedelta(days=options["ttl_days"]) if options["ttl_days"] is not None else get_ttl()
+    if ttl.total_seconds() <= 0:
+      raise CommandError("--ttl-days must be > 0")
+
+    dry_run = options["dry_run"]
+    verbose = options["verbosity"] >= 2 and not options["json"]
+
+    def _on_batch(stats):
+      if verbose:
+        self.stdout.write(f"  batch {stats.batches}: images={stats.images} bytes={_format_bytes(stats.bytes_reclaimed)}")
+
+    stats = collect_orphan_images(
+      ttl=ttl,
+      batch_size=batch_size,
+      max_batches=max(0, options["max_batches"]),
+      sleep=max(0.0, options["sleep"]),
+      dry_run=dry_run,
+      on_batch=_on_batch,
+    )
+
+    if options["json"]:
+      self.stdout.write(json.dumps({"dry_run": dry_run, "ttl_days": ttl.total_seconds() / 86400, **asdict(stats)}))
+      return
+
+    prefix = "[dry-run] 삭제 대상" if dry_run else "삭제 완료"
+    line = (
+      f"{prefix}: images={stats.images} detections={stats.detections} files={stats.files} "
+      f"reclaimed={_format_bytes(stats.bytes_reclaimed)} batches={stats.batches}"
+    )
+    self.stdout.write(self.style.SUCCESS(line))
@@ -0,0 +1,37 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vision.services.inference_server import InferenceServerError, get_socket_path, is_listening, serve_forever
+from vision.services.model_inference import warmup_model
+
+
+class Command(BaseCommand):
+  help = "YOLO 모델을 1번만 로딩하고 Unix socket으로 추론 요청을 처리하는 추론 서버를 실행합니다."
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--socket",
+      type=str,
+      default=None,
+      help="Unix socket path. Default: settings.VISION_INFERENCE_SOCKET",
+    )
+
+  def handle(self, *args, **options):
+    address = options["socket"] or get_socket_path()
+
+    # 이미 실행 중인 서버가 있으면 모델 로딩 전에 종료
+    if os.path.exists(address) and is_listening(address):
+      raise CommandError(f"Vision inference server가 이미 실행 중입니다: {address}")
+
+    # 첫 요청 전에 모델 로딩 + dummy forward
+    status = warmup_model()
+    self.stdout.write(f"모델 warm-up 완료: {status['duration_ms']}ms")
+
+    self.stdout.write(self.style.SUCCESS(f"Vision inference server 시작: {address}"))
+    try:
+      serve_forever(address)
+    except InferenceServerError as e:
+      raise CommandError(str(e))
+    except KeyboardInterrupt:
+      self.stdout.write("\nVision inference server 종료")
@@ -0,0 +1,58 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:12
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vision", "0006_alter_visiondetection_bbox_h_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VisionUploadJob",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "job_id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "대기"),
+                            ("RUNNING", "처리중"),
+                            ("DONE", "완료"),
+                            ("FAILED", "실패"),
+                        ],
+                        default="PENDING",
+                        max_length=20,
+                    ),
+                ),
+                ("rooms", models.JSONField(blank=True, default=list)),
+                ("rooms_total", models.IntegerField(default=0)),
+                ("rooms_done", models.IntegerField(default=0)),
+                ("result", models.JSONField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "객체 탐지 작업",
+                "verbose_name_plural": "3. 객체 탐지 작업 목록",
+                "db_table": "vision_upload_job",
+                "indexes": [
+                    models.Index(
+                        fields=["status"], name="vision_uplo_status_606fe7_idx"
+                    ),
+                    models.Index(
+                        fields=["-created_at"], name="vision_uplo_created_18f710_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
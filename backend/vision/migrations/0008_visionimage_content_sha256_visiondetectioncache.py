@@ -0,0 +1,46 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vision", "0007_visionuploadjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="visionimage",
+            name="content_sha256",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.CreateModel(
+            name="VisionDetectionCache",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("cache_key", models.CharField(max_length=64, unique=True)),
+                ("content_sha256", models.CharField(max_length=64)),
+                ("model_version", models.CharField(max_length=128)),
+                ("img_size", models.IntegerField()),
+                ("conf", models.FloatField()),
+                ("detections", models.JSONField(blank=True, default=list)),
+                ("hit_count", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("last_hit_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "객체 탐지 캐시",
+                "verbose_name_plural": "4. 객체 탐지 캐시 목록",
+                "db_table": "vision_detection_cache",
+                "indexes": [
+                    models.Index(
+                        fields=["content_sha256"], name="vision_dete_content_4dd0f8_idx"
+                    ),
+                    models.Index(
+                        fields=["-created_at"], name="vision_dete_created_91fc9e_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:30
+
+import vision.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vision", "0008_visionimage_content_sha256_visiondetectioncache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="visionimage",
+            name="thumbnail",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                upload_to=vision.models.vision_thumbnail_upload_to,
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # 컬럼 추가만 (기존 VisionDetection 행은 그대로 읽힘)
+    # VISION_DETECTION_STORAGE=packed로 바꾼 뒤 기존 데이터도 맞추려면 convert_vision_detections 명령 실행
+    # (마이그레이션 실행 시점의 설정에 따라 데이터가 바뀌지 않도록 변환은 명령으로만)
+
+    dependencies = [
+        ("vision", "0009_visionimage_thumbnail"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="visionimage",
+            name="detections_packed",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -1,4 +1,5 @@
 import os
+import uuid
 from django.utils import timezone
 from django.db import models
 
@@ -12,6 +13,15 @@ def vision_image_upload_to(instance, filename):
   return f"vision/{ts}_{name}{ext}"
 
 
+def vision_thumbnail_upload_to(instance, filename):
+  """
+  썸네일 파일 저장 경로 (원본과 같은 timestamp 규칙)
+  """
+  ts = timezone.now().strftime("%Y%m%d%H%M%S")
+  name, ext = os.path.splitext(filename)
+  return f"vision/thumbs/{ts}_{name}{ext}"
+
+
 
 class VisionImage(models.Model):
   """
@@ -24,6 +34,15 @@ class VisionImage(models.Model):
   image = models.ImageField(upload_to=vision_image_upload_to, null=True, blank=True)
   image_file_name = models.CharField(max_length=255, blank=True)
 
+  # 미리보기용 썸네일 (services/ingest.py, 업로드 시 생성)
+  thumbnail = models.ImageField(upload_to=vision_thumbnail_upload_to, null=True, blank=True)
+
+  # VISION_DETECTION_STORAGE=packed일 때 탐지 결과 (VisionDetection 행 대신, services/detection_storage.py)
+  detections_packed = models.BinaryField(null=True, blank=True, editable=False)
+
+  # 업로드 원본 bytes의 SHA-256 (같은 사진 재업로드 시 탐지 결과 캐시 키)
+  content_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+
   sort_order = models.IntegerField(default=0)
   created_at = models.DateTimeField(auto_now_add=True)
 
@@ -90,3 +109,82 @@ class VisionDetection(models.Model):
 
   def __str__(self):
     return f"VisionDetection#{self.id} img={self.vision_image_id} cls={self.yolo_class}"
+
+
+
+class VisionDetectionCache(models.Model):
+  """
+  이미지 내용(SHA-256) + 추론 설정별 YOLO 탐지 결과 캐시
+  """
+  id = models.BigAutoField(primary_key=True)
+
+  # content_sha256 + model_version + img_size + conf 를 합친 해시
+  cache_key = models.CharField(max_length=64, unique=True)
+
+  content_sha256 = models.CharField(max_length=64)
+  model_version = models.CharField(max_length=128)
+  img_size = models.IntegerField()
+  conf = models.FloatField()
+
+  # run_vision_inference 결과 그대로 저장: [{"yolo_id", "yolo_class", "confidence", "bbox"}, ...]
+  detections = models.JSONField(default=list, blank=True)
+
+  hit_count = models.IntegerField(default=0)
+  created_at = models.DateTimeField(auto_now_add=True)
+  last_hit_at = models.DateTimeField(null=True, blank=True)
+
+  class Meta:
+    db_table = "vision_detection_cache"
+    verbose_name = "객체 탐지 캐시"
+    verbose_name_plural = "4. 객체 탐지 캐시 목록"
+    indexes = [
+      models.Index(fields=["content_sha256"]),
+      models.Index(fields=["-created_at"]),
+    ]
+
+  def __str__(self):
+    return f"VisionDetectionCache#{self.id} sha={self.content_sha256[:12]}"
+
+
+
+class VisionUploadJob(models.Model):
+  """
+  비동기 이미지 업로드/추론 작업
+  """
+  class Status(models.TextChoices):
+    PENDING = "PENDING", "대기"
+    RUNNING = "RUNNING", "처리중"
+    DONE = "DONE", "완료"
+    FAILED = "FAILED", "실패"
+
+  id = models.BigAutoField(primary_key=True)
+
+  # 외부 노출용 id (순차 id 추측 방지)
+  job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+
+  status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+
+  # 방별 진행 상황: [{"vision_image_id", "room_type", "image_url", "status", "detections_count"}, ...]
+  rooms = models.JSONField(default=list, blank=True)
+  rooms_total = models.IntegerField(default=0)
+  rooms_done = models.IntegerField(default=0)
+
+  # 완료 시 process_rooms_upload와 같은 응답 형태 {"results": [...]}
+  result = models.JSONField(null=True, blank=True)
+  error = models.TextField(blank=True)
+
+  created_at = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True)
+  finished_at = models.DateTimeField(null=True, blank=True)
+
+  class Meta:
+    db_table = "vision_upload_job"
+    verbose_name = "객체 탐지 작업"
+    verbose_name_plural = "3. 객체 탐지 작업 목록"
+    indexes = [
+      models.Index(fields=["status"]),
+      models.Index(fields=["-created_at"]),
+    ]
+
+  def __str__(self):
+    return f"VisionUploadJob#{self.id} ({self.status})"
@@ -0,0 +1,228 @@
+# vision/services/backends.py
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+
+# 추론 backend (settings.VISION_BACKEND)
+# - torch: VISION_MODEL_PATH(.pt)를 PyTorch eager로 추론 (기본)
+# - onnxruntime: export된 .onnx 그래프를 ONNX Runtime으로 추론 (CPU 서버 권장)
+# - openvino: export된 *_openvino_model/ 을 OpenVINO로 추론 (Intel CPU 서버 권장)
+# 어떤 backend든 ultralytics YOLO가 같은 Results 형태로 반환하므로
+# run_vision_inference의 detection dict 형태는 동일함
+#
+# 정밀도 (settings.VISION_PRECISION)
+# - fp32: 기본
+# - int8: 양자화 모델 (onnxruntime/openvino만 지원)
+#   적용 전 compare_vision_precision 커맨드로 fp32 대비 탐지 일치율/latency 확인 필요
+
+BACKEND_TORCH = "torch"
+BACKEND_ONNXRUNTIME = "onnxruntime"
+BACKEND_OPENVINO = "openvino"
+
+BACKENDS = (BACKEND_TORCH, BACKEND_ONNXRUNTIME, BACKEND_OPENVINO)
+
+PRECISION_FP32 = "fp32"
+PRECISION_INT8 = "int8"
+
+PRECISIONS = (PRECISION_FP32, PRECISION_INT8)
+
+# backend -> ultralytics export format
+EXPORT_FORMATS: Dict[str, str] = {
+  BACKEND_ONNXRUNTIME: "onnx",
+  BACKEND_OPENVINO: "openvino",
+}
+
+
+def get_backend() -> str:
+  backend = str(getattr(settings, "VISION_BACKEND", BACKEND_TORCH)).lower()
+  if backend not in BACKENDS:
+    raise ValueError(f"Invalid VISION_BACKEND: {backend} (choices={', '.join(BACKENDS)})")
+  return backend
+
+
+def get_precision() -> str:
+  precision = str(getattr(settings, "VISION_PRECISION", PRECISION_FP32)).lower()
+  if precision not in PRECISIONS:
+    raise ValueError(f"Invalid VISION_PRECISION: {precision} (choices={', '.join(PRECISIONS)})")
+  return precision
+
+
+def get_model_artifact_path(backend: Optional[str] = None, precision: Optional[str] = None) -> Path:
+  """
+  backend/정밀도별 모델 파일(디렉터리) 경로
+  별도 설정이 없으면 export_vision_model 커맨드가 만드는 기본 경로 사용
+  - onnxruntime: {stem}.onnx / {stem}.int8.onnx                      (VISION_ONNX_MODEL_PATH)
+  - openvino:    {stem}_openvino_model/ / {stem}_int8_openvino_model/ (VISION_OPENVINO_MODEL_PATH)
+  """
+  backend = backend or get_backend()
+  precision = precision or get_precision()
+  model_path = Path(str(settings.VISION_MODEL_PATH))
+  int8 = precision == PRECISION_INT8
+
+  if backend == BACKEND_TORCH:
+    if int8:
+      raise ValueError("VISION_PRECISION=int8 requires VISION_BACKEND onnxruntime or openvino")
+    return model_path
+
+  if backend == BACKEND_ONNXRUNTIME:
+    custom = getattr(settings, "VISION_ONNX_MODEL_PATH", None)
+    path = Path(str(custom)) if custom else model_path.with_suffix(".onnx")
+    return path.with_suffix(".int8.onnx") if int8 else path
+
+  custom = getattr(settings, "VISION_OPENVINO_MODEL_PATH", None)
+  path = Path(str(custom)) if custom else model_path.parent / f"{model_path.stem}_openvino_model"
+  if int8:
+    return path.parent / path.name.replace("_openvino_model", "_int8_openvino_model")
+  return path
+
+
+def load_model(yolo_cls, backend: Optional[str] = None, precision: Optional[str] = None):
+  """
+  backend/정밀도에 맞는 모델 로딩
+  export된 모델은 .to(device)를 지원하지 않으므로 device는 predict 인자로 전달 (predict_kwargs)
+  """
+  backend = backend or get_backend()
+  precision = precision or get_precision()
+  path = get_model_artifact_path(backend, precision)
+
+  if backend == BACKEND_TORCH:
+    model = yolo_cls(str(path))
+    model.to(getattr(settings, "VISION_DEVICE", "cpu"))
+    return model
+
+  if not path.exists():
+    option = " --int8" if precision == PRECISION_INT8 else ""
+    raise RuntimeError(
+      f"{backend} 모델이 없습니다: {path} (python manage.py export_vision_model --backend {backend}{option})"
+    )
+  return yolo_cls(str(path), task="detect")
+
+
+def predict_kwargs(backend: Optional[str] = None) -> Dict[str, Any]:
+  backend = backend or get_backend()
+  if backend == BACKEND_TORCH:
+    return {}
+  return {"device": getattr(settings, "VISION_DEVICE", "cpu")}
+
+
+def _move(src: Path, target: Path) -> Path:
+  if src.resolve() == target.resolve():
+    return target
+  if target.exists() and target.is_dir():
+    shutil.rmtree(target)
+  src.replace(target)
+  return target
+
+
+def export_model(yolo_cls, backend: str, imgsz: int, **export_options) -> Path:
+  """
+  VISION_MODEL_PATH(.pt)를 backend 형식(fp32)으로 export
+  - dynamic=True: 요청마다 batch 크기가 달라도 같은 그래프 사용
+  return: export된 모델 경로 (get_model_artifact_path와 다르면 이동)
+  """
+  if backend not in EXPORT_FORMATS:
+    raise ValueError(f"export not supported for backend: {backend}")
+
+  model = yolo_cls(str(settings.VISION_MODEL_PATH))
+  exported = Path(str(model.export(
+    format=EXPORT_FORMATS[backend],
+    imgsz=imgsz,
+    dynamic=True,
+    **export_options,
+  )))
+  return _move(exported, get_model_artifact_path(backend, PRECISION_FP32))
+
+
+def export_int8_model(
+  yolo_cls,
+  backend: str,
+  imgsz: int,
+  calibration_images: Optional[List[Path]] = None,
+  calibration_data: Optional[str] = None,
+) -> Path:
+  """
+  INT8 양자화 모델 export
+  - openvino: ultralytics export(int8=True) -> NNCF 학습 후 양자화 (calibration_data: dataset yaml)
+  - onnxruntime: fp32 .onnx를 ONNX Runtime으로 양자화
+      calibration_images가 있으면 static 양자화 (activation까지 INT8, conv 모델에 효과 큼)
+      없으면 dynamic 양자화 (weight만 INT8)
+  """
+  target = get_model_artifact_path(backend, PRECISION_INT8)
+
+  if backend == BACKEND_OPENVINO:
+    model = yolo_cls(str(settings.VISION_MODEL_PATH))
+    options: Dict[str, Any] = {"int8": True}
+    if calibration_data:
+      options["data"] = calibration_data
+    exported = Path(str(model.export(format="openvino", imgsz=imgsz, dynamic=True, **options)))
+    return _move(exported, target)
+
+  if backend != BACKEND_ONNXRUNTIME:
+    raise ValueError(f"int8 export not supported for backend: {backend}")
+
+  try:
+    from onnxruntime import quantization as ort_q
+  except ImportError as e:
+    raise RuntimeError("onnxruntime이 설치되어 있지 않습니다. pip install onnxruntime") from e
+
+  fp32_path = get_model_artifact_path(backend, PRECISION_FP32)
+  if not fp32_path.exists():
+    fp32_path = export_model(yolo_cls, backend, imgsz)
+
+  if calibration_images:
+    ort_q.quantize_static(
+      str(fp32_path),
+      str(target),
+      _OnnxCalibrationReader(fp32_path, calibration_images, imgsz),
+      quant_format=ort_q.QuantFormat.QDQ,
+      activation_type=ort_q.QuantType.QUInt8,
+      weight_type=ort_q.QuantType.QInt8,
+    )
+  else:
+    ort_q.quantize_dynamic(str(fp32_path), str(target), weight_type=ort_q.QuantType.QUInt8)
+  return target
+
+
+class _OnnxCalibrationReader:
+  """
+  ONNX Runtime static 양자화용 calibration 입력
+  ultralytics 전처리와 같게 letterbox -> RGB -> 0~1 -> NCHW float32
+  """
+
+  def __init__(self, onnx_path: Path, image_paths: List[Path], imgsz: int):
+    import onnxruntime
+
+    session = onnxruntime.InferenceSession(str(onnx_path), providers=["CPUExecutionProvider"])
+    self.input_name = session.get_inputs()[0].name
+    self.imgsz = imgsz
+    self._paths = iter(image_paths)
+
+  def _preprocess(self, path: Path):
+    import numpy as np
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as img:
+      img = ImageOps.exif_transpose(img).convert("RGB")
+      scale = self.imgsz / max(img.size)
+      new_w, new_h = round(img.width * scale), round(img.height * scale)
+      img = img.resize((new_w, new_h), Image.BILINEAR)
+
+    canvas = Image.new("RGB", (self.imgsz, self.imgsz), (114, 114, 114))
+    canvas.paste(img, ((self.imgsz - new_w) // 2, (self.imgsz - new_h) // 2))
+
+    arr = np.asarray(canvas, dtype=np.float32) / 255.0
+    return arr.transpose(2, 0, 1)[None, ...]
+
+  def get_next(self):
+    path = next(self._paths, None)
+    if path is None:
+      return None
+    return {self.input_name: self._preprocess(path)}
+
+  def rewind(self):
+    pass
@@ -0,0 +1,143 @@
+# vision/services/batch_scheduler.py
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, List, Optional, Sequence
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# 동시 요청 간 micro-batching
+# - 여러 요청(스레드)의 이미지를 큐에 모았다가 model.predict 1번으로 처리
+# - flush 조건: 모인 이미지 수 >= max_batch 또는 가장 먼저 들어온 요청이 max_wait_ms 만큼 대기
+# - 요청마다 Future로 자기 이미지 결과만 돌려받음
+# - predict는 scheduler worker 스레드 1개에서만 호출 (같은 모델을 여러 스레드가 동시에 쓰지 않음)
+# 단일 요청이면 최대 max_wait_ms(기본 20ms)만큼 지연이 추가됨
+
+Runner = Callable[[List[Any]], List[Any]]
+
+
+def is_enabled() -> bool:
+  return bool(getattr(settings, "VISION_MICROBATCH_ENABLED", False))
+
+
+def get_max_wait_ms() -> float:
+  try:
+    return max(0.0, float(getattr(settings, "VISION_MICROBATCH_MAX_WAIT_MS", 20)))
+  except (TypeError, ValueError):
+    return 20.0
+
+
+def get_max_batch(default: int) -> int:
+  try:
+    return max(1, int(getattr(settings, "VISION_MICROBATCH_MAX_BATCH", default)))
+  except (TypeError, ValueError):
+    return default
+
+
+@dataclass
+class _Pending:
+  sources: List[Any]
+  future: Future = field(default_factory=Future)
+  enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class MicroBatchScheduler:
+  """
+  runner(sources) -> 이미지별 결과 리스트 (입력 순서)
+  여러 요청의 sources를 이어 붙여 runner를 1번 호출하고 결과를 요청별로 다시 나눔
+  """
+
+  def __init__(self, runner: Runner, max_batch: int, max_wait_ms: float):
+    self._runner = runner
+    self.max_batch = max(1, int(max_batch))
+    self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+    self._queue: Deque[_Pending] = deque()
+    self._cond = threading.Condition()
+    self._thread: Optional[threading.Thread] = None
+
+  def submit(self, sources: Sequence[Any]) -> Future:
+    item = _Pending(sources=list(sources))
+    if not item.sources:
+      item.future.set_result([])
+      return item.future
+
+    with self._cond:
+      self._ensure_worker()
+      self._queue.append(item)
+      self._cond.notify()
+    return item.future
+
+  def infer(self, sources: Sequence[Any]) -> List[Any]:
+    """
+    submit 후 결과 대기 (호출 스레드 blocking)
+    """
+    return self.submit(sources).result()
+
+  def _ensure_worker(self) -> None:
+    # fork 이후 자식 프로세스에는 스레드가 없으므로 살아있는지 확인 후 시작
+    if self._thread is None or not self._thread.is_alive():
+      self._thread = threading.Thread(
+        target=self._loop,
+        name="vision-microbatch",
+        daemon=True,
+      )
+      self._thread.start()
+
+  def _take_batch(self) -> List[_Pending]:
+    """
+    flush 조건이 될 때까지 기다렸다가 이번에 처리할 요청들을 큐에서 꺼냄
+    요청 1개의 이미지는 나누지 않음 (max_batch보다 큰 요청은 단독으로 처리, runner가 다시 batch_size로 자름)
+    """
+    with self._cond:
+      while not self._queue:
+        self._cond.wait()
+
+      deadline = self._queue[0].enqueued_at + self.max_wait
+      while True:
+        queued = sum(len(p.sources) for p in self._queue)
+        remaining = deadline - time.monotonic()
+        if queued >= self.max_batch or remaining <= 0:
+          break
+        self._cond.wait(remaining)
+
+      batch = [self._queue.popleft()]
+      size = len(batch[0].sources)
+      while self._queue and size + len(self._queue[0].sources) <= self.max_batch:
+        item = self._queue.popleft()
+        batch.append(item)
+        size += len(item.sources)
+      return batch
+
+  def _loop(self) -> None:
+    while True:
+      batch = self._take_batch()
+      self._run(batch)
+
+  def _run(self, batch: List[_Pending]) -> None:
+    merged = [s for p in batch for s in p.sources]
+    try:
+      results = self._runner(merged)
+      if len(results) != len(merged):
+        raise RuntimeError(
+          f"micro-batch result count mismatch: expected={len(merged)}, got={len(results)}"
+        )
+    except BaseException as e:
+      logger.exception("Micro-batch inference failed (requests=%s, images=%s)", len(batch), len(merged))
+      for p in batch:
+        p.future.set_exception(e)
+      return
+
+    pos = 0
+    for p in batch:
+      n = len(p.sources)
+      p.future.set_result(results[pos:pos + n])
+      pos += n
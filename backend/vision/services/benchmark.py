@@ -0,0 +1,83 @@
+# vision/services/benchmark.py
+from __future__ import annotations
+
+import math
+import resource
+import sys
+from typing import List, Optional, Sequence
+
+
+# 벤치마크/비교 management command 공용 측정 함수
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+  """
+  nearest-rank percentile (pct: 0~100)
+  """
+  if not values:
+    return None
+  ordered = sorted(values)
+  rank = max(1, math.ceil(pct / 100 * len(ordered)))
+  return ordered[min(rank, len(ordered)) - 1]
+
+
+def current_rss_mb() -> float:
+  """
+  현재 RSS (Linux /proc 기준, 없으면 0)
+  """
+  try:
+    with open("/proc/self/statm") as f:
+      rss_pages = int(f.read().split()[1])
+    return rss_pages * resource.getpagesize() / (1024 * 1024)
+  except (OSError, IndexError, ValueError):
+    return 0.0
+
+
+def peak_rss_mb() -> float:
+  """
+  프로세스 peak RSS (ru_maxrss: Linux는 KB, macOS는 bytes)
+  """
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  if sys.platform == "darwin":
+    return peak / (1024 * 1024)
+  return peak / 1024
+
+
+def bbox_iou(a: dict, b: dict) -> float:
+  """
+  normalized center xywh bbox 2개의 IoU
+  """
+  ax1, ay1 = a["x"] - a["w"] / 2, a["y"] - a["h"] / 2
+  ax2, ay2 = a["x"] + a["w"] / 2, a["y"] + a["h"] / 2
+  bx1, by1 = b["x"] - b["w"] / 2, b["y"] - b["h"] / 2
+  bx2, by2 = b["x"] + b["w"] / 2, b["y"] + b["h"] / 2
+
+  iw = max(0.0, min(ax2, bx2) - max(ax1, bx1))
+  ih = max(0.0, min(ay2, by2) - max(ay1, by1))
+  inter = iw * ih
+  union = a["w"] * a["h"] + b["w"] * b["h"] - inter
+  return inter / union if union > 0 else 0.0
+
+
+def match_detections(ref: List[dict], other: List[dict], iou_threshold: float) -> List[tuple]:
+  """
+  같은 yolo_id끼리 IoU 높은 순으로 1:1 매칭 (greedy)
+  return: [(ref_index, other_index, iou), ...]
+  """
+  candidates = []
+  for i, r in enumerate(ref):
+    for j, o in enumerate(other):
+      if r["yolo_id"] != o["yolo_id"]:
+        continue
+      iou = bbox_iou(r["bbox"], o["bbox"])
+      if iou >= iou_threshold:
+        candidates.append((iou, i, j))
+
+  used_ref, used_other, pairs = set(), set(), []
+  for iou, i, j in sorted(candidates, reverse=True):
+    if i in used_ref or j in used_other:
+      continue
+    used_ref.add(i)
+    used_other.add(j)
+    pairs.append((i, j, iou))
+  return pairs
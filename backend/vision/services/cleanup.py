@@ -0,0 +1,133 @@
+# vision/services/cleanup.py
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from typing import Callable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from vision.models import VisionImage
+
+logger = logging.getLogger(__name__)
+
+
+# 견적(EstimateRoom.vision_image)에 연결되지 않은 오래된 VisionImage 정리
+# - created_at이 TTL(VISION_GC_TTL_DAYS, 기본 7일)보다 오래됐고 estimate_rooms가 없는 이미지만 대상
+# - batch마다 트랜잭션 1개: select_for_update(skip_locked)로 잠근 행만 삭제 (VisionDetection은 CASCADE)
+#   견적 저장 중인 트랜잭션이 FK로 참조하고 있는 행은 잠겨 있으므로 건너뜀
+# - 스토리지 파일(원본 + 썸네일)은 commit 후에만 삭제 (롤백되면 파일도 그대로)
+# - 업로드 직후 이미지는 TTL 안쪽이므로 업로드/비동기 job과 겹치지 않음
+
+
+@dataclass
+class CleanupStats:
+  images: int = 0
+  detections: int = 0
+  files: int = 0
+  bytes_reclaimed: int = 0
+  batches: int = 0
+
+
+def get_ttl() -> timedelta:
+  return timedelta(days=float(getattr(settings, "VISION_GC_TTL_DAYS", 7)))
+
+
+def orphan_images(cutoff):
+  return VisionImage.objects.filter(created_at__lt=cutoff, estimate_rooms__isnull=True)
+
+
+def _file_names(vision_image: VisionImage) -> List[tuple]:
+  return [
+    (field_name, getattr(vision_image, field_name).name)
+    for field_name in ("image", "thumbnail")
+    if getattr(vision_image, field_name)
+  ]
+
+
+def _file_size(field_name: str, name: str) -> int:
+  # 이미 없어진 파일 등은 0으로 (원격 스토리지는 파일마다 HEAD 요청 1번)
+  try:
+    return VisionImage._meta.get_field(field_name).storage.size(name)
+  except Exception:
+    return 0
+
+
+def _delete_files(files: List[tuple], stats: CleanupStats) -> None:
+  for field_name, name, size in files:
+    try:
+      VisionImage._meta.get_field(field_name).storage.delete(name)
+    except Exception:
+      logger.warning("Failed to delete vision image file: %s", name)
+      continue
+    stats.files += 1
+    stats.bytes_reclaimed += size
+
+
+def collect_orphan_images(
+  *,
+  ttl: Optional[timedelta] = None,
+  batch_size: int = 500,
+  max_batches: int = 0,
+  sleep: float = 0.0,
+  dry_run: bool = False,
+  on_batch: Optional[Callable[[CleanupStats], None]] = None,
+) -> CleanupStats:
+  """
+  고아 이미지를 batch_size씩 삭제 (max_batches=0이면 끝까지)
+  dry_run이면 삭제 없이 대상 개수/파일 크기만 집계
+  sleep: batch 사이 대기 (초), 운영 DB/스토리지 부하 분산용
+  """
+  cutoff = timezone.now() - (ttl if ttl is not None else get_ttl())
+  stats = CleanupStats()
+  last_id = 0
+
+  while not max_batches or stats.batches < max_batches:
+    with transaction.atomic():
+      # 잠긴 행은 skip_locked로 건너뛰므로 id cursor로 진행 (같은 행을 다시 보지 않음)
+      # estimate_rooms__isnull은 LEFT JOIN -> 잠금은 vision_image 행에만 (of=self)
+      batch = list(
+        orphan_images(cutoff)
+        .filter(id__gt=last_id)
+        .select_for_update(skip_locked=True, of=("self",))
+        .only("id", "image", "thumbnail")
+        .order_by("id")[:batch_size]
+      )
+      if not batch:
+        break
+      last_id = batch[-1].id
+      stats.batches += 1
+
+      if not dry_run:
+        # 조회 이후 commit된 견적 참조가 있으면 제외 (삭제 직전 다시 확인)
+        # 파일도 실제로 삭제하는 행의 것만 (제외된 행의 파일을 지우면 견적 이미지가 깨짐)
+        ids = set(orphan_images(cutoff).filter(id__in=[v.id for v in batch]).values_list("id", flat=True))
+        batch = [vision_image for vision_image in batch if vision_image.id in ids]
+
+      files = [
+        (field_name, name, _file_size(field_name, name))
+        for vision_image in batch
+        for field_name, name in _file_names(vision_image)
+      ]
+
+      if dry_run:
+        stats.images += len(batch)
+        stats.files += len(files)
+        stats.bytes_reclaimed += sum(size for _, _, size in files)
+      elif batch:
+        _, deleted = VisionImage.objects.filter(id__in=ids).delete()
+        stats.images += deleted.get(VisionImage._meta.label, 0)
+        stats.detections += deleted.get("vision.VisionDetection", 0)
+        transaction.on_commit(lambda files=files: _delete_files(files, stats))
+
+    if on_batch is not None:
+      on_batch(stats)
+    if sleep > 0:
+      time.sleep(sleep)
+
+  logger.info("vision image cleanup %s: %s", "dry-run" if dry_run else "done", asdict(stats))
+  return stats
@@ -0,0 +1,277 @@
+# vision/services/detection_cache.py
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from config import metrics
+from vision.models import VisionDetectionCache
+
+from . import fake_model, tiling
+from .backends import get_backend, get_model_artifact_path, get_precision
+from .detections import to_cache_json
+from .image_io import get_decode_size
+
+# 같은 사진 재업로드 시 YOLO 추론 생략
+# 캐시 키 = 이미지 bytes SHA-256 + 모델 버전 + VISION_IMG_SIZE + VISION_CONF
+#          + 전처리 설정 (축소 디코딩 크기, tiled 추론 on/off와 tile 크기/overlap/분할 기준/NMS IoU)
+# 모델 버전은 로딩된 weight 기준 (로딩 전/추론 서버 worker는 조회 시점의 파일 기준) -> 재export/교체 후 재로딩하면 키 분리
+# 1차: Django cache (빠름, 만료 있음) / 2차: DB VisionDetectionCache (영구)
+# 저장 형태: detection dict 리스트(기존) 또는 columnar JSON(DetectionArrays.to_json)
+
+CACHE_PREFIX = "vision:detcache:"
+
+DETECTION_CACHE_LOOKUPS = metrics.counter(
+  "vision_detection_cache_lookups_total",
+  "탐지 결과 캐시 조회 수 (이미지 단위)",
+  labelnames=("result",),
+)
+STATS_HITS_KEY = "vision:detcache:stats:hits"
+STATS_MISSES_KEY = "vision:detcache:stats:misses"
+
+_stats_lock = threading.Lock()
+_local_stats = {"hits": 0, "misses": 0}
+
+
+def is_enabled() -> bool:
+  return bool(getattr(settings, "VISION_DETECTION_CACHE", True))
+
+
+def _get_timeout() -> int:
+  return int(getattr(settings, "VISION_DETECTION_CACHE_TIMEOUT", 60 * 60 * 24))
+
+
+def compute_sha256(uploaded) -> str:
+  """
+  업로드 파일(또는 이미 읽은 bytes)의 SHA-256
+  파일이면 chunk 단위로 읽어서 메모리 사용 최소화
+  """
+  if isinstance(uploaded, (bytes, bytearray)):
+    return hashlib.sha256(uploaded).hexdigest()
+
+  h = hashlib.sha256()
+  if hasattr(uploaded, "chunks"):
+    for chunk in uploaded.chunks():
+      h.update(chunk)
+  else:
+    h.update(uploaded.read())
+
+  # 이후 스토리지 저장 시 처음부터 읽도록 위치 복구
+  if hasattr(uploaded, "seek"):
+    uploaded.seek(0)
+  return h.hexdigest()
+
+
+# 현재 프로세스에 로딩된 모델의 버전 (model_inference가 로딩할 때 설정, reset_model에서 해제)
+_loaded_model_version: Optional[str] = None
+
+
+def compute_model_version() -> str:
+  """
+  모델 파일 기준 버전 문자열 (호출 시점의 파일 상태)
+  - settings.VISION_MODEL_VERSION 이 있으면 backend + 정밀도(fp32/fp16/int8)와 함께 사용
+  - 없으면 backend + 정밀도 + 모델 파일 이름/크기/수정시각으로 생성 (모델/backend 교체, 재export 시 캐시 자동 분리)
+  """
+  if fake_model.is_enabled():
+    # 벤치마크용 가짜 모델 결과가 실제 모델 캐시와 섞이지 않도록
+    return "fake"
+
+  backend = get_backend()
+  precision = get_precision()
+  version = getattr(settings, "VISION_MODEL_VERSION", None)
+  if version:
+    # 같은 모델이라도 정밀도별 결과가 다르므로 분리
+    return f"{backend}:{precision}:{version}"
+
+  path = str(get_model_artifact_path(backend))
+  try:
+    st = os.stat(path)
+  except OSError:
+    return f"{backend}:{precision}:{os.path.basename(path) or 'unknown'}"
+  return f"{backend}:{precision}:{os.path.basename(path)}:{st.st_size}:{int(st.st_mtime)}"
+
+
+def set_loaded_model_version(version: Optional[str]) -> None:
+  global _loaded_model_version
+  _loaded_model_version = version
+
+
+def get_model_version() -> str:
+  """
+  캐시 키에 쓰는 모델 버전
+  - 이 프로세스에 모델이 로딩되어 있으면 로딩 시점의 버전 (실제로 추론하는 weight 기준)
+    파일이 교체되어도 다시 로딩(reset_model)하기 전까지는 이전 weight로 추론하므로 이전 키 유지
+  - 아니면(첫 추론 전, 추론 서버 모드의 worker) 조회 시점의 파일 기준 (os.stat 1번)
+  """
+  return _loaded_model_version or compute_model_version()
+
+
+def _inference_params() -> Dict[str, Any]:
+  return {
+    "model_version": get_model_version(),
+    "img_size": int(getattr(settings, "VISION_IMG_SIZE", 640)),
+    "conf": float(getattr(settings, "VISION_CONF", 0.25)),
+  }
+
+
+def _preprocess_params() -> str:
+  """
+  같은 사진이라도 결과가 달라지는 전처리 설정 (VisionDetectionCache 컬럼은 없고 키에만 포함)
+  """
+  if not tiling.is_enabled():
+    return f"decode={get_decode_size()}|tile=off"
+  t = tiling.get_tile_settings()
+  return f"decode={get_decode_size()}|tile={t.min_side}:{t.tile_size}:{t.overlap}:{t.nms_iou}"
+
+
+def build_cache_key(content_sha256: str, params: Optional[Dict[str, Any]] = None) -> str:
+  # 여러 장을 한 번에 처리할 때는 params를 한 번만 계산해서 넘김
+  params = params or _inference_params()
+  raw = f"{content_sha256}|{params['model_version']}|{params['img_size']}|{params['conf']}|{_preprocess_params()}"
+  return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _count(name: str, n: int = 1) -> None:
+  if n <= 0:
+    return
+
+  with _stats_lock:
+    _local_stats[name] += n
+  DETECTION_CACHE_LOOKUPS.inc(n, result="hit" if name == "hits" else "miss")
+
+  # 여러 worker 합산용 (공유 cache backend일 때만 의미 있음)
+  key = STATS_HITS_KEY if name == "hits" else STATS_MISSES_KEY
+  try:
+    cache.incr(key, n)
+  except ValueError:
+    cache.add(key, 0, timeout=None)
+    try:
+      cache.incr(key, n)
+    except ValueError:
+      pass
+
+
+def get_cached_detections_many(content_sha256s: List[str]) -> List[Optional[List[Dict[str, Any]]]]:
+  """
+  여러 이미지의 캐시된 탐지 결과 조회 (요청 이미지 수와 관계없이 DB 조회 1번 + hit 갱신 1번)
+  return: 입력 순서대로 탐지 결과 리스트 (hit) / None (miss)
+  """
+  if not is_enabled():
+    return [None] * len(content_sha256s)
+
+  params = _inference_params()
+  keys = [build_cache_key(sha, params) if sha else None for sha in content_sha256s]
+  wanted = {k for k in keys if k}
+  if not wanted:
+    return [None] * len(content_sha256s)
+
+  # 1차: Django cache
+  found: Dict[str, Any] = {
+    k[len(CACHE_PREFIX):]: v
+    for k, v in cache.get_many([CACHE_PREFIX + k for k in wanted]).items()
+  }
+
+  # 2차: DB
+  missing = wanted - set(found)
+  if missing:
+    from_db = dict(
+      VisionDetectionCache.objects
+      .filter(cache_key__in=missing)
+      .values_list("cache_key", "detections")
+    )
+    if from_db:
+      cache.set_many({CACHE_PREFIX + k: v for k, v in from_db.items()}, timeout=_get_timeout())
+      found.update(from_db)
+
+  if found:
+    VisionDetectionCache.objects.filter(cache_key__in=list(found)).update(
+      hit_count=F("hit_count") + 1,
+      last_hit_at=timezone.now(),
+    )
+
+  out = [found.get(k) if k else None for k in keys]
+  hits = sum(1 for d in out if d is not None)
+  _count("hits", hits)
+  _count("misses", len(out) - hits)
+  return out
+
+
+def get_cached_detections(content_sha256: str) -> Optional[List[Dict[str, Any]]]:
+  """
+  캐시된 탐지 결과 조회 (단건)
+  return: 탐지 결과 리스트 (hit) / None (miss)
+  """
+  if not content_sha256:
+    return None
+  return get_cached_detections_many([content_sha256])[0]
+
+
+def store_detections_many(items: List[Tuple[str, Any]]) -> None:
+  """
+  추론 결과들을 DB(bulk_create 1번) + Django cache에 저장
+  동시 요청이 같은 사진을 먼저 저장했으면(unique 충돌) 무시
+  DetectionArrays는 columnar JSON으로 저장 (읽을 때는 detections.iter_detection_rows로 두 형태 모두 처리)
+  """
+  if not is_enabled():
+    return
+
+  params = _inference_params()
+  rows: Dict[str, VisionDetectionCache] = {}
+  for content_sha256, detections in items:
+    if not content_sha256:
+      continue
+    key = build_cache_key(content_sha256, params)
+    rows[key] = VisionDetectionCache(
+      cache_key=key,
+      content_sha256=content_sha256,
+      detections=to_cache_json(detections),
+      **params,
+    )
+
+  if not rows:
+    return
+
+  VisionDetectionCache.objects.bulk_create(list(rows.values()), ignore_conflicts=True)
+  cache.set_many({CACHE_PREFIX + k: row.detections for k, row in rows.items()}, timeout=_get_timeout())
+
+
+def store_detections(content_sha256: str, detections: Any) -> None:
+  """
+  추론 결과 저장 (단건)
+  """
+  store_detections_many([(content_sha256, detections)])
+
+
+def get_cache_stats() -> Dict[str, Any]:
+  """
+  캐시 hit/miss 카운터
+  - process: 현재 프로세스 누적
+  - shared: Django cache 누적 (공유 cache backend면 전체 worker 합산)
+  """
+  with _stats_lock:
+    local = dict(_local_stats)
+
+  shared_hits = cache.get(STATS_HITS_KEY) or 0
+  shared_misses = cache.get(STATS_MISSES_KEY) or 0
+
+  def _ratio(hits: int, misses: int) -> Optional[float]:
+    total = hits + misses
+    return round(hits / total, 4) if total else None
+
+  return {
+    "enabled": is_enabled(),
+    "model_version": get_model_version(),
+    "process": {**local, "hit_ratio": _ratio(local["hits"], local["misses"])},
+    "shared": {
+      "hits": shared_hits,
+      "misses": shared_misses,
+      "hit_ratio": _ratio(shared_hits, shared_misses),
+    },
+  }
@@ -0,0 +1,274 @@
+# vision/services/detection_storage.py
+from __future__ import annotations
+
+import logging
+import math
+import struct
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .yolo_to_furniture import get_furniture_payload, get_furniture_payload_by_id
+
+logger = logging.getLogger(__name__)
+
+
+# 탐지 결과 저장 방식 (VISION_DETECTION_STORAGE)
+# - "rows"(기본): 박스마다 VisionDetection 1행 (DecimalField 5개 + 인덱스 4개)
+# - "packed": 이미지마다 VisionImage.detections_packed 1개 (박스당 26 bytes, 인덱스 없음)
+#   header <BI (format 버전, 박스 수 N)
+#   int16[N] yolo_id (-1: 없음, 실외기) / int32[N] furniture_id / float32[N] confidence (NaN: 없음)
+#   float32[N*4] bbox normalized center x, center y, w, h (NaN: 없음)
+# 읽기는 저장 방식과 관계없이 get_image_detections / get_detections_many 사용 (응답 dict 형태 동일, 두 방식이 섞여 있어도 됨)
+# detection_id는 저장 방식과 관계없이 정수 (프론트 estimateStore.js가 항목 id로 사용)
+# - rows: VisionDetection id (양수)
+# - packed: -(vision_image_id * 65536 + 박스 순번) (DB 행 id가 없으므로 VisionDetection id와 겹치지 않는 음수)
+# 기존 데이터 변환: 설정을 바꾼 뒤 convert_vision_detections 명령 (마이그레이션 0010은 컬럼 추가만)
+
+STORAGE_ROWS = "rows"
+STORAGE_PACKED = "packed"
+STORAGE_MODES = (STORAGE_ROWS, STORAGE_PACKED)
+
+PACK_VERSION = 1
+
+# packed detection_id의 이미지별 간격 (이미지당 박스 수 상한)
+PACKED_ID_STRIDE = 1 << 16
+
+_HEADER = struct.Struct("<BI")
+
+# (yolo_id, furniture_id, confidence, (x, y, w, h)) - None 허용
+PackedRow = Tuple[Optional[int], Optional[int], Optional[float], Tuple[Optional[float], ...]]
+
+
+def get_storage_mode() -> str:
+  mode = str(getattr(settings, "VISION_DETECTION_STORAGE", STORAGE_ROWS)).lower()
+  if mode not in STORAGE_MODES:
+    raise ValueError(f"Invalid VISION_DETECTION_STORAGE: {mode} (choices={', '.join(STORAGE_MODES)})")
+  return mode
+
+
+def _f(value) -> float:
+  return math.nan if value is None else float(value)
+
+
+def _none_if_nan(value: float, digits: int) -> Optional[float]:
+  # DecimalField 저장(rows)과 같은 자릿수로 반올림 (float32 오차 제거)
+  return None if math.isnan(value) else round(value, digits)
+
+
+def pack_rows(rows: Sequence[PackedRow]) -> bytes:
+  n = len(rows)
+  if n >= PACKED_ID_STRIDE:
+    raise ValueError(f"Too many detections to pack: {n} (max={PACKED_ID_STRIDE - 1})")
+  yolo_ids = [-1 if r[0] is None else int(r[0]) for r in rows]
+  furniture_ids = [-1 if r[1] is None else int(r[1]) for r in rows]
+  confidences = [_f(r[2]) for r in rows]
+  bboxes = [_f(v) for r in rows for v in (r[3] or (None,) * 4)]
+
+  return _HEADER.pack(PACK_VERSION, n) + struct.pack(
+    f"<{n}h{n}i{n}f{4 * n}f", *yolo_ids, *furniture_ids, *confidences, *bboxes,
+  )
+
+
+def unpack_rows(data: bytes) -> List[PackedRow]:
+  data = bytes(data)  # PostgreSQL BinaryField는 memoryview
+  version, n = _HEADER.unpack_from(data)
+  if version != PACK_VERSION:
+    raise ValueError(f"Unsupported packed detections version: {version}")
+
+  values = struct.unpack_from(f"<{n}h{n}i{n}f{4 * n}f", data, _HEADER.size)
+  yolo_ids, furniture_ids = values[:n], values[n:2 * n]
+  confidences, bboxes = values[2 * n:3 * n], values[3 * n:]
+
+  rows: List[PackedRow] = []
+  for i in range(n):
+    bbox = tuple(_none_if_nan(v, 6) for v in bboxes[4 * i:4 * i + 4])
+    rows.append((
+      None if yolo_ids[i] < 0 else yolo_ids[i],
+      None if furniture_ids[i] < 0 else furniture_ids[i],
+      _none_if_nan(confidences[i], 5),
+      bbox,
+    ))
+  return rows
+
+
+def packed_detection_id(vision_image_id: int, index: int) -> int:
+  return -(vision_image_id * PACKED_ID_STRIDE + index)
+
+
+def packed_count(data: bytes) -> int:
+  """
+  packed 레코드의 박스 수 (header만 읽음)
+  """
+  return _HEADER.unpack_from(bytes(data[:_HEADER.size]))[1]
+
+
+def _detection_dict(payload, detection_id, confidence, bbox) -> Dict[str, Any]:
+  out = dict(payload)
+  # 중첩 dict도 detection마다 복사 (응답 dict를 수정해도 다른 detection/캐시된 payload에 영향 없도록)
+  if out["guide_size_cm"] is not None:
+    out["guide_size_cm"] = dict(out["guide_size_cm"])
+  out["detection_id"] = detection_id
+  out["confidence"] = confidence
+  out["bbox"] = None if bbox is None or None in bbox else dict(zip(("x", "y", "w", "h"), bbox))
+  return out
+
+
+def serialize_detection(vd, furniture) -> Dict[str, Any]:
+  """
+  프론트에서 사용할 detection 응답 형태로 변환
+  가구 관련 필드는 미리 만들어 둔 가구별 payload를 복사하고 detection 필드(id, confidence, bbox)만 채움
+  """
+  bbox = (vd.bbox_x, vd.bbox_y, vd.bbox_w, vd.bbox_h)
+  return _detection_dict(
+    get_furniture_payload(furniture),
+    vd.id,
+    float(vd.confidence) if vd.confidence is not None else None,
+    None if None in bbox else tuple(float(v) for v in bbox),
+  )
+
+
+def packed_to_dicts(vision_image_id: int, data: bytes) -> List[Dict[str, Any]]:
+  """
+  packed 레코드 -> detection 응답 dict 리스트 (rows 저장과 같은 형태)
+  가구가 삭제된 박스는 제외 (rows 저장에서 furniture가 SET_NULL 된 경우와 동일하게 취급)
+  """
+  out: List[Dict[str, Any]] = []
+  for index, (_, furniture_id, confidence, bbox) in enumerate(unpack_rows(data)):
+    payload = get_furniture_payload_by_id(furniture_id) if furniture_id is not None else None
+    if payload is None:
+      continue
+    out.append(_detection_dict(payload, packed_detection_id(vision_image_id, index), confidence, bbox))
+  return out
+
+
+def rows_to_packed(rows: Iterable[tuple]) -> bytes:
+  """
+  _build_detection_rows 결과 [(VisionDetection(저장 전), Furniture), ...] -> packed 레코드
+  """
+  return pack_rows([
+    (vd.yolo_id, furniture.id, vd.confidence, (vd.bbox_x, vd.bbox_y, vd.bbox_w, vd.bbox_h))
+    for vd, furniture in rows
+  ])
+
+
+# ====================================
+# 읽기 API (저장 방식과 관계없이 같은 dict)
+# ====================================
+def get_detections_many(vision_images) -> Dict[int, List[Dict[str, Any]]]:
+  """
+  VisionImage 여러 개의 detection 응답 dict (packed 레코드가 있으면 사용, 없으면 VisionDetection 행)
+  행 조회는 전체 1번
+  return: {vision_image_id: [detection dict, ...]}
+  """
+  from vision.models import VisionDetection
+
+  out: Dict[int, List[Dict[str, Any]]] = {}
+  row_image_ids = []
+  for vision_image in vision_images:
+    if vision_image.detections_packed is not None:
+      out[vision_image.id] = packed_to_dicts(vision_image.id, vision_image.detections_packed)
+    else:
+      out[vision_image.id] = []
+      row_image_ids.append(vision_image.id)
+
+  if row_image_ids:
+    qs = (
+      VisionDetection.objects.filter(vision_image_id__in=row_image_ids, furniture__isnull=False)
+      .select_related("furniture")
+      .order_by("vision_image_id", "id")
+    )
+    for vd in qs:
+      out[vd.vision_image_id].append(serialize_detection(vd, vd.furniture))
+  return out
+
+
+def get_image_detections(vision_image) -> List[Dict[str, Any]]:
+  return get_detections_many([vision_image])[vision_image.id]
+
+
+# ====================================
+# 기존 데이터 변환 (convert_vision_detections 명령)
+# ====================================
+def convert_rows_to_packed(VisionImage, VisionDetection, batch_size: int = 500) -> int:
+  """
+  VisionDetection 행 -> VisionImage.detections_packed, 변환한 이미지의 행은 삭제
+  이미지 batch_size개마다 트랜잭션 1개 (큰 테이블도 긴 트랜잭션 없이 진행)
+  return: 변환한 이미지 수
+  """
+  converted = 0
+  last_id = 0
+  while True:
+    image_ids = list(
+      VisionDetection.objects.filter(vision_image_id__gt=last_id)
+      .order_by("vision_image_id")
+      .values_list("vision_image_id", flat=True)
+      .distinct()[:batch_size]
+    )
+    if not image_ids:
+      break
+    last_id = image_ids[-1]
+
+    with transaction.atomic():
+      rows = defaultdict(list)
+      for yolo_id, furniture_id, confidence, x, y, w, h, image_id in (
+        VisionDetection.objects.filter(vision_image_id__in=image_ids)
+        .order_by("vision_image_id", "id")
+        .values_list("yolo_id", "furniture_id", "confidence", "bbox_x", "bbox_y", "bbox_w", "bbox_h", "vision_image_id")
+      ):
+        rows[image_id].append((yolo_id, furniture_id, confidence, (x, y, w, h)))
+
+      images = list(VisionImage.objects.filter(id__in=image_ids).only("id"))
+      for vision_image in images:
+        vision_image.detections_packed = pack_rows(rows[vision_image.id])
+      VisionImage.objects.bulk_update(images, ["detections_packed"])
+      VisionDetection.objects.filter(vision_image_id__in=image_ids).delete()
+    converted += len(images)
+
+  return converted
+
+
+def convert_packed_to_rows(VisionImage, VisionDetection, Furniture, batch_size: int = 500) -> int:
+  """
+  packed -> VisionDetection 행 (되돌리기)
+  yolo_class는 packed에 없으므로 가구 name_en으로 채움
+  return: 변환한 이미지 수
+  """
+  converted = 0
+  last_id = 0
+  while True:
+    images = list(
+      VisionImage.objects.filter(id__gt=last_id, detections_packed__isnull=False)
+      .order_by("id")
+      .only("id", "detections_packed")[:batch_size]
+    )
+    if not images:
+      break
+    last_id = images[-1].id
+
+    unpacked = {vision_image.id: unpack_rows(vision_image.detections_packed) for vision_image in images}
+    furniture_ids = {r[1] for rows in unpacked.values() for r in rows if r[1] is not None}
+    names = dict(Furniture.objects.filter(id__in=furniture_ids).values_list("id", "name_en"))
+
+    with transaction.atomic():
+      VisionDetection.objects.bulk_create([
+        VisionDetection(
+          vision_image_id=image_id,
+          yolo_id=yolo_id,
+          yolo_class=names.get(furniture_id),
+          furniture_id=furniture_id if furniture_id in names else None,
+          confidence=confidence,
+          bbox_x=bbox[0],
+          bbox_y=bbox[1],
+          bbox_w=bbox[2],
+          bbox_h=bbox[3],
+        )
+        for image_id, rows in unpacked.items()
+        for yolo_id, furniture_id, confidence, bbox in rows
+      ])
+      VisionImage.objects.filter(id__in=list(unpacked)).update(detections_packed=None)
+    converted += len(images)
+
+  return converted
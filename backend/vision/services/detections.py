@@ -0,0 +1,258 @@
+# vision/services/detections.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+
+# 이미지 1장의 탐지 결과 (columnar)
+# - 후처리(픽셀 xyxy -> normalized xywh)를 박스 전체에 대해 배열 연산 1번으로 처리
+# - batch/bulk insert 쪽은 rows()로 박스별 dict 생성 없이 바로 사용
+# - 기존 dict 형태가 필요하면 to_dicts() (파이썬 변환은 배열마다 tolist() 1번)
+
+DetectionRow = Tuple[int, str, float, Tuple[float, float, float, float]]
+
+
+@dataclass(frozen=True)
+class DetectionArrays:
+  yolo_ids: Any      # (N,) int64
+  confidences: Any   # (N,) float32
+  bboxes: Any        # (N, 4) float64, normalized center x, center y, w, h (0~1)
+  names: Dict[int, str]
+
+  def __len__(self) -> int:
+    return len(self.yolo_ids)
+
+  @classmethod
+  def empty(cls, names: Dict[int, str] = None) -> "DetectionArrays":
+    return cls(
+      yolo_ids=np.zeros((0,), dtype=np.int64),
+      confidences=np.zeros((0,), dtype=np.float32),
+      bboxes=np.zeros((0, 4), dtype=np.float64),
+      names=names or {},
+    )
+
+  @classmethod
+  def from_xyxy(cls, xyxy, class_ids, confidences, names: Dict[int, str], img_w: int, img_h: int) -> "DetectionArrays":
+    """
+    픽셀 xyxy (N,4) -> normalized center xywh (N,4), 박스 전체를 한 번에 계산
+    """
+    xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)
+    wh = np.clip(xyxy[:, 2:4] - xyxy[:, 0:2], 0.0, None)
+    centers = xyxy[:, 0:2] + wh / 2
+    scale = np.array([img_w, img_h, img_w, img_h], dtype=np.float64)
+    bboxes = np.concatenate([centers, wh], axis=1) / scale
+
+    return cls(
+      yolo_ids=np.asarray(class_ids).astype(np.int64).reshape(-1),
+      confidences=np.asarray(confidences, dtype=np.float32).reshape(-1),
+      bboxes=bboxes,
+      names=names,
+    )
+
+  def rows(self) -> Iterator[DetectionRow]:
+    """
+    (yolo_id, yolo_class, confidence, (x, y, w, h)) 튜플 iterator
+    """
+    names = self.names
+    for class_id, cf, bbox in zip(self.yolo_ids.tolist(), self.confidences.tolist(), self.bboxes.tolist()):
+      # bbox NaN: 좌표 없음 (영상에서 저장되지 않은 keyframe의 탐지)
+      yield class_id, names.get(class_id, str(class_id)), cf, tuple(bbox) if bbox[0] == bbox[0] else (None,) * 4
+
+  def to_dicts(self) -> List[Dict[str, Any]]:
+    """
+    run_vision_inference 기존 반환 형태
+    """
+    return [
+      {
+        "yolo_id": class_id,
+        "yolo_class": class_name,
+        "confidence": cf,
+        "bbox": {"x": x, "y": y, "w": w, "h": h},
+      }
+      for class_id, class_name, cf, (x, y, w, h) in self.rows()
+    ]
+
+  def to_json(self) -> Dict[str, Any]:
+    """
+    JSON 저장용 columnar 형태 (탐지 캐시)
+    """
+    ids = self.yolo_ids.tolist()
+    return {
+      "yolo_id": ids,
+      "yolo_class": [self.names.get(i, str(i)) for i in ids],
+      "confidence": self.confidences.tolist(),
+      # JSON에는 NaN이 없으므로 None (from_json에서 다시 NaN)
+      "bbox": [bbox if bbox[0] == bbox[0] else [None] * 4 for bbox in self.bboxes.tolist()],
+    }
+
+  @classmethod
+  def from_json(cls, data: Dict[str, Any]) -> "DetectionArrays":
+    ids = data.get("yolo_id") or []
+    if not ids:
+      return cls.empty()
+    return cls(
+      yolo_ids=np.asarray(ids, dtype=np.int64),
+      confidences=np.asarray(data.get("confidence") or [], dtype=np.float32),
+      bboxes=np.asarray(data.get("bbox") or [], dtype=np.float64).reshape(-1, 4),
+      names=dict(zip(ids, data.get("yolo_class") or [])),
+    )
+
+
+def iter_detection_rows(detections) -> Iterator[DetectionRow]:
+  """
+  DetectionArrays / dict 리스트 / columnar JSON 어떤 형태든 같은 row 튜플로 순회
+  """
+  if isinstance(detections, DetectionArrays):
+    yield from detections.rows()
+    return
+
+  if isinstance(detections, dict):
+    yield from DetectionArrays.from_json(detections).rows()
+    return
+
+  for det in detections or []:
+    raw_class = det.get("yolo_class")
+    bbox = det.get("bbox") or {}
+    yield (
+      det.get("yolo_id"),
+      str(raw_class) if raw_class is not None else None,
+      det.get("confidence"),
+      (bbox.get("x"), bbox.get("y"), bbox.get("w"), bbox.get("h")),
+    )
+
+
+def to_cache_json(detections) -> Any:
+  """
+  탐지 캐시(JSONField) 저장 형태: DetectionArrays면 columnar JSON, dict 리스트는 그대로
+  """
+  if isinstance(detections, DetectionArrays):
+    return detections.to_json()
+  return detections
+
+
+def as_detection_arrays(detections) -> DetectionArrays:
+  """
+  어떤 형태의 탐지 결과든 DetectionArrays로 변환 (이미 DetectionArrays면 그대로)
+  """
+  if isinstance(detections, DetectionArrays):
+    return detections
+  if isinstance(detections, dict):
+    return DetectionArrays.from_json(detections)
+
+  rows = [row for row in iter_detection_rows(detections) if row[0] is not None]
+  if not rows:
+    return DetectionArrays.empty()
+  return DetectionArrays(
+    yolo_ids=np.asarray([r[0] for r in rows], dtype=np.int64),
+    confidences=np.asarray([r[2] or 0.0 for r in rows], dtype=np.float32),
+    bboxes=np.asarray([r[3] for r in rows], dtype=np.float64).reshape(-1, 4),
+    names={r[0]: r[1] for r in rows},
+  )
+
+
+MERGE_RULES = ("max", "sum")
+
+# (source 번호, source 안 index, [같은 물건으로 보고 합쳐진 다른 source의 (source 번호, index), ...])
+MergedPick = Tuple[int, int, List[Tuple[int, int]]]
+
+
+def select_merged(
+  keys_list: Sequence[Sequence[str]],
+  confidences_list: Sequence[Sequence[Optional[float]]],
+  rules: Optional[Dict[str, str]] = None,
+  default_rule: str = "max",
+) -> List[MergedPick]:
+  """
+  같은 공간을 찍은 여러 장(영상 keyframe, 같은 방 사진들)의 탐지 중 남길 것 선택
+  keys_list: 장마다 탐지별 class 이름, confidences_list: 장마다 탐지별 confidence (None은 0으로)
+  class별 규칙 (rules: {class 이름: "max" | "sum"}, 없으면 default_rule)
+  - max: 한 장에서 가장 많이 보인 개수만 인정 -> 그 장의 탐지 사용 (개수가 같으면 confidence 합이 큰 장)
+         다른 장의 같은 class 탐지는 confidence 순위가 같은 것끼리 같은 물건으로 보고 합쳐짐
+  - sum: 모든 장의 탐지를 그대로 (장마다 서로 다른 물건이 찍히는 class)
+  return: class 첫 등장 순서, class 안에서는 confidence 높은 순
+  """
+  rules = rules or {}
+
+  # class -> 장마다 탐지 index (confidence 높은 순)
+  by_key: Dict[str, List[List[int]]] = {}
+  for source, keys in enumerate(keys_list):
+    for index, key in enumerate(keys):
+      by_key.setdefault(key, [[] for _ in keys_list])[source].append(index)
+
+  def conf(source: int, index: int) -> float:
+    return float(confidences_list[source][index] or 0.0)
+
+  picked: List[MergedPick] = []
+  for key, per_source in by_key.items():
+    rule = rules.get(key, default_rule)
+    if rule not in MERGE_RULES:
+      raise ValueError(f"Invalid merge rule: {rule} (choices={', '.join(MERGE_RULES)})")
+
+    for source, indices in enumerate(per_source):
+      indices.sort(key=lambda i: -conf(source, i))
+
+    if rule == "sum":
+      picked.extend((source, i, []) for source, indices in enumerate(per_source) for i in indices)
+      continue
+
+    best = max(
+      range(len(per_source)),
+      key=lambda s: (len(per_source[s]), sum(conf(s, i) for i in per_source[s])),
+    )
+    for rank, index in enumerate(per_source[best]):
+      absorbed = [
+        (source, indices[rank])
+        for source, indices in enumerate(per_source)
+        if source != best and rank < len(indices)
+      ]
+      picked.append((best, index, absorbed))
+
+  return picked
+
+
+def merge_detections(
+  detections_list: List[Any],
+  rules: Optional[Dict[str, str]] = None,
+  default_rule: str = "max",
+  bbox_source: Optional[int] = None,
+) -> DetectionArrays:
+  """
+  여러 장의 탐지 결과 -> 하나의 DetectionArrays (select_merged 규칙, class 이름은 yolo_class)
+  bbox는 탐지가 나온 장 기준 좌표 그대로
+  bbox_source: 지정하면 그 장에서 고른 탐지만 bbox를 남기고 나머지는 NaN (좌표를 보여줄 이미지가 그 장뿐인 경우)
+  """
+  arrays_list = [as_detection_arrays(d) for d in detections_list]
+
+  names: Dict[int, str] = {}
+  for arrays in arrays_list:
+    names.update(arrays.names)
+
+  picked = select_merged(
+    [[names.get(i, str(i)) for i in arrays.yolo_ids.tolist()] for arrays in arrays_list],
+    [arrays.confidences.tolist() for arrays in arrays_list],
+    rules=rules,
+    default_rule=default_rule,
+  )
+  if not picked:
+    return DetectionArrays.empty(names)
+
+  yolo_ids = np.asarray([arrays_list[s].yolo_ids[i] for s, i, _ in picked], dtype=np.int64)
+  confidences = np.asarray([arrays_list[s].confidences[i] for s, i, _ in picked], dtype=np.float32)
+  bboxes = np.asarray([arrays_list[s].bboxes[i] for s, i, _ in picked], dtype=np.float64).reshape(-1, 4)
+  if bbox_source is not None:
+    bboxes[[s != bbox_source for s, _, _ in picked]] = np.nan
+
+  # class id 순, class 안에서는 confidence 높은 순
+  order = np.lexsort((-confidences, yolo_ids))
+  return DetectionArrays(
+    yolo_ids=yolo_ids[order],
+    confidences=confidences[order],
+    bboxes=bboxes[order],
+    names=names,
+  )
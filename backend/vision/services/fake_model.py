@@ -0,0 +1,129 @@
+# vision/services/fake_model.py
+from __future__ import annotations
+
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+
+# 실제 weight 없이 파이프라인 오버헤드를 측정하기 위한 가짜 YOLO
+# - ultralytics YOLO와 같은 predict()/Results 인터페이스 (model_inference, tiling에서 그대로 사용)
+# - 이미지 내용(bytes/픽셀)으로 seed를 정하므로 같은 이미지면 항상 같은 탐지 결과
+# - class 목록은 Furniture.yolo_id 기준 (DB가 비어있으면 class_0 ~ class_9)
+# VISION_FAKE_MODEL=True 또는 bench_vision --fake 로 사용
+
+DEFAULT_CLASS_COUNT = 10
+
+
+def is_enabled() -> bool:
+  return bool(getattr(settings, "VISION_FAKE_MODEL", False))
+
+
+class _Tensor:
+  # torch.Tensor 대신 .cpu().numpy()만 흉내
+  def __init__(self, arr):
+    self._arr = arr
+
+  def cpu(self):
+    return self
+
+  def numpy(self):
+    return self._arr
+
+
+class _FakeBoxes:
+  def __init__(self, xyxy, cls, conf):
+    self.xyxy = _Tensor(xyxy)
+    self.cls = _Tensor(cls)
+    self.conf = _Tensor(conf)
+
+  def __len__(self) -> int:
+    return len(self.cls.numpy())
+
+
+class _FakeResults:
+  def __init__(self, boxes: _FakeBoxes, names: Dict[int, str], orig_shape):
+    self.boxes = boxes
+    self.names = names
+    self.orig_shape = orig_shape
+
+
+def _default_names() -> Dict[int, str]:
+  try:
+    from .yolo_to_furniture import _build_furniture_maps
+    by_yolo_id = _build_furniture_maps().by_yolo_id
+  except Exception:
+    by_yolo_id = {}
+
+  if by_yolo_id:
+    return {yolo_id: f.name_en for yolo_id, f in sorted(by_yolo_id.items())}
+  return {i: f"class_{i}" for i in range(DEFAULT_CLASS_COUNT)}
+
+
+class FakeYOLO:
+  """
+  latency_ms: 이미지 1장당 sleep 시간 (실제 모델 연산 시간 흉내, 기본 VISION_FAKE_MODEL_LATENCY_MS=0)
+  max_boxes: 이미지당 최대 탐지 수
+  """
+
+  def __init__(self, names: Optional[Dict[int, str]] = None, latency_ms: Optional[float] = None, max_boxes: int = 8):
+    self._names = names
+    if latency_ms is None:
+      latency_ms = float(getattr(settings, "VISION_FAKE_MODEL_LATENCY_MS", 0))
+    self.latency_ms = max(0.0, latency_ms)
+    self.max_boxes = max(0, int(max_boxes))
+
+  @property
+  def names(self) -> Dict[int, str]:
+    if self._names is None:
+      self._names = _default_names()
+    return self._names
+
+  def to(self, device):
+    return self
+
+  def _seed_and_shape(self, source):
+    if hasattr(source, "shape"):
+      # 전체 픽셀을 해싱하면 측정 대상보다 비싸지므로 격자 샘플만 사용
+      sample = np.ascontiguousarray(source[::16, ::16])
+      return zlib.crc32(sample.tobytes()), source.shape[:2]
+
+    from PIL import Image
+
+    path = Path(str(source))
+    data = path.read_bytes()
+    with Image.open(path) as img:
+      w, h = img.size
+    return zlib.crc32(data), (h, w)
+
+  def _predict_one(self, source, conf: float) -> _FakeResults:
+    seed, (h, w) = self._seed_and_shape(source)
+    rng = np.random.default_rng(seed)
+    class_ids = np.array(sorted(self.names), dtype=np.int64)
+
+    n = int(rng.integers(0, self.max_boxes + 1)) if len(class_ids) else 0
+    x1 = rng.uniform(0, w * 0.8, n)
+    y1 = rng.uniform(0, h * 0.8, n)
+    x2 = np.minimum(w, x1 + rng.uniform(w * 0.05, w * 0.4, n))
+    y2 = np.minimum(h, y1 + rng.uniform(h * 0.05, h * 0.4, n))
+    xyxy = np.stack([x1, y1, x2, y2], axis=1).astype(np.float32) if n else np.zeros((0, 4), dtype=np.float32)
+    cls = rng.choice(class_ids, n) if n else np.zeros((0,), dtype=np.int64)
+    confs = rng.uniform(0.05, 0.99, n).astype(np.float32)
+
+    keep = confs >= conf
+    boxes = _FakeBoxes(xyxy[keep], cls[keep].astype(np.float32), confs[keep])
+    return _FakeResults(boxes, self.names, (h, w))
+
+  def predict(self, source=None, conf: float = 0.25, **kwargs) -> List[_FakeResults]:
+    sources: List[Any] = source if isinstance(source, (list, tuple)) else [source]
+    if self.latency_ms:
+      time.sleep(self.latency_ms * len(sources) / 1000)
+    return [self._predict_one(s, conf) for s in sources]
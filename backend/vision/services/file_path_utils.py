@@ -1,41 +1,115 @@
+import io
 import os
+import shutil
 import tempfile
 from contextlib import contextmanager
 
+from django.conf import settings
+
+from .image_io import decode_image
+
+# 원격 스토리지 다운로드 설정
+# - VISION_INFER_CHUNK_SIZE: 한 번에 읽는 크기 (기본 256KB)
+# - VISION_INFER_SPOOL_MAX_BYTES: 이 크기 이하면 임시파일 없이 메모리에서 디코딩 (기본 4MB, 0이면 항상 임시파일)
+DEFAULT_CHUNK_SIZE = 256 * 1024
+DEFAULT_SPOOL_MAX_BYTES = 4 * 1024 * 1024
+
+
+def _get_chunk_size() -> int:
+  return max(4096, int(getattr(settings, "VISION_INFER_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)))
+
+
+def _get_spool_max_bytes() -> int:
+  return max(0, int(getattr(settings, "VISION_INFER_SPOOL_MAX_BYTES", DEFAULT_SPOOL_MAX_BYTES)))
+
+
+def _local_path(image_fieldfile):
+  # FileSystemStorage만 path 지원 (S3 등은 NotImplementedError)
+  try:
+    return image_fieldfile.path
+  except (AttributeError, NotImplementedError):
+    return None
+
+
 @contextmanager
-def get_infer_path(image_fieldfile):
+def get_infer_path(image_fieldfile, upload=None):
   """
-  모델 추론할 이미지 경로 찾기
+  모델 추론할 이미지 source 찾기
+  0. 같은 요청/프로세스에서 저장한 원본 업로드(upload: bytes 또는 UploadedFile)가 있으면 다운로드 없이 사용
   1. 로컬이면 .path 사용
-  2. S3면 .path 사용 불가능, 임시 파일로 내려 받아서 사용
-     -> 모델 추론 후 임시파일 삭제
-  return: run_vision_inference에 넘길 수 있는 로컬 파일 경로
+  2. S3면 .path 사용 불가능 -> chunk 단위로 내려 받음
+     - VISION_INFER_SPOOL_MAX_BYTES 이하: 메모리에서 바로 디코딩
+     - 초과: 임시 파일로 저장 후 경로 사용 -> 모델 추론 후 임시파일 삭제
+  return: run_vision_inference에 넘길 수 있는 source (로컬 파일 경로 또는 디코딩된 배열)
   """
   # 참고
   # with + yield(contextmanager)는
   # 임시파일 같은 자원을 쓰는 동안만 안전하게 열어두고,
   # 쓰자마자 무조건 정리하기 위해 사용하는 패턴
 
+  # 원본 업로드 재사용
+  if upload is not None:
+    if isinstance(upload, (bytes, bytearray, memoryview)):
+      yield decode_image(bytes(upload))
+      return
+    # 큰 업로드는 Django가 이미 임시파일로 받아둠 (TemporaryUploadedFile)
+    if hasattr(upload, "temporary_file_path"):
+      yield upload.temporary_file_path()
+      return
+    upload.seek(0)
+    yield decode_image(upload.read())
+    return
+
   # 로컬 스토리지(FileSystemStorage)면 path 사용 가능
-  if hasattr(image_fieldfile, "path"):
-    yield image_fieldfile.path
+  local_path = _local_path(image_fieldfile)
+  if local_path is not None:
+    yield local_path
     return
 
-  # 원격 스토리지(S3 등): 임시 파일로 저장
+  # 원격 스토리지(S3 등): chunk 단위로 읽기
   name = getattr(image_fieldfile, "name", "") or "image"
   _, ext = os.path.splitext(name)
   suffix = ext if ext else ".jpg"
 
-  tmp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
-  tmp_path = tmp.name
+  chunk_size = _get_chunk_size()
+  spool_max = _get_spool_max_bytes()
+
+  data = None
+  tmp_path = None
+
+  with image_fieldfile.open("rb") as fsrc:
+    # 작은 파일은 메모리에만 (threshold를 넘는 순간 임시파일로 전환)
+    buf = io.BytesIO()
+    exhausted = False
+    while buf.tell() <= spool_max:
+      chunk = fsrc.read(chunk_size)
+      if not chunk:
+        exhausted = True
+        break
+      buf.write(chunk)
+
+    if exhausted:
+      data = buf.getvalue()
+    else:
+      tmp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+      tmp_path = tmp.name
+      try:
+        with tmp:
+          tmp.write(buf.getbuffer())
+          shutil.copyfileobj(fsrc, tmp, chunk_size)
+      except BaseException:
+        os.remove(tmp_path)
+        raise
+    buf.close()
+
+  if data is not None:
+    yield decode_image(data)
+    return
 
   try:
-    with image_fieldfile.open("rb") as fsrc:
-      tmp.write(fsrc.read())
-    tmp.close()
     yield tmp_path
   finally:
     try:
       os.remove(tmp_path)
     except OSError:
-      pass
\ No newline at end of file
+      pass
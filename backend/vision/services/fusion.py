@@ -0,0 +1,86 @@
+# vision/services/fusion.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from . import timing
+from .detections import MERGE_RULES, select_merged
+
+
+# 같은 방을 여러 장 찍은 경우 방 단위로 탐지 결과 합치기 (VISION_FUSION_ENABLED, 기본 True)
+# - rooms JSON에서 room_type + group이 같은 사진들만 합침 (group이 없으면 사진별 결과 그대로)
+# - 가구(Furniture.name_en)별 규칙: VISION_FUSION_RULES {"name_en": "max" | "sum"}
+#   기본 VISION_FUSION_DEFAULT_RULE("max"): 같은 소파가 여러 장에 찍혀도 한 장에서 보인 최대 개수만 인정
+#   "sum": 장마다 다른 물건이 찍히는 가구 (박스, 의자 등 방 곳곳에 흩어진 것)
+# - 사진별 results/VisionDetection은 그대로 두고, 응답에 fused_rooms를 추가
+#   합쳐진 탐지마다 source_detection_ids (대표 탐지 + 같은 물건으로 본 다른 사진의 탐지)
+
+
+def is_enabled() -> bool:
+  return bool(getattr(settings, "VISION_FUSION_ENABLED", True))
+
+
+def get_rules() -> Tuple[Dict[str, str], str]:
+  """
+  잘못된 규칙은 요청 데이터 문제가 아니므로 ImproperlyConfigured (vision 앱 시작 시에도 확인, apps.py)
+  """
+  raw = getattr(settings, "VISION_FUSION_RULES", None) or {}
+  if not isinstance(raw, dict):
+    raise ImproperlyConfigured("VISION_FUSION_RULES must be a dict of {name_en: rule}")
+
+  rules = {str(name): str(rule) for name, rule in raw.items()}
+  default_rule = str(getattr(settings, "VISION_FUSION_DEFAULT_RULE", "max"))
+
+  invalid = {name: rule for name, rule in rules.items() if rule not in MERGE_RULES}
+  if default_rule not in MERGE_RULES:
+    invalid["VISION_FUSION_DEFAULT_RULE"] = default_rule
+  if invalid:
+    raise ImproperlyConfigured(f"Invalid fusion rules: {invalid} (choices={', '.join(MERGE_RULES)})")
+  return rules, default_rule
+
+
+def _fuse_group(room_type: str, group: str, rooms: List[Dict[str, Any]]) -> Dict[str, Any]:
+  rules, default_rule = get_rules()
+  picked = select_merged(
+    [[d["name_en"] for d in room["detections"]] for room in rooms],
+    [[d.get("confidence") for d in room["detections"]] for room in rooms],
+    rules=rules,
+    default_rule=default_rule,
+  )
+
+  detections = []
+  for source, index, absorbed in picked:
+    detection = dict(rooms[source]["detections"][index])
+    detection["vision_image_id"] = rooms[source]["vision_image_id"]
+    detection["source_detection_ids"] = [detection["detection_id"]] + [
+      rooms[other]["detections"][other_index]["detection_id"] for other, other_index in absorbed
+    ]
+    detections.append(detection)
+
+  return {
+    "room_type": room_type,
+    "group": group,
+    "vision_image_ids": [room["vision_image_id"] for room in rooms],
+    "detections": detections,
+  }
+
+
+def fuse_rooms(results: List[Dict[str, Any]], groups: Sequence[Optional[str]]) -> List[Dict[str, Any]]:
+  """
+  results: 사진별 결과 (_persist_detections), groups: 같은 순서의 group 값 (None이면 합치지 않음)
+  return: [{"room_type", "group", "vision_image_ids", "detections"}, ...] (group 첫 등장 순서)
+  """
+  if not is_enabled():
+    return []
+
+  buckets: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+  for room, group in zip(results, groups):
+    if group is None:
+      continue
+    buckets.setdefault((room["room_type"], group), []).append(room)
+
+  with timing.stage("fusion"):
+    return [_fuse_group(room_type, group, rooms) for (room_type, group), rooms in buckets.items()]
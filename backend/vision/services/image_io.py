@@ -0,0 +1,113 @@
+# vision/services/image_io.py
+from __future__ import annotations
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+
+# 업로드 이미지를 메모리에서 한 번만 디코딩해서 모델에 바로 전달
+# (스토리지 저장 -> 다시 읽기 -> ultralytics 디코딩 왕복 제거)
+# 스토리지 저장은 io executor에서 추론과 동시에 진행
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+  """
+  디코딩/스토리지 저장용 스레드 풀 (PIL 디코딩, 파일 I/O는 GIL을 풀어서 병렬 처리 가능)
+  """
+  global _executor
+  if _executor is None:
+    with _executor_lock:
+      if _executor is None:
+        max_workers = int(getattr(settings, "VISION_IO_WORKERS", 4))
+        _executor = ThreadPoolExecutor(
+          max_workers=max(1, max_workers),
+          thread_name_prefix="vision-io",
+        )
+  return _executor
+
+
+def read_upload(uploaded) -> bytes:
+  """
+  업로드 파일 전체 bytes (chunk 단위로 읽고 위치 복구)
+  """
+  if hasattr(uploaded, "chunks"):
+    data = b"".join(uploaded.chunks())
+  else:
+    data = uploaded.read()
+  if hasattr(uploaded, "seek"):
+    uploaded.seek(0)
+  return data
+
+
+def get_decode_size() -> int:
+  """
+  축소 디코딩 목표 크기 (기본 VISION_IMG_SIZE)
+  tiled 추론이 켜져 있으면 tile 분할 기준(VISION_TILE_MIN_SIDE) 이상으로 디코딩
+  """
+  size = int(getattr(settings, "VISION_DECODE_SIZE", None) or getattr(settings, "VISION_IMG_SIZE", 640))
+  if getattr(settings, "VISION_TILE_ENABLED", False):
+    size = max(size, int(getattr(settings, "VISION_TILE_MIN_SIDE", 1920)))
+  return size
+
+
+def _open_reduced(img: Image.Image, target: int) -> Image.Image:
+  """
+  긴 변이 target 근처가 되도록 축소해서 디코딩
+  - JPEG: draft()로 DCT 단계에서 1/2, 1/4, 1/8 축소 디코딩 (전체 해상도 디코딩 자체를 생략)
+    draft는 요청 크기 이상을 보장하므로 모델 입력(letterbox)보다 작아지지 않음
+  - 그 외 포맷: 디코딩 후 정수배 reduce()로 축소 (이후 전처리 resize 비용 감소)
+  가로/세로를 같은 비율로 줄이므로 orig_shape 기준 normalized bbox는 원본과 동일
+  """
+  if target <= 0:
+    return img
+
+  if img.format == "JPEG":
+    img.draft("RGB", (target, target))
+    return img
+
+  factor = min(img.size) // target
+  if factor >= 2:
+    return img.reduce(factor)
+  return img
+
+
+def decode_image(data: bytes, target_size: Optional[int] = None) -> Any:
+  """
+  이미지 bytes -> 모델 입력용 배열 (H, W, 3) uint8 BGR
+  - VISION_DECODE_DRAFT(기본 True)면 target_size(기본 VISION_IMG_SIZE) 근처로 축소 디코딩
+  - EXIF 회전 정보 반영 (파일 경로로 추론하던 때와 같은 방향)
+  - ultralytics는 numpy 입력을 OpenCV와 같은 BGR 순서로 받음
+  """
+  if np is None:
+    raise RuntimeError("numpy가 설치되어 있지 않습니다. pip install numpy")
+
+  with Image.open(io.BytesIO(data)) as img:
+    if getattr(settings, "VISION_DECODE_DRAFT", True):
+      img = _open_reduced(img, target_size or get_decode_size())
+    img = ImageOps.exif_transpose(img)
+    rgb = img.convert("RGB")
+
+  arr = np.asarray(rgb)
+  return np.ascontiguousarray(arr[:, :, ::-1])
+
+
+def decode_images(datas: List[bytes]) -> List[Any]:
+  """
+  여러 이미지를 io executor에서 병렬 디코딩 (입력 순서 유지)
+  """
+  if len(datas) <= 1:
+    return [decode_image(d) for d in datas]
+  return list(get_io_executor().map(decode_image, datas))
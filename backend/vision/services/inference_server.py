@@ -0,0 +1,183 @@
+# vision/services/inference_server.py
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, List, Optional, Sequence
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# 추론 서버 모드
+# - 모델은 추론 서버 프로세스 1개만 로딩 (python manage.py run_inference_server)
+# - Gunicorn worker들은 Unix socket으로 추론 요청만 보내는 thin client
+# - settings.VISION_INFERENCE_MODE = "server" 일 때만 사용 (기본 "local")
+# 예: gunicorn config.wsgi:application --workers 4 --threads 4 --timeout 120
+
+DEFAULT_SOCKET_PATH = "/tmp/zimpic-vision-inference.sock"
+
+
+class InferenceServerError(RuntimeError):
+  """추론 서버 연결 실패 또는 서버 측 추론 실패"""
+
+
+def is_server_mode() -> bool:
+  return str(getattr(settings, "VISION_INFERENCE_MODE", "local")).lower() == "server"
+
+
+def get_socket_path() -> str:
+  return str(getattr(settings, "VISION_INFERENCE_SOCKET", DEFAULT_SOCKET_PATH))
+
+
+def _get_authkey() -> bytes:
+  """
+  같은 서버의 다른 프로세스가 socket에 붙는 것을 막기 위한 인증키
+  (별도 설정 없으면 SECRET_KEY 사용)
+  """
+  key = getattr(settings, "VISION_INFERENCE_AUTHKEY", None) or settings.SECRET_KEY
+  return str(key).encode("utf-8")
+
+
+def _get_timeout() -> float:
+  return float(getattr(settings, "VISION_INFERENCE_TIMEOUT", 120))
+
+
+# ====================================
+# client (Django worker 측)
+# ====================================
+def _call(message: Dict[str, Any]) -> Any:
+  """
+  요청 1건마다 연결 1개 사용 (Unix socket 연결 비용은 무시할 수준)
+  -> 스레드별 연결 관리 없이 --threads 환경에서도 안전
+  """
+  address = get_socket_path()
+  try:
+    conn = Client(address, family="AF_UNIX", authkey=_get_authkey())
+  except (OSError, EOFError) as e:
+    raise InferenceServerError(f"inference server is not reachable: {address} ({e})") from e
+
+  try:
+    conn.send(message)
+    if not conn.poll(_get_timeout()):
+      raise InferenceServerError(f"inference server timeout: {address}")
+    reply = conn.recv()
+  except (OSError, EOFError) as e:
+    raise InferenceServerError(f"inference server connection lost: {address} ({e})") from e
+  finally:
+    conn.close()
+
+  if not reply.get("ok"):
+    raise InferenceServerError(reply.get("error") or "inference server error")
+  return reply.get("result")
+
+
+def request_inference_batch(
+  sources: Sequence[Any],
+  batch_size: Optional[int] = None,
+  columnar: bool = False,
+) -> List[Any]:
+  """
+  추론 서버에 batch 추론 요청
+  sources: 디코딩된 배열(pickle로 전송) 또는 추론 서버 프로세스에서도 읽을 수 있는 로컬 경로
+  """
+  return _call({
+    "op": "infer",
+    "sources": [s if hasattr(s, "shape") else str(s) for s in sources],
+    "batch_size": batch_size,
+    "columnar": columnar,
+  })
+
+
+def ping() -> Dict[str, Any]:
+  return _call({"op": "ping"})
+
+
+# ====================================
+# server (모델을 소유하는 프로세스)
+# ====================================
+def _handle(message: Dict[str, Any]) -> Any:
+  from .model_inference import get_model_status, infer_local
+
+  op = message.get("op")
+  if op == "ping":
+    return {"pid": os.getpid(), **get_model_status()}
+  if op == "infer":
+    return infer_local(
+      message.get("sources") or [],
+      message.get("batch_size"),
+      bool(message.get("columnar")),
+    )
+  raise ValueError(f"unknown op: {op}")
+
+
+def _serve_connection(conn) -> None:
+  try:
+    while True:
+      try:
+        message = conn.recv()
+      except EOFError:
+        return
+      try:
+        reply = {"ok": True, "result": _handle(message)}
+      except Exception as e:
+        logger.exception("Inference server request failed")
+        reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+      conn.send(reply)
+  finally:
+    conn.close()
+
+
+def is_listening(address: str) -> bool:
+  """
+  socket 파일에 연결을 받는 프로세스가 있는지 (인증키가 달라도 연결되면 실행 중으로 봄)
+  """
+  try:
+    conn = Client(address, family="AF_UNIX", authkey=_get_authkey())
+  except AuthenticationError:
+    return True
+  except (OSError, EOFError):
+    return False
+  conn.close()
+  return True
+
+
+def serve_forever(address: Optional[str] = None, stop: Optional[threading.Event] = None) -> None:
+  """
+  Unix socket을 열고 추론 요청을 처리 (연결마다 스레드 1개)
+  모델은 이 프로세스에서 한 번만 로딩되어 모든 연결이 공유
+  stop: set 후 연결이 하나 더 들어오면 종료 (테스트 등 같은 프로세스에서 멈출 때)
+  """
+  address = address or get_socket_path()
+
+  # 이전 실행에서 남은 socket 파일 정리 (실행 중인 서버의 socket이면 가로채지 않고 종료)
+  if os.path.exists(address):
+    if is_listening(address):
+      raise InferenceServerError(f"inference server is already running: {address}")
+    os.remove(address)
+
+  listener = Listener(address, family="AF_UNIX", authkey=_get_authkey())
+  logger.info("Vision inference server listening on %s (pid=%s)", address, os.getpid())
+
+  try:
+    while stop is None or not stop.is_set():
+      try:
+        conn = listener.accept()
+      except Exception:
+        # 인증 실패 등 연결 단위 오류는 서버를 죽이지 않음
+        logger.exception("Inference server accept failed")
+        continue
+      if stop is not None and stop.is_set():
+        conn.close()
+        break
+      threading.Thread(target=_serve_connection, args=(conn,), daemon=True).start()
+  finally:
+    listener.close()
+    try:
+      os.remove(address)
+    except OSError:
+      pass
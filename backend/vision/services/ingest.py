@@ -0,0 +1,98 @@
+# vision/services/ingest.py
+from __future__ import annotations
+
+import io
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+
+# 업로드 이미지 저장 전 정규화 (VISION_STORE_NORMALIZE, 기본 True)
+# - EXIF 회전 반영 후 EXIF 제거 (위치 정보 등도 같이 제거됨)
+# - 긴 변을 VISION_STORE_MAX_SIDE(기본 2048px) 이하로 축소
+# - VISION_STORE_FORMAT(WEBP/JPEG, 기본 WEBP) + VISION_STORE_QUALITY(기본 82)로 다시 인코딩
+# - 긴 변 VISION_THUMBNAIL_SIZE(기본 320px, 0이면 생성 안 함) 썸네일 생성
+# 추론/탐지 캐시 키(SHA-256)는 원본 bytes 기준 그대로 사용 (정규화는 저장용)
+
+FORMAT_EXTS = {"WEBP": ".webp", "JPEG": ".jpg"}
+
+
+@dataclass(frozen=True)
+class NormalizedImage:
+  data: bytes
+  file_name: str
+  thumbnail: Optional[bytes] = None
+  thumbnail_name: Optional[str] = None
+
+
+def is_enabled() -> bool:
+  return bool(getattr(settings, "VISION_STORE_NORMALIZE", True))
+
+
+def get_store_format() -> str:
+  fmt = str(getattr(settings, "VISION_STORE_FORMAT", "WEBP")).upper()
+  if fmt == "JPG":
+    fmt = "JPEG"
+  if fmt not in FORMAT_EXTS:
+    raise ValueError(f"Invalid VISION_STORE_FORMAT: {fmt} (choices={', '.join(FORMAT_EXTS)})")
+  return fmt
+
+
+def _encode(img: Image.Image, fmt: str, quality: int) -> bytes:
+  out = io.BytesIO()
+  if fmt == "WEBP":
+    img.save(out, format="WEBP", quality=quality, method=4)
+  else:
+    img.save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
+  return out.getvalue()
+
+
+def normalize_image(data: bytes, file_name: str) -> NormalizedImage:
+  """
+  원본 업로드 bytes -> 저장용 이미지 (+ 썸네일)
+  이미지로 열 수 없으면 원본 그대로 저장 (에러 처리는 추론 단계와 동일하게 유지)
+  """
+  if not is_enabled():
+    return NormalizedImage(data=data, file_name=file_name)
+
+  fmt = get_store_format()
+  max_side = int(getattr(settings, "VISION_STORE_MAX_SIDE", 2048))
+  quality = int(getattr(settings, "VISION_STORE_QUALITY", 82))
+  thumb_side = int(getattr(settings, "VISION_THUMBNAIL_SIZE", 320))
+  thumb_quality = int(getattr(settings, "VISION_THUMBNAIL_QUALITY", 75))
+
+  try:
+    with Image.open(io.BytesIO(data)) as src:
+      # JPEG는 저장 크기 근처까지 축소 디코딩 (draft는 요청 크기 이상을 보장)
+      if max_side > 0 and src.format == "JPEG":
+        src.draft("RGB", (max_side, max_side))
+      img = ImageOps.exif_transpose(src).convert("RGB")
+  except (UnidentifiedImageError, OSError, ValueError):
+    logger.warning("Image normalization skipped (cannot decode): %s", file_name)
+    return NormalizedImage(data=data, file_name=file_name)
+
+  if max_side > 0 and max(img.size) > max_side:
+    img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+  stem = os.path.splitext(file_name or "image")[0] or "image"
+  ext = FORMAT_EXTS[fmt]
+
+  thumbnail = thumbnail_name = None
+  if thumb_side > 0:
+    thumb = img.copy()
+    thumb.thumbnail((thumb_side, thumb_side), Image.Resampling.LANCZOS)
+    thumbnail = _encode(thumb, fmt, thumb_quality)
+    thumbnail_name = f"{stem}_thumb{ext}"
+
+  return NormalizedImage(
+    data=_encode(img, fmt, quality),
+    file_name=f"{stem}{ext}",
+    thumbnail=thumbnail,
+    thumbnail_name=thumbnail_name,
+  )
@@ -0,0 +1,139 @@
+# vision/services/jobs.py
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+# 비동기 업로드 job 실행기
+# - 외부 브로커 없이 프로세스 내 ThreadPoolExecutor 사용
+# - job 상태는 DB(VisionUploadJob)에 저장 -> 어느 worker가 GET을 받아도 조회 가능
+# - 프로세스가 재시작되면 실행 중이던 job은 RUNNING 상태로 남으므로 재업로드 필요
+# - 원본 업로드(uploads)를 메모리에 들고 있는 job들의 합계는 VISION_ASYNC_KEEP_UPLOAD_BUDGET_BYTES(기본 64MB) 이하
+#   대기열이 길어져도 메모리가 늘지 않도록, job 1개 상한(VISION_ASYNC_KEEP_UPLOAD_MAX_BYTES, 기본 8MB)이나
+#   예산을 넘는 job은 원본을 로컬 임시파일로 옮겨서 등록 (스토리지의 정규화 이미지로 추론하지 않음)
+#   예산/임시파일은 job 실행이 끝나면(성공/실패 모두) 반납/삭제
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class _ByteBudget:
+  """
+  bytes 단위 semaphore (기다리지 않고 남은 예산이 없으면 False)
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self.held = 0
+
+  def try_acquire(self, nbytes: int, limit: int) -> bool:
+    with self._lock:
+      if self.held + nbytes > limit:
+        return False
+      self.held += nbytes
+      return True
+
+  def release(self, nbytes: int) -> None:
+    with self._lock:
+      self.held = max(0, self.held - nbytes)
+
+
+_upload_budget = _ByteBudget()
+
+
+def _get_keep_upload_max_bytes() -> int:
+  return int(getattr(settings, "VISION_ASYNC_KEEP_UPLOAD_MAX_BYTES", 8 * 1024 * 1024))
+
+
+def _get_upload_budget() -> int:
+  return int(getattr(settings, "VISION_ASYNC_KEEP_UPLOAD_BUDGET_BYTES", 64 * 1024 * 1024))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+  global _executor
+  if _executor is None:
+    with _executor_lock:
+      if _executor is None:
+        max_workers = int(getattr(settings, "VISION_ASYNC_WORKERS", 2))
+        _executor = ThreadPoolExecutor(
+          max_workers=max(1, max_workers),
+          thread_name_prefix="vision-job",
+        )
+  return _executor
+
+
+def _run(job_pk: int, uploads: Optional[Dict[int, bytes]] = None, upload_nbytes: int = 0) -> None:
+  from vision.models import VisionUploadJob
+  from .pipeline import discard_uploads, run_upload_job
+
+  close_old_connections()
+  try:
+    job = VisionUploadJob.objects.filter(pk=job_pk).first()
+    if job is None:
+      logger.error("VisionUploadJob not found (pk=%s)", job_pk)
+      return
+
+    job.status = VisionUploadJob.Status.RUNNING
+    job.save(update_fields=["status", "updated_at"])
+
+    try:
+      payload = run_upload_job(job, uploads=uploads)
+    except Exception as e:
+      logger.exception("VisionUploadJob failed (job_id=%s)", job.job_id)
+      job.status = VisionUploadJob.Status.FAILED
+      job.error = f"{type(e).__name__}: {e}"
+      job.finished_at = timezone.now()
+      job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+      return
+
+    job.status = VisionUploadJob.Status.DONE
+    job.result = payload
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "result", "finished_at", "updated_at"])
+  finally:
+    _upload_budget.release(upload_nbytes)
+    discard_uploads(uploads)
+    # worker 스레드의 DB 연결 정리 (스레드별 연결이 남지 않도록)
+    connection.close()
+
+
+def submit_upload_job(job_pk: int, uploads: Optional[Dict[int, bytes]] = None, upload_nbytes: int = 0) -> None:
+  """
+  VisionUploadJob을 백그라운드 worker pool에 등록
+  (enqueue_rooms_upload에서 transaction commit 후 호출)
+  uploads: {vision_image_id: 원본 업로드 bytes} -> 같은 프로세스에서 실행되므로 스토리지에서 다시 내려받지 않음
+  upload_nbytes: uploads 크기 합계, job 상한이나 프로세스 예산을 넘으면 uploads를 임시파일로 옮김
+  """
+  from .pipeline import discard_uploads, on_disk_uploads, spill_uploads
+
+  if uploads and (
+    upload_nbytes > _get_keep_upload_max_bytes()
+    or not _upload_budget.try_acquire(upload_nbytes, _get_upload_budget())
+  ):
+    logger.info("Upload budget exceeded, spilling uploads to temp files (pk=%s, bytes=%s)", job_pk, upload_nbytes)
+    try:
+      uploads = spill_uploads(uploads)
+    except OSError:
+      # 임시파일도 못 쓰면 스토리지에서 읽음 (정규화 이미지 결과는 캐시에 저장하지 않음)
+      # 샘플링 전 영상은 스토리지에 아직 파일이 없으므로 임시파일 그대로 넘김
+      logger.exception("Failed to spill uploads, job will read from storage (pk=%s)", job_pk)
+      uploads = on_disk_uploads(uploads) or None
+    upload_nbytes = 0
+  if not uploads:
+    upload_nbytes = 0
+
+  try:
+    _get_executor().submit(_run, job_pk, uploads, upload_nbytes)
+  except Exception:
+    _upload_budget.release(upload_nbytes)
+    discard_uploads(uploads)
+    raise
@@ -1,97 +1,462 @@
 from __future__ import annotations
 
-from typing import Dict, List, Any, Optional
-from functools import lru_cache
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Sequence
 
 from django.conf import settings
+from django.utils import timezone
+
+from config import metrics
+
+from . import batch_scheduler, fake_model, tiling
+from .backends import get_backend, load_model, predict_kwargs
+from .detection_cache import compute_model_version, set_loaded_model_version
+from .detections import DetectionArrays
+from .image_io import decode_image
+from .inference_server import is_server_mode, request_inference_batch
 
 try:
   from ultralytics import YOLO
 except ImportError:
   YOLO = None
 
+logger = logging.getLogger(__name__)
+
+INFERENCE_SECONDS = metrics.histogram(
+  "vision_inference_seconds",
+  "model.predict 1회(batch) 소요 시간",
+  labelnames=("backend",),
+)
+INFERENCE_REQUEST_SECONDS = metrics.histogram(
+  "vision_inference_request_seconds",
+  "run_vision_inference(_batch) 호출 1건 소요 시간",
+  labelnames=("mode",),
+)
+INFERENCE_BATCH_SIZE = metrics.histogram(
+  "vision_inference_batch_size",
+  "model.predict 1회에 들어간 이미지(tile 포함) 수",
+  buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+DETECTIONS_PER_IMAGE = metrics.histogram(
+  "vision_detections_per_image",
+  "이미지 1장당 탐지 수",
+  buckets=(0, 1, 2, 3, 5, 10, 20, 50),
+)
+MODEL_LOAD_SECONDS = metrics.histogram(
+  "vision_model_load_seconds",
+  "모델 weight 로딩 1회(성공) 소요 시간",
+  buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+MODEL_LOAD_FAILURES = metrics.counter(
+  "vision_model_load_failures_total",
+  "모델 로딩 실패 횟수 (재시도 포함)",
+)
+
 
 
 # 운영 서버 주의!
 # Gunicorn 멀티프로세스(worker>1)에서는 각 worker마다 모델이 로딩되어 GPU 메모리를 중복 사용하게 됨.
 # GPU 서버에서는 workers=1로 실행하여 모델 1개만 유지해야 함.
 # 동시성까지 확보한 예: gunicorn config.wsgi:application --workers 1 --threads 4 --timeout 120
+# worker를 늘려야 하면 VISION_INFERENCE_MODE="server"로 추론 서버 1개만 모델을 로딩하도록 설정
+# (inference_server.py, python manage.py run_inference_server 참고)
+# --threads로 동시 요청을 받는 경우 VISION_MICROBATCH_ENABLED=True면 요청들의 이미지를 모아서 한 번에 추론 (batch_scheduler.py)
+
+def _load_model():
+  # 벤치마크/개발용: 실제 weight 없이 결정적인 가짜 탐지 결과 (fake_model.py)
+  if fake_model.is_enabled():
+    return fake_model.FakeYOLO()
 
-@lru_cache(maxsize=1)
-def _get_model():
   if YOLO is None:
     raise RuntimeError("ultralytics가 설치되어 있지 않습니다. pip install ultralytics")
-  
-  model = YOLO(str(settings.VISION_MODEL_PATH))
-  device = getattr(settings, "VISION_DEVICE", "cpu")
-  model.to(device)
-  return model
 
+  # VISION_BACKEND(torch/onnxruntime/openvino)에 맞는 모델 로딩 (backends.py)
+  return load_model(YOLO)
 
-def run_vision_inference(file_path: str) -> List[Dict[str, Any]]:
-  model = _get_model()
 
-  imgsz = getattr(settings, "VISION_IMG_SIZE", 640)
+# warm-up 상태 (readiness 응답용)
+_warm_lock = threading.Lock()
+_warm_state: Dict[str, Any] = {
+  "warm": False,
+  "warming": False,
+  "duration_ms": None,
+  "warmed_at": None,
+  "error": None,
+  "model_load_ms": None,
+  "model_load_attempts": 0,
+  "model_load_error": None,
+}
+
+
+# 모델 로딩 single-flight
+# - 프로세스당 로딩은 1번: 처음 호출한 스레드만 로딩하고, 그 사이 들어온 스레드는 같은 로딩이 끝나기를 기다림
+#   (--threads로 cold worker에 동시 요청이 와도 weight 로딩/.to(device)가 중복되지 않음)
+# - 실패 시 VISION_MODEL_LOAD_RETRIES(기본 2)번까지 재시도, 대기 VISION_MODEL_LOAD_BACKOFF(기본 0.5초) x 2^n
+# - 재시도까지 실패하면 기다리던 스레드들도 같은 예외를 받고, 실패는 저장하지 않음 (다음 호출에서 다시 로딩)
+class _LoadFlight:
+
+  def __init__(self):
+    self.done = threading.Event()
+    self.model = None
+    self.error: Optional[BaseException] = None
+
+
+_model = None
+_model_flight: Optional[_LoadFlight] = None
+_model_lock = threading.Lock()
+
+
+def _load_with_retry():
+  retries = max(0, int(getattr(settings, "VISION_MODEL_LOAD_RETRIES", 2)))
+  backoff = max(0.0, float(getattr(settings, "VISION_MODEL_LOAD_BACKOFF", 0.5)))
+
+  for attempt in range(retries + 1):
+    with _warm_lock:
+      _warm_state["model_load_attempts"] += 1
+
+    # 로딩 중 파일이 바뀌어도 읽기 시작한 시점의 버전으로 (캐시 키가 실제 weight보다 새로워지지 않도록)
+    version = compute_model_version()
+    start = time.perf_counter()
+    try:
+      model = _load_model()
+    except Exception as e:
+      MODEL_LOAD_FAILURES.inc()
+      with _warm_lock:
+        _warm_state["model_load_error"] = f"{type(e).__name__}: {e}"
+      if attempt >= retries:
+        logger.exception("Vision model load failed (%s attempts)", attempt + 1)
+        raise
+      delay = backoff * (2 ** attempt)
+      logger.warning("Vision model load failed, retrying in %.1fs: %s", delay, e)
+      time.sleep(delay)
+      continue
+
+    elapsed = time.perf_counter() - start
+    MODEL_LOAD_SECONDS.observe(elapsed)
+    with _warm_lock:
+      _warm_state.update(model_load_ms=round(elapsed * 1000, 1), model_load_error=None)
+    logger.info("Vision model loaded in %.1f ms (%s)", elapsed * 1000, version)
+    return model, version
+
+
+def _get_model():
+  global _model, _model_flight
+
+  # 로딩 후에는 lock 없이 반환
+  model = _model
+  if model is not None:
+    return model
+
+  with _model_lock:
+    if _model is not None:
+      return _model
+    flight = _model_flight
+    leader = flight is None
+    if leader:
+      flight = _model_flight = _LoadFlight()
+
+  if not leader:
+    flight.done.wait()
+  else:
+    try:
+      flight.model, version = _load_with_retry()
+    except BaseException as e:
+      flight.error = e
+    finally:
+      with _model_lock:
+        if flight.model is not None:
+          _model = flight.model
+          # 탐지 캐시 키를 로딩한 weight 기준으로
+          set_loaded_model_version(version)
+        _model_flight = None
+      flight.done.set()
+
+  if flight.error is not None:
+    raise flight.error
+  return flight.model
+
+
+def reset_model() -> None:
+  """
+  로딩된 모델 버리기 (설정 변경 후 다시 로딩, 벤치마크/테스트용)
+  진행 중인 로딩은 그대로 끝나고, 그 결과는 다음 로딩 전까지 사용됨
+  """
+  global _model
+  with _model_lock:
+    _model = None
+    set_loaded_model_version(None)
+  with _warm_lock:
+    _warm_state.update(warm=False, model_load_ms=None, model_load_attempts=0, model_load_error=None)
+
+
+def warmup_model() -> Dict[str, Any]:
+  """
+  모델 로딩 + VISION_IMG_SIZE 크기 dummy 이미지로 forward 1회
+  첫 요청에서 발생하던 weight 로딩/첫 실행 그래프 초기화 시간을 프로세스 시작 시점으로 이동
+  """
+  import numpy as np
+
+  imgsz = int(getattr(settings, "VISION_IMG_SIZE", 640))
   conf = getattr(settings, "VISION_CONF", 0.25)
 
-  # save=False로 파일 생성 방지
-  results = model.predict(
-    source=file_path,
-    imgsz=imgsz,
-    conf=conf,
-    save=False,
-    verbose=False,
-  )
+  with _warm_lock:
+    _warm_state["warming"] = True
 
-  if not results:
-    return []
+  start = time.perf_counter()
+  try:
+    model = _get_model()
+    dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+    model.predict(source=dummy, imgsz=imgsz, conf=conf, save=False, verbose=False, **predict_kwargs())
+  except Exception as e:
+    with _warm_lock:
+      _warm_state.update(warming=False, error=f"{type(e).__name__}: {e}")
+    logger.exception("Vision model warm-up failed")
+    raise
 
-  r0 = results[0]
+  duration_ms = round((time.perf_counter() - start) * 1000, 1)
+  with _warm_lock:
+    _warm_state.update(
+      warm=True,
+      warming=False,
+      duration_ms=duration_ms,
+      warmed_at=timezone.now().isoformat(),
+      error=None,
+    )
+  logger.info("Vision model warm-up done in %.1f ms (imgsz=%s)", duration_ms, imgsz)
+  return get_model_status()
+
+
+def get_model_status() -> Dict[str, Any]:
+  with _warm_lock:
+    return dict(_warm_state)
 
-  # 결과가 비어있을 수 있음
-  if r0.boxes is None or len(r0.boxes) == 0:
-    return []
 
-  # 이미지 원본 크기 (픽셀)
-  img_w, img_h = r0.orig_shape[1], r0.orig_shape[0]
+def _mark_warm() -> None:
+  # warm-up 없이 실제 요청으로 첫 추론이 끝난 경우에도 warm으로 표시
+  if not _warm_state["warm"]:
+    with _warm_lock:
+      _warm_state.update(warm=True, warmed_at=timezone.now().isoformat())
 
-  # class name 매핑
-  names = r0.names  # dict: {class_id: "sofa_sm", ...}
 
-  out: List[Dict[str, Any]] = []
+def _get_batch_size() -> int:
+  """
+  한 번의 model.predict에 넣을 최대 이미지 수 (VISION_BATCH_SIZE, 기본 8)
+  """
+  try:
+    batch_size = int(getattr(settings, "VISION_BATCH_SIZE", 8))
+  except (TypeError, ValueError):
+    batch_size = 8
+  return max(1, batch_size)
+
+
+def _result_to_arrays(r) -> DetectionArrays:
+  """
+  ultralytics Results 1건 -> DetectionArrays
+  """
+  # 결과가 비어있을 수 있음
+  if r.boxes is None or len(r.boxes) == 0:
+    return DetectionArrays.empty(r.names)
 
   # boxes.xyxy: (N,4) 픽셀 좌표
   # boxes.cls: (N,) class id
   # boxes.conf: (N,) confidence
-  xyxy = r0.boxes.xyxy
-  cls = r0.boxes.cls
-  confs = r0.boxes.conf
-
-  # CPU로 옮겨서 파이썬 숫자로
-  xyxy = xyxy.cpu().tolist()
-  cls = cls.cpu().tolist()
-  confs = confs.cpu().tolist()
-
-  for (x1, y1, x2, y2), c, cf in zip(xyxy, cls, confs):
-    class_id = int(c)
-    class_name = names.get(class_id, str(class_id))
-
-    # 픽셀 -> normalized xywh (0~1), center 기준
-    w = max(0.0, x2 - x1)
-    h = max(0.0, y2 - y1)
-    cx = x1 + w / 2
-    cy = y1 + h / 2
-
-    out.append({
-      "yolo_id": class_id,
-      "yolo_class": class_name,
-      "confidence": float(cf),
-      "bbox": {
-        "x": float(cx / img_w),
-        "y": float(cy / img_h),
-        "w": float(w / img_w),
-        "h": float(h / img_h),
-      },
+  xyxy, cls, confs = tiling.result_arrays(r)
+
+  # 이미지 원본 크기 (픽셀) 기준으로 normalized
+  img_w, img_h = r.orig_shape[1], r.orig_shape[0]
+
+  # class name 매핑: r.names = {class_id: "sofa_sm", ...}
+  return DetectionArrays.from_xyxy(xyxy, cls, confs, r.names, img_w, img_h)
+
+
+def _result_to_detections(r) -> List[Dict[str, Any]]:
+  """
+  ultralytics Results 1건 -> detection dict 리스트
+  """
+  return _result_to_arrays(r).to_dicts()
+
+
+def _normalize_sources(sources: Sequence[Any]) -> List[Any]:
+  """
+  추론 source 정리: 디코딩된 배열(H, W, 3 BGR)은 그대로, 경로는 str로
+  tiled 추론이 켜져 있으면 경로도 배열로 읽음 (이미지 크기를 알아야 tile 분할 가능)
+  """
+  if tiling.is_enabled():
+    return [
+      s if hasattr(s, "shape")
+      else decode_image(Path(str(s)).read_bytes(), target_size=tiling.get_tile_settings().min_side)
+      for s in sources
+    ]
+  return [s if hasattr(s, "shape") else str(s) for s in sources]
+
+
+def _plan_inputs(sources: List[Any]) -> List[Dict[str, Any]]:
+  """
+  이미지별 모델 입력 목록
+  - 일반 이미지: [원본]
+  - tiled 대상(긴 변 >= VISION_TILE_MIN_SIDE): [원본 전체, tile 1, tile 2, ...]
+  """
+  cfg = tiling.get_tile_settings() if tiling.is_enabled() else None
+
+  plans: List[Dict[str, Any]] = []
+  for source in sources:
+    if cfg is None or not hasattr(source, "shape") or not tiling.should_tile(source.shape, cfg):
+      plans.append({"inputs": [source], "tiles": None})
+      continue
+
+    img_h, img_w = source.shape[0], source.shape[1]
+    rects = tiling.plan_tiles(img_h, img_w, cfg)
+    plans.append({
+      "inputs": [source] + [tiling.crop(source, rect) for rect in rects],
+      "tiles": rects,
+      "shape": (img_h, img_w),
     })
+  return plans
+
+
+def _plan_to_arrays(plan: Dict[str, Any], results: List[Any]) -> DetectionArrays:
+  if plan["tiles"] is None:
+    return _result_to_arrays(results[0])
+
+  img_h, img_w = plan["shape"]
+  xyxy, cls, confs = tiling.merge_tiled(
+    tiling.result_arrays(results[0]),
+    [tiling.result_arrays(r) for r in results[1:]],
+    plan["tiles"],
+    img_w,
+    img_h,
+    tiling.get_tile_settings(),
+  )
+  return DetectionArrays.from_xyxy(xyxy, cls, confs, results[0].names, img_w, img_h)
+
+
+def _run_local_batch(
+  sources: Sequence[Any],
+  batch_size: Optional[int] = None,
+  columnar: bool = False,
+) -> List[Any]:
+  """
+  현재 프로세스에 로딩된 모델로 batch 추론
+  - batch_size(기본 VISION_BATCH_SIZE)개씩 잘라서 model.predict 1번씩 호출
+  - tiled 대상 이미지는 원본 + tile들이 같은 batch 흐름에 함께 들어감
+  - columnar=True면 이미지별 DetectionArrays, 아니면 detection dict 리스트
+  """
+  sources = _normalize_sources(sources)
+  if not sources:
+    return []
+
+  model = _get_model()
+
+  imgsz = getattr(settings, "VISION_IMG_SIZE", 640)
+  conf = getattr(settings, "VISION_CONF", 0.25)
+  batch_size = max(1, int(batch_size)) if batch_size else _get_batch_size()
 
+  plans = _plan_inputs(sources)
+  inputs = [item for plan in plans for item in plan["inputs"]]
+
+  all_results: List[Any] = []
+  backend = get_backend()
+
+  for start in range(0, len(inputs), batch_size):
+    chunk = inputs[start:start + batch_size]
+
+    # save=False로 파일 생성 방지
+    # source에 리스트를 넘기면 ultralytics가 batch로 묶어서 forward 1번에 처리
+    INFERENCE_BATCH_SIZE.observe(len(chunk))
+    with INFERENCE_SECONDS.time(backend=backend):
+      results = model.predict(
+        source=chunk,
+        imgsz=imgsz,
+        conf=conf,
+        batch=len(chunk),
+        save=False,
+        verbose=False,
+        **predict_kwargs(),
+      )
+
+    results = list(results or [])
+
+    # 결과 개수가 입력과 다르면 이미지별 매칭이 불가능하므로 에러 처리
+    if len(results) != len(chunk):
+      raise RuntimeError(
+        f"YOLO batch result count mismatch: expected={len(chunk)}, got={len(results)}"
+      )
+
+    all_results.extend(results)
+
+  out: List[Any] = []
+  pos = 0
+  for plan in plans:
+    n = len(plan["inputs"])
+    arrays = _plan_to_arrays(plan, all_results[pos:pos + n])
+    DETECTIONS_PER_IMAGE.observe(len(arrays))
+    out.append(arrays if columnar else arrays.to_dicts())
+    pos += n
+
+  _mark_warm()
   return out
+
+
+_scheduler: Optional[batch_scheduler.MicroBatchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def _get_scheduler() -> batch_scheduler.MicroBatchScheduler:
+  global _scheduler
+  if _scheduler is None:
+    with _scheduler_lock:
+      if _scheduler is None:
+        _scheduler = batch_scheduler.MicroBatchScheduler(
+          runner=lambda sources: _run_local_batch(sources, columnar=True),
+          max_batch=batch_scheduler.get_max_batch(_get_batch_size()),
+          max_wait_ms=batch_scheduler.get_max_wait_ms(),
+        )
+  return _scheduler
+
+
+def infer_local(
+  sources: Sequence[Any],
+  batch_size: Optional[int] = None,
+  columnar: bool = False,
+) -> List[Any]:
+  """
+  현재 프로세스의 모델로 추론
+  VISION_MICROBATCH_ENABLED면 동시 요청들과 묶어서 처리 (이때 batch_size는 VISION_MICROBATCH_MAX_BATCH 기준)
+  """
+  if not batch_scheduler.is_enabled():
+    return _run_local_batch(sources, batch_size, columnar)
+
+  arrays = _get_scheduler().infer(_normalize_sources(sources))
+  return arrays if columnar else [a.to_dicts() for a in arrays]
+
+
+def run_vision_inference_batch(
+  sources: Sequence[Any],
+  batch_size: Optional[int] = None,
+  columnar: bool = False,
+) -> List[Any]:
+  """
+  여러 이미지를 batch로 묶어서 추론
+  - sources: 로컬 파일 경로 또는 디코딩된 배열 (image_io.decode_image)
+  - VISION_INFERENCE_MODE="server"면 추론 서버에 요청, 아니면 현재 프로세스에서 추론
+  - columnar=True면 박스별 dict 대신 이미지별 DetectionArrays 반환 (bulk insert 등)
+  return: 입력 순서와 같은 순서의 이미지별 detection 리스트 (또는 DetectionArrays)
+  """
+  if is_server_mode():
+    if not sources:
+      return []
+    with INFERENCE_REQUEST_SECONDS.time(mode="server"):
+      return request_inference_batch(sources, batch_size, columnar)
+
+  with INFERENCE_REQUEST_SECONDS.time(mode="local"):
+    return infer_local(sources, batch_size, columnar)
+
+
+def run_vision_inference(source: Any) -> List[Dict[str, Any]]:
+  """
+  이미지 1장 추론 (run_vision_inference_batch의 단건 버전)
+  """
+  return run_vision_inference_batch([source], batch_size=1)[0]
@@ -1,92 +1,105 @@
+import json
 import logging
+import os
+import tempfile
 logger = logging.getLogger(__name__)
 
-from typing import Any, Dict, List, Optional
+from contextlib import ExitStack, contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Collection, ContextManager, Dict, List, Optional
+from urllib.parse import urljoin
+from django.conf import settings
+from django.core.files.base import ContentFile
 from django.db import transaction
 
-from vision.models import VisionImage, VisionDetection
-from policy.models import Furniture
-
+from vision.models import VisionImage, VisionDetection, VisionUploadJob
+
+from config import metrics
+
+from . import fusion, ingest, timing, video
+from .detection_cache import compute_sha256, get_cached_detections_many, store_detections_many
+from .detection_storage import (
+  STORAGE_PACKED,
+  get_detections_many,
+  get_storage_mode,
+  packed_to_dicts,
+  rows_to_packed,
+  serialize_detection,
+)
+from .detections import iter_detection_rows
 from .file_path_utils import get_infer_path
-from .model_inference import run_vision_inference
-from .yolo_to_furniture import map_to_furniture
+from .image_io import decode_images, get_io_executor, read_upload
+from .jobs import submit_upload_job
+from .model_inference import run_vision_inference_batch
+from .yolo_to_furniture import (
+  ensure_furniture_cache_fresh,
+  map_to_furniture,
+  map_to_outdoor_furniture,
+)
+
+
 
+FURNITURE_UNMAPPED = metrics.counter(
+  "vision_furniture_unmapped_total",
+  "Furniture에 없는 YOLO class 탐지 수",
+)
 
 
-def _build_image_url(request, vision_image: VisionImage) -> str:
+@dataclass(frozen=True)
+class PendingVideo:
   """
-  request가 있을 때 절대 URL 생성
+  비동기 업로드의 아직 샘플링하지 않은 영상 (job에서 keyframe 샘플링/대표 프레임 저장)
+  요청이 끝나면 Django 임시파일이 지워지므로 로컬 임시파일로 복사해서 넘김 (job이 끝나면 discard_uploads로 삭제)
+  """
+  path: Path
+  file_name: str
+  # 요청 기준 절대 URL base (job에서 저장한 keyframe의 image_url 생성용)
+  url_base: str
+
+
+def _build_image_url(request, vision_image: VisionImage) -> Optional[str]:
   """
+  request가 있을 때 절대 URL 생성 (비동기 영상은 job에서 keyframe을 저장하기 전까지 None)
+  """
+  if not vision_image.image:
+    return None
   # image.url은 MEDIA_URL 기반 상대 URL
   return request.build_absolute_uri(vision_image.image.url)
 
 
-def _serialize_detection(vd: VisionDetection, furniture: Optional[Furniture]) -> Dict[str, Any]:
+def _build_thumbnail_url(request, vision_image: VisionImage) -> Optional[str]:
   """
-  프론트에서 사용할 detection 응답 형태로 변환
+  썸네일이 없으면(정규화 전 데이터, 디코딩 실패 등) None
   """
-  bbox = None
-  if (
-    vd.bbox_x is not None and vd.bbox_y is not None
-    and vd.bbox_w is not None and vd.bbox_h is not None
-  ):
-    bbox = {
-      "x": float(vd.bbox_x),
-      "y": float(vd.bbox_y),
-      "w": float(vd.bbox_w),
-      "h": float(vd.bbox_h),
-    }
-
-  return {
-    "detection_id": vd.id,
-    "furniture_id": furniture.id if furniture else None,
-    "name_kr": getattr(furniture, "name_kr", None),
-    "name_en": getattr(furniture, "name_en", None),
-    "category": getattr(furniture, "category", None),
-    "confidence": float(vd.confidence) if vd.confidence is not None else None,
-    "bbox": bbox,
-    "description": getattr(furniture, "description", None),
-    "reference_model": getattr(furniture, "reference_model", None),
-    "reference_url": getattr(furniture, "reference_url", None),
-    "guide_size_cm": {
-      "width_cm": furniture.width_cm,
-      "depth_cm": furniture.depth_cm,
-      "height_cm": furniture.height_cm,
-      } if (
-        furniture.width_cm is not None
-        and furniture.depth_cm is not None
-        and furniture.height_cm is not None
-      ) else None,
-    "needs_disassembly": getattr(furniture, "needs_disassembly_default", False),
-  }
+  if not vision_image.thumbnail:
+    return None
+  return request.build_absolute_uri(vision_image.thumbnail.url)
 
 
-@transaction.atomic
-def process_rooms_upload(
+def _parse_rooms(
   *,
-  request,
   rooms: List[Dict[str, Any]],
   files: List[Any],
-) -> Dict[str, Any]:
+  sample_videos: bool = True,
+) -> List[Dict[str, Any]]:
   """
-  1. rooms + files를 요청 받아서 VisionImage DB저장
-  2. YOLO 모델 추론
-  3. YOLO결과 + 가구 정보 VisionDetection 저장 및 응답
+  rooms + files 검증 후 방별 업로드 정보 정리
+  return: [{"room_type", "sort_order", "group", "uploaded", "file_name", "data", "content_sha256"}, ...] (rooms 순서)
+  영상은 전체를 메모리에 읽지 않고 chunk 단위로 hash만 계산
+  - sample_videos=True: keyframe을 뽑아서 "frames"(추론용 배열), "store_name"을 추가하고 data는 대표 keyframe JPEG
+  - sample_videos=False(비동기): "video"=True, data는 None (샘플링은 job에서)
   """
-  results: List[Dict[str, Any]] = []
-
-
+  parsed: List[Dict[str, Any]] = []
 
   # json rooms 하나씩 읽기
   for room in rooms:
-
-    # ====================================
-    # 1. rooms + files를 요청 받아서
-    #    VisionImage DB저장
-    # ====================================
     room_type = room.get("room_type")
     file_index = room.get("file_index")
     sort_order = room.get("sort_order", 0)
+    # 같은 방을 여러 장 찍은 경우 같은 group 값 (fusion.py, 없으면 None)
+    group = room.get("group")
+    group = str(group) if group not in (None, "") else None
 
     # 값 없을 경우 에러 처리
     if not room_type or file_index is None:
@@ -104,111 +117,704 @@ def process_rooms_upload(
 
     uploaded = files[file_index]
 
-    # VisionImage 객체 생성 및 DB저장, 이미지 파일 저장
-    # image = models.ImageField() -> ImageField는 create로 save()하면 경로(vision/) 및 suffix추가하여 파일명 변경, 이미지 파일을 media에 저장 해줌
-    vision_image = VisionImage.objects.create(
-      room_type=room_type,
-      image=uploaded, # 파일로도 저장 됨
-      image_file_name=getattr(uploaded, "name", "") or "",
-      sort_order=sort_order,
-    )
+    entry = {
+      "room_type": room_type,
+      "sort_order": sort_order,
+      "group": group,
+      "uploaded": uploaded,
+      "file_name": getattr(uploaded, "name", "") or "",
+    }
 
-    # image_url 생성
-    image_url = _build_image_url(request, vision_image)
+    if video.is_video_upload(uploaded, entry["file_name"]):
+      # 크기/opencv 확인 후 chunk 단위 hash (업로드 전체를 bytes로 읽지 않음)
+      video.check_upload(uploaded)
+      with timing.stage("read_upload", room=len(parsed)):
+        entry["content_sha256"] = _video_fingerprint(compute_sha256(uploaded))
+      if sample_videos:
+        with timing.stage("video_sample", room=len(parsed)):
+          entry.update(_sampled_video_entry(video.sample_keyframes_from_upload(uploaded, entry["file_name"]), entry["file_name"]))
+      else:
+        entry.update({"video": True, "data": None})
+    else:
+      # 업로드 bytes는 여기서 한 번만 읽어서 fingerprint/디코딩/저장에 같이 사용
+      with timing.stage("read_upload", room=len(parsed)):
+        data = read_upload(uploaded)
+      entry["data"] = data
+      # 재업로드 사진 캐시 조회용 fingerprint
+      entry["content_sha256"] = compute_sha256(data)
 
+    parsed.append(entry)
 
+  return parsed
 
-    # ====================================
-    # 2. 모델 추론
-    # ====================================
-    with get_infer_path(vision_image.image) as infer_path:
-      detections = run_vision_inference(infer_path)
 
+def _video_fingerprint(raw_sha256: str) -> str:
+  # 같은 영상이라도 keyframe 선택 설정이 바뀌면 결과가 달라지므로 fingerprint에 포함
+  params = json.dumps(video.get_sampling_params(), sort_keys=True)
+  return compute_sha256(f"video|{raw_sha256}|{params}".encode())
 
 
-    # ====================================
-    # 3. YOLO결과 + 가구 정보
-    #    VisionDetection 저장 및 응답
-    # ====================================
-    resp_dets: List[Dict[str, Any]] = []
-
-    # yolo결과 하나씩 꺼내기
-    for det in detections:
-      yolo_id = det.get("yolo_id")
-
-      raw_class = det.get("yolo_class")
-      yolo_class = str(raw_class) if raw_class is not None else None
-      
-      confidence = det.get("confidence")
-      bbox = det.get("bbox") or {}
-
-      # YOLO class id로 furniture yolo_id 찾기
-      furniture = map_to_furniture(yolo_id)
-      if furniture is None:
-        logger.error(
-          "Data mismatch: YOLO class has no corresponding Furniture (yolo_id=%s, class=%s)",
-          yolo_id,
-          yolo_class,
-        )
+def _sampled_video_entry(sampled, file_name: str) -> Dict[str, Any]:
+  """
+  샘플링한 영상 -> keyframe 추론 source + 저장할 대표 keyframe (services/video.py)
+  """
+  stem = os.path.splitext(file_name or "video")[0] or "video"
+  return {
+    "data": video.encode_keyframe(sampled.keyframe),
+    "store_name": f"{stem}_keyframe.jpg",
+    "frames": sampled.frames,
+  }
+
+
+def _store_image_file(file_name: str, data: bytes, field_name: str = "image") -> str:
+  """
+  이미지 파일만 스토리지에 저장 (DB 작업 없음 -> io 스레드에서 실행 가능)
+  return: 스토리지에 저장된 이름 (image: vision/{ts}_{name}{ext}, thumbnail: vision/thumbs/...)
+  """
+  field = VisionImage._meta.get_field(field_name)
+  name = field.generate_filename(None, file_name or "image.jpg")
+  return field.storage.save(name, ContentFile(data), max_length=field.max_length)
+
+
+def _store_room_file(index: int, entry: Dict[str, Any]) -> Dict[str, Optional[str]]:
+  """
+  원본 -> 저장용 이미지/썸네일로 정규화(ingest.py) 후 스토리지 저장
+  io 스레드에서 실행 (timing.wrap으로 요청 timer 공유)
+  return: {"image": 저장된 이름, "thumbnail": 저장된 이름 또는 None}
+  """
+  with timing.stage("normalize", room=index):
+    normalized = ingest.normalize_image(entry["data"], entry.get("store_name") or entry["file_name"])
+
+  with timing.stage("storage", room=index):
+    stored = {"image": _store_image_file(normalized.file_name, normalized.data), "thumbnail": None}
+    if normalized.thumbnail is not None:
+      try:
+        stored["thumbnail"] = _store_image_file(normalized.thumbnail_name, normalized.thumbnail, "thumbnail")
+      except Exception:
+        _delete_stored_file(stored["image"])
+        raise
+  return stored
+
+
+def _save_room_images(
+  *,
+  request,
+  parsed: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+  """
+  파싱된 방 정보로 VisionImage DB저장 (이미지 파일도 함께 저장)
+  return: [{"vision_image": VisionImage, "image_url": str, "thumbnail_url": str | None}, ...] (rooms 순서)
+  """
+  saved: List[Dict[str, Any]] = []
+
+  for index, entry in enumerate(parsed):
+    # 정규화한 이미지/썸네일을 먼저 저장하고 VisionImage에는 이름만 지정 (create에서 다시 저장하지 않음)
+    # 샘플링 전 영상(비동기)은 job에서 대표 keyframe을 저장할 때까지 파일 없음
+    stored = {"image": None, "thumbnail": None} if entry.get("video") else _store_room_file(index, entry)
+    try:
+      vision_image = VisionImage.objects.create(
+        room_type=entry["room_type"],
+        image=stored["image"],
+        thumbnail=stored["thumbnail"],
+        image_file_name=entry["file_name"],
+        content_sha256=entry["content_sha256"],
+        sort_order=entry["sort_order"],
+      )
+    except Exception:
+      _delete_stored_files(stored)
+      raise
+
+    saved.append({
+      "vision_image": vision_image,
+      "image_url": _build_image_url(request, vision_image),
+      "thumbnail_url": _build_thumbnail_url(request, vision_image),
+    })
+
+  return saved
+
+
+def _run_detections(
+  content_sha256s: List[str],
+  open_sources: Callable[[List[int]], ContextManager[List[Any]]],
+  uncacheable: Collection[int] = (),
+) -> List[Any]:
+  """
+  이미지별 YOLO 탐지 결과 (입력 순서)
+  - 같은 사진(SHA-256)이 이미 추론된 적 있으면 캐시 결과 사용, 나머지만 batch 추론
+  - open_sources(pending 인덱스 리스트): 추론할 이미지들의 source(배열 또는 로컬 경로)를 여는 context manager
+  - 새로 추론한 결과는 DetectionArrays(columnar) 그대로 넘김 (박스별 dict 생성 없음)
+  - uncacheable: 원본이 아닌 source(정규화된 저장 이미지)로 추론하는 인덱스 -> 원본 SHA-256 키로 캐시 저장하지 않음
+  """
+  with timing.stage("cache_lookup"):
+    detections_per_image: List[Any] = get_cached_detections_many(content_sha256s)
+  pending = [i for i, dets in enumerate(detections_per_image) if dets is None]
+
+  if pending:
+    with open_sources(pending) as sources:
+      with timing.stage("inference"):
+        inferred = _infer_sources(sources)
+
+    for i, dets in zip(pending, inferred):
+      detections_per_image[i] = dets
+    with timing.stage("cache_store"):
+      store_detections_many([(content_sha256s[i], detections_per_image[i]) for i in pending if i not in uncacheable])
+
+  return detections_per_image
+
+
+def _infer_sources(sources: List[Any]) -> List[Any]:
+  """
+  source 목록 batch 추론 (입력 순서)
+  영상은 keyframe 리스트 -> 사진들과 한 번에 batch 추론 후 영상별로 merge_frame_detections
+  """
+  flat: List[Any] = []
+  spans: List[tuple] = []
+  for source in sources:
+    if isinstance(source, list):
+      spans.append((len(flat), len(source), True))
+      flat.extend(source)
+    else:
+      spans.append((len(flat), 1, False))
+      flat.append(source)
+
+  inferred = run_vision_inference_batch(flat, columnar=True)
+
+  return [
+    video.merge_frame_detections(inferred[start:start + count]) if is_video else inferred[start]
+    for start, count, is_video in spans
+  ]
+
+
+@contextmanager
+def _open_stored_sources(
+  saved: List[Dict[str, Any]],
+  indices: List[int],
+  uploads: Optional[Dict[int, bytes]] = None,
+):
+  """
+  이미 스토리지에 저장된 VisionImage들의 추론 source
+  uploads에 원본 bytes가 있으면 다운로드 없이 사용 (get_infer_path), 임시파일로 옮긴 원본(spill_uploads)은 읽어서 사용
+  영상은 uploads에 keyframe 리스트가 들어있으면 그대로 사용 (없으면 저장된 대표 keyframe 1장만 추론)
+  원격 스토리지면 임시파일이 여러 개 생길 수 있으므로 ExitStack으로 한꺼번에 정리
+  """
+  uploads = uploads or {}
+  with ExitStack() as stack:
+    sources = []
+    for i in indices:
+      vision_image = saved[i]["vision_image"]
+      upload = uploads.get(vision_image.id)
+      if isinstance(upload, Path):
+        with timing.stage("read_spilled", room=i):
+          upload = _load_spilled(upload)
+      if isinstance(upload, list):
+        sources.append(upload)
         continue
+      with timing.stage("infer_path", room=i):
+        sources.append(stack.enter_context(get_infer_path(vision_image.image, upload=upload)))
+    yield sources
+
 
-      # DB 저장
-      vd = VisionDetection.objects.create(
+def _build_detection_rows(vision_image: VisionImage, detections: Any) -> List[tuple]:
+  """
+  이미지 1장의 YOLO결과 -> [(VisionDetection, Furniture), ...] (아직 DB 저장 전)
+  """
+  rows: List[tuple] = []
+
+  # yolo결과 하나씩 꺼내기 (DetectionArrays / dict 리스트 모두 같은 row 튜플로)
+  for yolo_id, yolo_class, confidence, (bbox_x, bbox_y, bbox_w, bbox_h) in iter_detection_rows(detections):
+    # YOLO class id로 furniture yolo_id 찾기
+    furniture = map_to_furniture(yolo_id)
+    if furniture is None:
+      FURNITURE_UNMAPPED.inc()
+      logger.error(
+        "Data mismatch: YOLO class has no corresponding Furniture (yolo_id=%s, class=%s)",
+        yolo_id,
+        yolo_class,
+      )
+      continue
+
+    rows.append((
+      VisionDetection(
         vision_image=vision_image,
         yolo_id=yolo_id,
         yolo_class=yolo_class,
         furniture=furniture,
         confidence=confidence,
-        bbox_x=bbox.get("x"),
-        bbox_y=bbox.get("y"),
-        bbox_w=bbox.get("w"),
-        bbox_h=bbox.get("h"),
-      )
+        bbox_x=bbox_x,
+        bbox_y=bbox_y,
+        bbox_w=bbox_w,
+        bbox_h=bbox_h,
+      ),
+      furniture,
+    ))
+
+    ### 에어컨의 경우 실외기 데이터 추가 ###
+    # 실외기는 yolo_id가 없으므로 yolo_id null인 Furniture 중에서 가져옴 (벽걸이용/스탠드용)
+    outdoor_furniture = map_to_outdoor_furniture(yolo_id)
+    if outdoor_furniture is not None:
+      rows.append((
+        VisionDetection(
+          vision_image=vision_image,
+          yolo_id=None,
+          yolo_class=outdoor_furniture.name_en,
+          furniture=outdoor_furniture,
+          confidence=None,
+          bbox_x=None,
+          bbox_y=None,
+          bbox_w=None,
+          bbox_h=None,
+        ),
+        outdoor_furniture,
+      ))
+
+  return rows
+
+
+def _persist_detections(
+  saved: List[Dict[str, Any]],
+  detections_per_image: List[Any],
+  on_room_done: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+  """
+  YOLO결과 + 가구 정보 VisionDetection 저장
+  - 모든 방의 detection(+ 실외기) row를 메모리에서 만든 뒤 요청당 bulk_create 1번
+  - VISION_DETECTION_STORAGE=packed면 행 대신 이미지별 packed 레코드로 bulk_update 1번 (detection_storage.py)
+  - 가구/실외기 정보는 yolo_to_furniture의 프로세스 캐시에서 조회 (detection마다 쿼리 없음)
+  on_room_done(index, room_result): 방 1개 결과가 만들어질 때마다 호출 (비동기 job 진행률용)
+  return: 응답용 results 리스트 (saved 순서)
+  """
+  # 방별 [(VisionDetection, Furniture), ...]
+  rows_per_image: List[List[tuple]] = []
+
+  for index, (entry, detections) in enumerate(zip(saved, detections_per_image)):
+    with timing.stage("furniture_mapping", room=index):
+      rows_per_image.append(_build_detection_rows(entry["vision_image"], detections))
+
+  packed = get_storage_mode() == STORAGE_PACKED
+
+  # DB 저장 (요청당 1번, rows면 PK는 bulk_create가 채워줌)
+  with timing.stage("db_detections"):
+    if packed:
+      images = []
+      for entry, rows in zip(saved, rows_per_image):
+        entry["vision_image"].detections_packed = rows_to_packed(rows)
+        images.append(entry["vision_image"])
+      VisionImage.objects.bulk_update(images, ["detections_packed"])
+    else:
+      VisionDetection.objects.bulk_create([vd for rows in rows_per_image for vd, _ in rows])
 
-      # 응답 결과에 추가
-      resp_dets.append(_serialize_detection(vd, furniture))
-
-
-      ### 에어컨의 경우 실외기 데이터 가져오기 ###
-      # 실외기 이름 정의 (벽걸이용/스탠드용)
-      outdoor_name_en = None   
-      if yolo_id == 0 : # 1 = air_conditioner_stand
-        outdoor_name_en = "ac_outdoor_stand"
-      elif yolo_id == 1 :   # 0 = air_conditioner_wall
-        outdoor_name_en = "ac_outdoor_wall"
-      
-      # 실외기 이름이 있으면 Furniture에서 실외기 정보 가져오기
-      # 실외기는 yolo_id가 없으므로 yolo_id null중에서 가져옴
-      if outdoor_name_en :
-        outdoor_furniture = Furniture.objects.filter(
-          yolo_id__isnull = True,
-          name_en = outdoor_name_en,
-        ).first()
-
-        # 실외기 정보 가져왔으면
-        if outdoor_furniture :
-          outdoor_vd = VisionDetection.objects.create(
-            vision_image=vision_image,
-            yolo_id=None,
-            yolo_class=outdoor_name_en,
-            furniture=outdoor_furniture,
-            confidence=None,
-            bbox_x=None,
-            bbox_y=None,
-            bbox_w=None,
-            bbox_h=None,
-          )
+  results: List[Dict[str, Any]] = []
+  for index, (entry, rows) in enumerate(zip(saved, rows_per_image)):
+    vision_image = entry["vision_image"]
+    if packed:
+      # 이후 조회(get_image_detections)와 같은 값 (detection_id, float32 반올림)
+      detections = packed_to_dicts(vision_image.id, vision_image.detections_packed)
+    else:
+      detections = [serialize_detection(vd, furniture) for vd, furniture in rows]
+
+    room_result = {
+      "vision_image_id": vision_image.id,
+      "room_type": vision_image.room_type,
+      "image_url": entry["image_url"],
+      "thumbnail_url": entry.get("thumbnail_url"),
+      "detections": detections,
+    }
+    results.append(room_result)
+
+    if on_room_done is not None:
+      on_room_done(index, room_result)
+
+  return results
+
+
+@transaction.atomic
+def process_rooms_upload(
+  *,
+  request,
+  rooms: List[Dict[str, Any]],
+  files: List[Any],
+) -> Dict[str, Any]:
+  """
+  1. rooms + files를 요청 받아서 업로드 bytes 읽기 (한 번만)
+  2. 이미지 파일 스토리지 저장은 io 스레드에서 추론과 동시에 진행
+  3. YOLO 모델 추론 (메모리에서 디코딩한 배열을 VISION_BATCH_SIZE 단위 batch로, 캐시된 사진은 생략)
+  4. VisionImage + YOLO결과/가구 정보 VisionDetection 저장 및 응답
+  """
+  # ====================================
+  # 1. rooms + files 파싱
+  # ====================================
+  parsed = _parse_rooms(rooms=rooms, files=files)
+
+  # 다른 프로세스에서 Furniture가 바뀌었으면 가구 매핑 캐시 갱신
+  ensure_furniture_cache_fresh()
+
+
+
+  # ====================================
+  # 2. 스토리지 저장 시작 (추론과 병렬)
+  # ====================================
+  executor = get_io_executor()
+  store_futures = [
+    executor.submit(timing.wrap(_store_room_file), index, entry)
+    for index, entry in enumerate(parsed)
+  ]
+
+  try:
+    # ====================================
+    # 3. 모델 추론 (메모리 디코딩 배열)
+    # ====================================
+    detections_per_image = _run_detections(
+      [entry["content_sha256"] for entry in parsed],
+      lambda indices: nullcontext(_decode_parsed(parsed, indices)),
+    )
+
+    # 추론보다 저장이 늦게 끝난 만큼만 대기 시간으로 잡힘
+    with timing.stage("storage_wait"):
+      stored_files = [f.result() for f in store_futures]
 
-          # 응답 결과에 실외기 추가
-          resp_dets.append(_serialize_detection(outdoor_vd, outdoor_furniture))
 
-    results.append(
+
+    # ====================================
+    # 4. VisionImage + VisionDetection 저장 및 응답
+    # ====================================
+    # 파일은 이미 저장되어 있으므로 이름만 지정 (다시 저장하지 않음), 요청당 bulk_create 1번
+    with timing.stage("db_images"):
+      vision_images = VisionImage.objects.bulk_create([
+        VisionImage(
+          room_type=entry["room_type"],
+          image=stored["image"],
+          thumbnail=stored["thumbnail"],
+          image_file_name=entry["file_name"],
+          content_sha256=entry["content_sha256"],
+          sort_order=entry["sort_order"],
+        )
+        for entry, stored in zip(parsed, stored_files)
+      ])
+    saved = [
       {
-        "vision_image_id": vision_image.id,
-        "room_type": vision_image.room_type,
-        "image_url": image_url,
-        "detections": resp_dets,
+        "vision_image": vision_image,
+        "image_url": _build_image_url(request, vision_image),
+        "thumbnail_url": _build_thumbnail_url(request, vision_image),
       }
+      for vision_image in vision_images
+    ]
+
+    results = _persist_detections(saved, detections_per_image)
+    fused_rooms = fusion.fuse_rooms(results, [entry["group"] for entry in parsed])
+
+  except Exception:
+    # 실패 시 이미 저장된 파일 정리 (DB는 atomic으로 롤백됨)
+    _discard_stored_files(store_futures)
+    raise
+
+  return {"results": results, "fused_rooms": fused_rooms}
+
+
+def _decode_parsed(parsed: List[Dict[str, Any]], indices: List[int]) -> List[Any]:
+  # 영상은 이미 디코딩된 keyframe 리스트 사용
+  image_indices = [i for i in indices if "frames" not in parsed[i]]
+  with timing.stage("decode"):
+    decoded = dict(zip(image_indices, decode_images([parsed[i]["data"] for i in image_indices])))
+  return [parsed[i]["frames"] if "frames" in parsed[i] else decoded[i] for i in indices]
+
+
+def _delete_stored_file(name: str, field_name: str = "image") -> None:
+  try:
+    VisionImage._meta.get_field(field_name).storage.delete(name)
+  except Exception:
+    logger.warning("Failed to delete stored vision image file: %s", name)
+
+
+def _delete_stored_files(stored: Dict[str, Optional[str]]) -> None:
+  for field_name, name in stored.items():
+    if name:
+      _delete_stored_file(name, field_name)
+
+
+def _discard_stored_files(store_futures) -> None:
+  for f in store_futures:
+    try:
+      stored = f.result()
+    except Exception:
+      continue
+    _delete_stored_files(stored)
+
+
+def _keep_upload(entry: Dict[str, Any]) -> Any:
+  # 샘플링 전 영상은 임시파일로 복사한 PendingVideo, 샘플링한 영상은 keyframe 배열 리스트, 사진은 원본 bytes
+  if "pending" in entry:
+    return entry["pending"]
+  return entry["frames"] if "frames" in entry else entry["data"]
+
+
+def _upload_nbytes(entry: Dict[str, Any]) -> int:
+  # 임시파일에 있는 영상은 메모리 예산에 포함하지 않음
+  if "pending" in entry:
+    return 0
+  if "frames" in entry:
+    return sum(frame.nbytes for frame in entry["frames"])
+  return len(entry["data"])
+
+
+def enqueue_rooms_upload(
+  *,
+  request,
+  rooms: List[Dict[str, Any]],
+  files: List[Any],
+) -> VisionUploadJob:
+  """
+  비동기 업로드
+  1. 요청 안에서는 VisionImage 저장 + VisionUploadJob 생성까지만 처리
+     영상은 임시파일로 복사만 하고 keyframe 샘플링/대표 프레임 저장은 job에서 (응답 지연 없음)
+  2. 추론/VisionDetection 저장은 commit 후 백그라운드 worker에서 처리 (jobs.py)
+  """
+  parsed = _parse_rooms(rooms=rooms, files=files, sample_videos=False)
+
+  url_base = request.build_absolute_uri("/")
+  pending = {}
+  try:
+    for index, entry in enumerate(parsed):
+      if entry.get("video"):
+        with timing.stage("video_spool", room=index):
+          entry["pending"] = pending[index] = PendingVideo(
+            path=video.spool_upload(entry["uploaded"], entry["file_name"]),
+            file_name=entry["file_name"],
+            url_base=url_base,
+          )
+    return _create_upload_job(request=request, parsed=parsed)
+  except BaseException:
+    # job에 넘기지 못했으면 복사한 영상 임시파일 정리 (on_commit 이후에는 job이 정리)
+    discard_uploads(pending)
+    raise
+
+
+def _create_upload_job(*, request, parsed: List[Dict[str, Any]]) -> VisionUploadJob:
+  with transaction.atomic():
+    saved = _save_room_images(request=request, parsed=parsed)
+
+    job = VisionUploadJob.objects.create(
+      rooms_total=len(saved),
+      rooms=[
+        {
+          "vision_image_id": entry["vision_image"].id,
+          "room_type": entry["vision_image"].room_type,
+          "image_url": entry["image_url"],
+          "thumbnail_url": entry["thumbnail_url"],
+          "group": parsed_entry["group"],
+          "status": VisionUploadJob.Status.PENDING,
+        }
+        for entry, parsed_entry in zip(saved, parsed)
+      ],
+    )
+
+    # 같은 프로세스의 worker가 실행하므로 원본 bytes를 넘겨서 스토리지 재다운로드 생략
+    # 스토리지에는 정규화(축소/재인코딩)된 이미지만 있으므로 원본으로 추론해야 캐시(원본 SHA-256)와 결과가 같음
+    # (job 상한/프로세스 예산을 넘으면 commit 후 임시파일로 옮겨서 메모리에 들고 있지 않음, jobs.py)
+    uploads = {
+      entry["vision_image"].id: _keep_upload(parsed_entry)
+      for entry, parsed_entry in zip(saved, parsed)
+    }
+    upload_nbytes = sum(_upload_nbytes(entry) for entry in parsed)
+
+    # 이미지/Job이 commit된 뒤에 worker가 읽도록 on_commit으로 등록
+    transaction.on_commit(lambda: submit_upload_job(job.id, uploads=uploads, upload_nbytes=upload_nbytes))
+
+  return job
+
+
+def spill_uploads(uploads: Dict[int, Any]) -> Dict[int, Any]:
+  """
+  메모리에 들고 있기에는 큰 job의 원본 업로드를 로컬 임시파일로 옮김 (jobs.submit_upload_job에서 commit 후 호출)
+  사진은 원본 bytes 그대로, 영상은 keyframe 배열들을 .npz로 저장 (샘플링 전 영상은 이미 임시파일이므로 그대로)
+  임시파일은 job 실행이 끝나면 discard_uploads로 삭제
+  """
+  spilled: Dict[int, Any] = {}
+  try:
+    for vision_image_id, upload in uploads.items():
+      if isinstance(upload, PendingVideo):
+        continue
+      is_frames = isinstance(upload, list)
+      fd, path = tempfile.mkstemp(prefix="vision-job-", suffix=".npz" if is_frames else ".upload")
+      spilled[vision_image_id] = Path(path)
+      with os.fdopen(fd, "wb") as f:
+        if is_frames:
+          import numpy as np
+
+          np.savez(f, *upload)
+        else:
+          f.write(upload)
+  except Exception:
+    discard_uploads(spilled)
+    raise
+  spilled.update(on_disk_uploads(uploads))
+  return spilled
+
+
+def on_disk_uploads(uploads: Optional[Dict[int, Any]]) -> Dict[int, Any]:
+  """
+  임시파일에만 있는 업로드 (샘플링 전 영상) -> 메모리 업로드를 버려도 job에 계속 넘겨야 함
+  """
+  return {k: v for k, v in (uploads or {}).items() if isinstance(v, PendingVideo)}
+
+
+def _load_spilled(path: Path) -> Any:
+  if path.suffix == ".npz":
+    import numpy as np
+
+    with np.load(path) as npz:
+      return [npz[name] for name in npz.files]
+  return path.read_bytes()
+
+
+def discard_uploads(uploads: Optional[Dict[int, Any]]) -> None:
+  for upload in (uploads or {}).values():
+    if isinstance(upload, PendingVideo):
+      upload = upload.path
+    if isinstance(upload, Path):
+      try:
+        upload.unlink()
+      except OSError:
+        logger.warning("Failed to delete spilled upload: %s", upload)
+
+
+def _stored_is_original(vision_image: VisionImage) -> bool:
+  # 정규화를 끈 사진만 스토리지 파일 = 원본 (영상은 대표 keyframe만 저장됨)
+  return not ingest.is_enabled() and not video.is_video_upload(None, vision_image.image_file_name or "")
+
+
+def _sample_pending_videos(
+  chunk: List[Dict[str, Any]],
+  rooms: List[Dict[str, Any]],
+  uploads: Dict[int, Any],
+  start: int,
+) -> bool:
+  """
+  비동기 영상 업로드: keyframe 샘플링 + 대표 keyframe 저장 (요청에서 하지 않고 job에서)
+  uploads의 PendingVideo를 keyframe 배열 리스트로 바꾸고 VisionImage/job.rooms의 이미지 URL을 채움
+  return: 샘플링한 영상이 있으면 True
+  """
+  sampled_any = False
+  for offset, (entry, room) in enumerate(zip(chunk, rooms)):
+    vision_image = entry["vision_image"]
+    pending = uploads.get(vision_image.id)
+    if not isinstance(pending, PendingVideo):
+      continue
+
+    index = start + offset
+    with timing.stage("video_sample", room=index):
+      try:
+        sampled = video.sample_keyframes(str(pending.path))
+      finally:
+        discard_uploads({vision_image.id: pending})
+    uploads[vision_image.id] = sampled.frames
+
+    stored = _store_room_file(index, {"file_name": pending.file_name, **_sampled_video_entry(sampled, pending.file_name)})
+    try:
+      vision_image.image = stored["image"]
+      vision_image.thumbnail = stored["thumbnail"]
+      vision_image.save(update_fields=["image", "thumbnail"])
+    except Exception:
+      _delete_stored_files(stored)
+      raise
+
+    entry["image_url"] = room["image_url"] = urljoin(pending.url_base, vision_image.image.url)
+    entry["thumbnail_url"] = room["thumbnail_url"] = (
+      urljoin(pending.url_base, vision_image.thumbnail.url) if vision_image.thumbnail else None
     )
+    sampled_any = True
+  return sampled_any
+
+
+def _get_job_chunk_size() -> int:
+  # 비동기 job의 진행 상황 저장 단위 (기본 VISION_BATCH_SIZE -> batch 추론 효율은 그대로)
+  size = getattr(settings, "VISION_ASYNC_CHUNK_SIZE", None) or getattr(settings, "VISION_BATCH_SIZE", 8)
+  return max(1, int(size))
 
-  return {"results": results}
+
+def run_upload_job(job: VisionUploadJob, uploads: Optional[Dict[int, bytes]] = None) -> Dict[str, Any]:
+  """
+  백그라운드 worker에서 호출
+  job.rooms에 저장된 VisionImage들을 chunk 단위로 추론/저장하고 chunk마다 방별 진행 상황 저장
+  uploads: {vision_image_id: 원본 bytes, 영상은 keyframe 배열 리스트 또는 샘플링 전 PendingVideo, 또는 임시파일 Path}
+    (enqueue한 요청에서 넘겨준 경우, 없으면 스토리지에서 읽고 캐시에는 저장하지 않음)
+  """
+  uploads = uploads or {}
+  ids = [room["vision_image_id"] for room in job.rooms]
+  images = VisionImage.objects.in_bulk(ids)
+
+  saved: List[Dict[str, Any]] = []
+  for room in job.rooms:
+    vision_image = images.get(room["vision_image_id"])
+    if vision_image is None:
+      raise ValueError(f"VisionImage not found: {room['vision_image_id']}")
+    saved.append({
+      "vision_image": vision_image,
+      "image_url": room["image_url"],
+      "thumbnail_url": room.get("thumbnail_url"),
+    })
+
+  def _save_progress() -> None:
+    job.save(update_fields=["rooms", "rooms_done", "updated_at"])
+
+  def _on_room_done(index: int, room_result: Dict[str, Any]) -> None:
+    job.rooms[index]["status"] = VisionUploadJob.Status.DONE
+    job.rooms[index]["detections_count"] = len(room_result["detections"])
+    job.rooms_done = index + 1
+
+  ensure_furniture_cache_fresh()
+  chunk_size = _get_job_chunk_size()
+
+  # 요청 밖(worker 스레드)이므로 job 단위로 timing 기록 (로그만)
+  with timing.track("vision_upload_job", job_id=str(job.job_id), rooms=len(saved)):
+    # 추론 + 저장을 chunk(기본 VISION_BATCH_SIZE장) 단위로 -> chunk가 끝날 때마다 rooms_done이 GET 응답에 보임
+    # 진행 상황이 GET 요청에서 바로 보이도록 job 전체를 하나의 트랜잭션으로 묶지 않음 (autocommit)
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(saved), chunk_size):
+      chunk = saved[start:start + chunk_size]
+      for room in job.rooms[start:start + chunk_size]:
+        room["status"] = VisionUploadJob.Status.RUNNING
+      _save_progress()
+
+      if _sample_pending_videos(chunk, job.rooms[start:start + chunk_size], uploads, start):
+        _save_progress()
+
+      detections_per_image = _run_detections(
+        [entry["vision_image"].content_sha256 for entry in chunk],
+        lambda indices, chunk=chunk: _open_stored_sources(chunk, indices, uploads),
+        uncacheable={
+          i for i, entry in enumerate(chunk)
+          if entry["vision_image"].id not in uploads and not _stored_is_original(entry["vision_image"])
+        },
+      )
+      results.extend(_persist_detections(
+        chunk,
+        detections_per_image,
+        on_room_done=lambda index, room_result, start=start: _on_room_done(start + index, room_result),
+      ))
+      _save_progress()
+
+    fused_rooms = fusion.fuse_rooms(results, [room.get("group") for room in job.rooms])
+
+  # 방별 detections는 이미 VisionDetection/packed로 저장되어 있으므로 job.result에 다시 저장하지 않음 (load_job_results)
+  return {
+    "results": [{k: v for k, v in room.items() if k != "detections"} for room in results],
+    "fused_rooms": fused_rooms,
+  }
+
+
+def load_job_results(job: VisionUploadJob) -> Optional[List[Dict[str, Any]]]:
+  """
+  완료된 job의 방별 결과 (업로드 201 응답의 results와 같은 형태)
+  detections는 저장 방식(rows/packed)과 관계없이 get_detections_many로 한 번에 조회
+  (detections를 job.result에 같이 저장하던 이전 job은 저장된 값 그대로)
+  """
+  results = (job.result or {}).get("results")
+  if results is None:
+    return None
+
+  ids = [room["vision_image_id"] for room in results if "detections" not in room]
+  detections = get_detections_many(VisionImage.objects.filter(id__in=ids).only("id", "detections_packed")) if ids else {}
+  return [
+    room if "detections" in room else {**room, "detections": detections.get(room["vision_image_id"], [])}
+    for room in results
+  ]
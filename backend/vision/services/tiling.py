@@ -0,0 +1,164 @@
+# vision/services/tiling.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+from django.conf import settings
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+
+# 고해상도 사진 tiled 추론
+# - 넓은 거실 사진을 640px로 줄이면 모니터/전자레인지/의자 같은 작은 가구가 사라짐
+# - 긴 변이 VISION_TILE_MIN_SIDE 이상인 이미지만 겹치는 tile로 나눠서 추론 (나머지는 기존 1회 추론)
+# - 전체 이미지 1장 + tile들을 한 batch로 추론 -> 전체 이미지 좌표로 변환 -> 클래스별 NMS
+# - 큰 가구(소파 등)는 전체 이미지 추론에서 찾고,
+#   tile 안쪽 경계에 걸린(잘린) 박스는 버림 (겹침 영역 때문에 작은 물체는 다른 tile에서 온전히 잡힘)
+
+Rect = Tuple[int, int, int, int]  # x1, y1, x2, y2 (픽셀)
+
+
+@dataclass(frozen=True)
+class TileSettings:
+  min_side: int
+  tile_size: int
+  overlap: float
+  nms_iou: float
+
+
+def is_enabled() -> bool:
+  return bool(getattr(settings, "VISION_TILE_ENABLED", False))
+
+
+def get_tile_settings() -> TileSettings:
+  imgsz = int(getattr(settings, "VISION_IMG_SIZE", 640))
+  return TileSettings(
+    min_side=int(getattr(settings, "VISION_TILE_MIN_SIDE", 1920)),
+    tile_size=int(getattr(settings, "VISION_TILE_SIZE", imgsz * 2)),
+    overlap=float(getattr(settings, "VISION_TILE_OVERLAP", 0.2)),
+    nms_iou=float(getattr(settings, "VISION_TILE_NMS_IOU", 0.5)),
+  )
+
+
+def should_tile(shape: Sequence[int], cfg: TileSettings) -> bool:
+  img_h, img_w = shape[0], shape[1]
+  return max(img_h, img_w) >= cfg.min_side and max(img_h, img_w) > cfg.tile_size
+
+
+def _axis_starts(length: int, tile: int, stride: int) -> List[int]:
+  if length <= tile:
+    return [0]
+  starts = list(range(0, length - tile, stride))
+  # 마지막 tile은 이미지 끝에 맞춤
+  starts.append(length - tile)
+  return starts
+
+
+def plan_tiles(img_h: int, img_w: int, cfg: TileSettings) -> List[Rect]:
+  """
+  overlap 비율만큼 겹치는 tile 좌표 목록
+  """
+  tile = cfg.tile_size
+  stride = max(1, int(tile * (1 - cfg.overlap)))
+  return [
+    (x, y, min(x + tile, img_w), min(y + tile, img_h))
+    for y in _axis_starts(img_h, tile, stride)
+    for x in _axis_starts(img_w, tile, stride)
+  ]
+
+
+def crop(image, rect: Rect):
+  x1, y1, x2, y2 = rect
+  return np.ascontiguousarray(image[y1:y2, x1:x2])
+
+
+def result_arrays(r):
+  """
+  ultralytics Results -> (xyxy (N,4) float32, cls (N,) int64, conf (N,) float32) numpy 배열
+  """
+  if r.boxes is None or len(r.boxes) == 0:
+    return (
+      np.zeros((0, 4), dtype=np.float32),
+      np.zeros((0,), dtype=np.int64),
+      np.zeros((0,), dtype=np.float32),
+    )
+  return (
+    r.boxes.xyxy.cpu().numpy().astype(np.float32, copy=False),
+    r.boxes.cls.cpu().numpy().astype(np.int64),
+    r.boxes.conf.cpu().numpy().astype(np.float32, copy=False),
+  )
+
+
+def _interior_edge_mask(xyxy, rect: Rect, img_w: int, img_h: int, margin: float = 2.0):
+  """
+  tile 안쪽 경계(이미지 가장자리가 아닌 경계)에 닿은 박스 = tile에 잘린 박스 -> False
+  """
+  x1, y1, x2, y2 = rect
+  keep = np.ones(len(xyxy), dtype=bool)
+  if x1 > 0:
+    keep &= xyxy[:, 0] > x1 + margin
+  if y1 > 0:
+    keep &= xyxy[:, 1] > y1 + margin
+  if x2 < img_w:
+    keep &= xyxy[:, 2] < x2 - margin
+  if y2 < img_h:
+    keep &= xyxy[:, 3] < y2 - margin
+  return keep
+
+
+def nms_per_class(xyxy, cls, conf, iou_threshold: float):
+  """
+  클래스별 greedy NMS
+  return: 남길 인덱스 (confidence 내림차순)
+  """
+  if len(xyxy) == 0:
+    return np.zeros((0,), dtype=np.int64)
+
+  # 클래스마다 좌표를 멀리 띄워서 한 번의 NMS로 클래스별 NMS 효과
+  offset = (cls.astype(np.float32) * (float(xyxy.max()) + 1.0))[:, None]
+  boxes = xyxy + offset
+
+  areas = (boxes[:, 2] - boxes[:, 0]).clip(0) * (boxes[:, 3] - boxes[:, 1]).clip(0)
+  order = np.argsort(-conf)
+  keep = []
+
+  while order.size:
+    i = order[0]
+    keep.append(i)
+    rest = order[1:]
+
+    iw = (np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0])).clip(0)
+    ih = (np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1])).clip(0)
+    inter = iw * ih
+    iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+
+    order = rest[iou <= iou_threshold]
+
+  return np.asarray(keep, dtype=np.int64)
+
+
+def merge_tiled(full_arrays, tile_arrays: List[tuple], tile_rects: List[Rect], img_w: int, img_h: int, cfg: TileSettings):
+  """
+  전체 이미지 결과 + tile 결과들 -> 전체 이미지 픽셀 좌표 (xyxy, cls, conf)
+  """
+  xyxys, clss, confs = [full_arrays[0]], [full_arrays[1]], [full_arrays[2]]
+
+  for (xyxy, cls, conf), rect in zip(tile_arrays, tile_rects):
+    if len(xyxy) == 0:
+      continue
+    shifted = xyxy + np.array([rect[0], rect[1], rect[0], rect[1]], dtype=np.float32)
+    keep = _interior_edge_mask(shifted, rect, img_w, img_h)
+    xyxys.append(shifted[keep])
+    clss.append(cls[keep])
+    confs.append(conf[keep])
+
+  xyxy = np.concatenate(xyxys, axis=0)
+  cls = np.concatenate(clss, axis=0)
+  conf = np.concatenate(confs, axis=0)
+
+  keep = nms_per_class(xyxy, cls, conf, cfg.nms_iou)
+  return xyxy[keep], cls[keep], conf[keep]
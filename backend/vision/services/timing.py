@@ -0,0 +1,140 @@
+# vision/services/timing.py
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger("vision.timing")
+
+
+# 업로드 파이프라인 단계별 시간 측정
+# - track(): 요청(또는 비동기 job) 1건 단위 timer를 contextvar에 등록
+# - stage(): 등록된 timer가 있으면 구간 시간을 누적 (없으면 아무것도 안 함)
+# - 같은 단계가 여러 번 호출되면 합산, room을 넘기면 방별로도 합산
+# - io 스레드에서 실행되는 작업은 wrap()으로 감싸서 요청의 timer를 그대로 사용
+# 결과: Server-Timing 응답 헤더 (VISION_SERVER_TIMING) + "vision.timing" 로거 JSON 로그 (VISION_TIMING_LOG)
+#
+# 주요 단계
+# parse(multipart) / read_upload / video_sample(영상, 방별) / normalize, storage(io 스레드, 방별 합) / storage_wait / decode / cache_lookup
+# inference / cache_store / infer_path(get_infer_path, 방별) / furniture_mapping(방별) / db_images / db_detections / fusion
+
+_current: contextvars.ContextVar[Optional["StageTimer"]] = contextvars.ContextVar("vision_stage_timer", default=None)
+
+
+class StageTimer:
+
+  def __init__(self, name: str, context: Optional[Dict[str, Any]] = None):
+    self.name = name
+    self.context: Dict[str, Any] = dict(context or {})
+    self.stages: Dict[str, float] = {}
+    self.rooms: Dict[int, Dict[str, float]] = {}
+    self.total_ms: Optional[float] = None
+    self._lock = threading.Lock()
+    self._start = time.perf_counter()
+
+  def add(self, stage: str, ms: float, room: Optional[int] = None) -> None:
+    # io 스레드에서도 호출되므로 lock
+    with self._lock:
+      self.stages[stage] = self.stages.get(stage, 0.0) + ms
+      if room is not None:
+        per_room = self.rooms.setdefault(room, {})
+        per_room[stage] = per_room.get(stage, 0.0) + ms
+
+  @contextmanager
+  def stage(self, name: str, room: Optional[int] = None) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.add(name, (time.perf_counter() - start) * 1000, room)
+
+  def finish(self) -> None:
+    if self.total_ms is None:
+      self.total_ms = (time.perf_counter() - self._start) * 1000
+
+  def as_record(self) -> Dict[str, Any]:
+    with self._lock:
+      stages = {k: round(v, 2) for k, v in self.stages.items()}
+      rooms = [
+        {"room": index, **{k: round(v, 2) for k, v in per_room.items()}}
+        for index, per_room in sorted(self.rooms.items())
+      ]
+    return {
+      "event": self.name,
+      **self.context,
+      "total_ms": round(self.total_ms, 2) if self.total_ms is not None else None,
+      "stages": stages,
+      "rooms": rooms,
+    }
+
+  def server_timing(self) -> str:
+    """
+    Server-Timing 헤더 값 (요청 단위 합계만, 방별 값은 로그에만 남김)
+    """
+    with self._lock:
+      parts = [f"{name};dur={ms:.1f}" for name, ms in self.stages.items()]
+    if self.total_ms is not None:
+      parts.append(f"total;dur={self.total_ms:.1f}")
+    return ", ".join(parts)
+
+
+def current() -> Optional[StageTimer]:
+  return _current.get()
+
+
+@contextmanager
+def track(name: str, **context) -> Iterator[StageTimer]:
+  """
+  요청/작업 1건의 timer 등록, 끝나면 JSON 로그 기록
+  """
+  timer = StageTimer(name, context)
+  token = _current.set(timer)
+  try:
+    yield timer
+  except BaseException:
+    timer.context["failed"] = True
+    raise
+  finally:
+    _current.reset(token)
+    timer.finish()
+    if getattr(settings, "VISION_TIMING_LOG", True):
+      record = timer.as_record()
+      logger.info("%s %s", name, json.dumps(record, ensure_ascii=False), extra={"vision_timing": record})
+
+
+@contextmanager
+def stage(name: str, room: Optional[int] = None) -> Iterator[None]:
+  timer = _current.get()
+  if timer is None:
+    yield
+    return
+  with timer.stage(name, room):
+    yield
+
+
+def wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+  """
+  다른 스레드(executor)에서 실행할 함수가 현재 요청의 timer를 쓰도록 contextvar 복사
+  (Context는 동시에 여러 스레드에서 run할 수 없으므로 호출마다 복사)
+  """
+  ctx = contextvars.copy_context()
+
+  @functools.wraps(fn)
+  def _run(*args, **kwargs):
+    return ctx.run(fn, *args, **kwargs)
+
+  return _run
+
+
+def apply_server_timing(response, timer: StageTimer):
+  if getattr(settings, "VISION_SERVER_TIMING", True):
+    response["Server-Timing"] = timer.server_timing()
+  return response
@@ -0,0 +1,254 @@
+# vision/services/video.py
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Optional
+
+from django.conf import settings
+
+from .detections import DetectionArrays, merge_detections
+from .image_io import get_decode_size
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+try:
+  import cv2
+except ImportError:
+  cv2 = None
+
+
+# 방 하나를 찍은 짧은 영상 업로드 (사진 여러 장 대신)
+# - VISION_VIDEO_SAMPLE_FPS(기본 2)로 프레임을 훑고, 마지막으로 고른 프레임과 거의 같은 프레임은 건너뜀
+#   (64x64 흑백 축소 후 평균 절대 차이 < VISION_VIDEO_DIFF_THRESHOLD(기본 12, 0~255))
+# - 고른 keyframe이 VISION_VIDEO_MAX_FRAMES(기본 12)보다 많으면 영상 전체에 고르게 줄임 -> 추론 비용 상한
+#   샘플링 중에도 후보는 max_frames x 2장까지만 들고 있음 (넘으면 하나 걸러 버리고 간격을 2배로)
+# - VISION_VIDEO_MAX_SECONDS(기본 60)초 이후 프레임은 읽지 않음
+# - VISION_VIDEO_MAX_BYTES(기본 200MB)보다 큰 업로드는 샘플링 전에 400 (업로드 전체를 메모리에 읽지 않음)
+# - opencv는 선택 의존성: VISION_VIDEO_ENABLED 기본값은 cv2 설치 여부, 사용할 수 없으면 영상 업로드는 400
+# - keyframe들은 batch 추론 후 merge_detections(max)로 방 하나의 탐지 결과로 합침
+# - 가장 선명한 keyframe(Laplacian 분산)을 VisionImage.image로 저장, 추론 keyframe 목록의 첫 번째로 포함
+#   bbox는 저장된 keyframe 좌표이므로 다른 keyframe에서 고른 탐지는 bbox 없음(None)
+
+VIDEO_EXTS = {".mp4", ".mov", ".m4v", ".webm", ".avi", ".mkv"}
+
+_DIFF_SIZE = (64, 64)
+
+# keyframe 선택/병합 방식이 바뀌면 올림 (캐시 fingerprint에 포함 -> 이전 방식의 캐시 결과 재사용 안 함)
+_SAMPLING_VERSION = 2
+
+
+@dataclass
+class SampledVideo:
+  frames: List[Any]       # 추론용 keyframe (H, W, 3) uint8 BGR, 긴 변은 디코딩 크기(get_decode_size) 이하
+                          # frames[0]은 저장용 대표 프레임(keyframe)을 축소한 것, 나머지는 영상 순서
+  keyframe: Any           # 저장용 대표 프레임 (원본 해상도)
+  frame_indices: List[int]
+
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def is_enabled() -> bool:
+  return bool(getattr(settings, "VISION_VIDEO_ENABLED", cv2 is not None))
+
+
+def get_max_bytes() -> int:
+  return int(getattr(settings, "VISION_VIDEO_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+
+def is_video_upload(uploaded, file_name: str = "") -> bool:
+  content_type = (getattr(uploaded, "content_type", "") or "").lower()
+  if content_type.startswith("video/"):
+    return True
+  _, ext = os.path.splitext(file_name or getattr(uploaded, "name", "") or "")
+  return ext.lower() in VIDEO_EXTS
+
+
+def get_sampling_params() -> dict:
+  """
+  keyframe 선택에 영향을 주는 설정 (탐지 캐시 fingerprint에도 포함)
+  """
+  return {
+    "version": _SAMPLING_VERSION,
+    "sample_fps": float(getattr(settings, "VISION_VIDEO_SAMPLE_FPS", 2.0)),
+    "diff_threshold": float(getattr(settings, "VISION_VIDEO_DIFF_THRESHOLD", 12.0)),
+    "max_frames": max(1, int(getattr(settings, "VISION_VIDEO_MAX_FRAMES", 12))),
+    "max_seconds": float(getattr(settings, "VISION_VIDEO_MAX_SECONDS", 60)),
+    "decode_size": get_decode_size(),
+  }
+
+
+def check_upload(uploaded) -> None:
+  """
+  영상 업로드를 처리할 수 있는지 확인 (샘플링/hash 전에 호출, 실패하면 ValueError -> 400)
+  """
+  if not is_enabled() or cv2 is None or np is None:
+    raise ValueError("video upload is not supported")
+
+  size = getattr(uploaded, "size", None)
+  max_bytes = get_max_bytes()
+  if size is not None and max_bytes > 0 and size > max_bytes:
+    raise ValueError(f"video too large: {size} bytes (max={max_bytes})")
+
+
+def _require_cv2() -> None:
+  if cv2 is None or np is None:
+    raise RuntimeError("opencv가 설치되어 있지 않습니다. pip install opencv-python-headless")
+
+
+def _resize_long_side(frame, size: int):
+  h, w = frame.shape[:2]
+  if size <= 0 or max(h, w) <= size:
+    return frame
+  scale = size / max(h, w)
+  return cv2.resize(frame, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+def _spread(count: int, limit: int) -> List[int]:
+  """
+  0..count-1 중 limit개를 고르게 선택 (처음/끝 포함)
+  """
+  if count <= limit:
+    return list(range(count))
+  return sorted(set(np.linspace(0, count - 1, limit).round().astype(int).tolist()))
+
+
+def sample_keyframes(path: str) -> SampledVideo:
+  """
+  영상 파일 -> keyframe 목록
+  건너뛸 프레임은 grab()만 하고 retrieve()(BGR 변환)는 샘플링 시점에만 호출
+  """
+  _require_cv2()
+  params = get_sampling_params()
+
+  cap = cv2.VideoCapture(path)
+  if not cap.isOpened():
+    raise ValueError("cannot open video file")
+
+  try:
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    step = max(1, round(fps / params["sample_fps"])) if params["sample_fps"] > 0 else 1
+    last_index = int(fps * params["max_seconds"]) if params["max_seconds"] > 0 else None
+
+    frames: List[Any] = []
+    frame_indices: List[int] = []
+    keyframe = keyframe_small = keyframe_index = None
+    best_sharpness = -1.0
+    prev_small = None
+    index = 0
+    # 후보 상한: 넘으면 하나 걸러 버리고 이후에는 keep_every번째 후보만 추가 (영상 전체에 고르게 유지)
+    max_candidates = params["max_frames"] * 2
+    keep_every = 1
+    accepted = 0
+
+    while last_index is None or index <= last_index:
+      if not cap.grab():
+        break
+      if index % step == 0:
+        ok, frame = cap.retrieve()
+        if not ok:
+          break
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, _DIFF_SIZE, interpolation=cv2.INTER_AREA)
+
+        # 직전에 고른 keyframe과 비교 (천천히 움직이는 영상도 변화량이 누적되면 선택됨)
+        if prev_small is None or float(cv2.absdiff(small, prev_small).mean()) >= params["diff_threshold"]:
+          prev_small = small
+          resized = _resize_long_side(frame, params["decode_size"])
+
+          sharpness = float(cv2.Laplacian(_resize_long_side(gray, 512), cv2.CV_64F).var())
+          if sharpness > best_sharpness:
+            best_sharpness = sharpness
+            keyframe, keyframe_small, keyframe_index = frame, resized, index
+
+          if accepted % keep_every == 0:
+            frames.append(resized)
+            frame_indices.append(index)
+            if len(frames) > max_candidates:
+              frames, frame_indices = frames[::2], frame_indices[::2]
+              keep_every *= 2
+          accepted += 1
+      index += 1
+  finally:
+    cap.release()
+
+  if not frames:
+    raise ValueError("video has no readable frames")
+
+  # 대표 keyframe을 맨 앞에 두고 나머지 max_frames - 1장을 고르게 선택
+  others = [i for i, frame_index in enumerate(frame_indices) if frame_index != keyframe_index]
+  keep = [others[i] for i in _spread(len(others), params["max_frames"] - 1)]
+  return SampledVideo(
+    frames=[keyframe_small] + [frames[i] for i in keep],
+    keyframe=keyframe,
+    frame_indices=[keyframe_index] + [frame_indices[i] for i in keep],
+  )
+
+
+def spool_upload(uploaded, file_name: str = "") -> Path:
+  """
+  업로드 -> 로컬 임시파일 (chunk 단위 복사, 삭제는 호출한 쪽에서)
+  """
+  _, ext = os.path.splitext(file_name or getattr(uploaded, "name", "") or "")
+  fd, path = tempfile.mkstemp(prefix="vision-video-", suffix=ext or ".mp4")
+  try:
+    with os.fdopen(fd, "wb") as f:
+      if hasattr(uploaded, "chunks"):
+        for chunk in uploaded.chunks():
+          f.write(chunk)
+      else:
+        shutil.copyfileobj(uploaded, f)
+  except BaseException:
+    os.remove(path)
+    raise
+  finally:
+    if hasattr(uploaded, "seek"):
+      uploaded.seek(0)
+  return Path(path)
+
+
+def sample_keyframes_from_upload(uploaded, file_name: str = "") -> SampledVideo:
+  """
+  OpenCV는 파일 경로만 읽을 수 있으므로
+  Django가 임시파일로 받은 업로드면 그 경로를 쓰고, 아니면 임시파일로 복사 후 삭제
+  """
+  if hasattr(uploaded, "temporary_file_path"):
+    return sample_keyframes(uploaded.temporary_file_path())
+
+  path = spool_upload(uploaded, file_name)
+  try:
+    return sample_keyframes(str(path))
+  finally:
+    try:
+      os.remove(path)
+    except OSError:
+      pass
+
+
+def encode_keyframe(frame, quality: Optional[int] = None) -> bytes:
+  """
+  대표 프레임 -> JPEG bytes (이후 ingest.normalize_image로 저장용 포맷/썸네일 처리)
+  """
+  _require_cv2()
+  quality = int(quality or getattr(settings, "VISION_VIDEO_KEYFRAME_QUALITY", 92))
+  ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+  if not ok:
+    raise ValueError("cannot encode video keyframe")
+  return buf.tobytes()
+
+
+def merge_frame_detections(per_frame: List[Any]) -> DetectionArrays:
+  """
+  keyframe별 탐지 결과 -> 방 하나의 탐지 결과 (per_frame[0]은 저장된 대표 keyframe)
+  같은 가구가 여러 프레임에 찍히므로 class별로 한 프레임에서 가장 많이 보인 개수만 인정 (max)
+  bbox는 저장된 keyframe에서 고른 탐지만 남김 (다른 프레임 좌표는 저장된 이미지와 맞지 않음)
+  """
+  return merge_detections(per_frame, default_rule="max", bbox_source=0)
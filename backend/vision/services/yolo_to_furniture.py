@@ -1,25 +1,85 @@
 # vision/services/yolo_to_furniture.py
 from __future__ import annotations
 
+from dataclasses import dataclass
 from functools import lru_cache
-from typing import Optional, Dict
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Dict
 
+from config import metrics
+from policy import versioning
 from policy.models import Furniture
 
 
+# 에어컨 yolo_id -> 실외기 Furniture.name_en
+# 실외기는 사진에서 탐지하지 않으므로(yolo_id 없음) 에어컨 탐지 시 함께 추가
+OUTDOOR_UNIT_BY_YOLO_ID: Dict[int, str] = {
+  0: "ac_outdoor_stand",  # 0 = 스탠드 에어컨
+  1: "ac_outdoor_wall",   # 1 = 벽걸이 에어컨
+}
+
+
+FURNITURE_MAP_LOOKUPS = metrics.counter(
+  "vision_furniture_map_lookups_total",
+  "가구 매핑 캐시 조회 수 (hit: 캐시 사용 / miss: Furniture 다시 읽음)",
+  labelnames=("result",),
+)
+
+
+@dataclass(frozen=True)
+class FurnitureMaps:
+  # yolo_id -> Furniture
+  by_yolo_id: Dict[int, Furniture]
+  # yolo_id가 없는 Furniture (실외기 등) name_en -> Furniture
+  by_name_en_without_yolo: Dict[str, Furniture]
+  # Furniture.id -> detection 응답용 가구 필드 (읽기 전용)
+  payloads: Dict[int, Mapping[str, Any]]
+
+
+def _build_furniture_payload(f: Furniture) -> Mapping[str, Any]:
+  """
+  detection 응답의 가구 관련 필드 (detection마다 다시 만들지 않도록 가구별 1번만 생성)
+  읽기 전용: 응답에는 detection_storage._detection_dict가 만든 복사본(guide_size_cm 포함)을 사용
+  """
+  guide_size_cm = None
+  if f.width_cm is not None and f.depth_cm is not None and f.height_cm is not None:
+    guide_size_cm = {
+      "width_cm": f.width_cm,
+      "depth_cm": f.depth_cm,
+      "height_cm": f.height_cm,
+    }
+
+  return MappingProxyType({
+    "detection_id": None,
+    "furniture_id": f.id,
+    "name_kr": f.name_kr,
+    "name_en": f.name_en,
+    "category": f.category,
+    "confidence": None,
+    "bbox": None,
+    "description": f.description,
+    "reference_model": f.reference_model,
+    "reference_url": f.reference_url,
+    "guide_size_cm": guide_size_cm,
+    "needs_disassembly": getattr(f, "needs_disassembly_default", False),
+  })
+
+
 @lru_cache(maxsize=1)
-def _build_yolo_id_map() -> Dict[int, Furniture]:
+def _build_furniture_maps() -> FurnitureMaps:
   """
-  Furniture를 한 번만 읽어서 yolo_id -> Furniture 매핑 딕셔너리 생성.
+  Furniture를 한 번만 읽어서 yolo_id / name_en 매핑 딕셔너리 생성.
   Furniture데이터 변경으로 캐시 초기화 필요 시 invalidate_furniture_cache()호출 필요
   """
 
   qs = Furniture.objects.all()
   mp: Dict[int, Furniture] = {}
+  no_yolo: Dict[str, Furniture] = {}
 
   for f in qs:
     furniture_yolo_id = getattr(f, "yolo_id", None)
     if furniture_yolo_id is None:
+      no_yolo.setdefault(f.name_en, f)
       continue
     try:
       if int(furniture_yolo_id) in mp:
@@ -27,7 +87,26 @@ def _build_yolo_id_map() -> Dict[int, Furniture]:
       mp[int(furniture_yolo_id)] = f
     except Exception:
       continue
-  return mp
+  payloads = {
+    f.id: _build_furniture_payload(f)
+    for f in list(mp.values()) + list(no_yolo.values())
+  }
+  return FurnitureMaps(by_yolo_id=mp, by_name_en_without_yolo=no_yolo, payloads=payloads)
+
+
+def _get_furniture_maps() -> FurnitureMaps:
+  """
+  _build_furniture_maps 캐시 조회 + hit/miss 집계
+  """
+  FURNITURE_MAP_LOOKUPS.inc(result="hit" if _build_furniture_maps.cache_info().currsize else "miss")
+  return _build_furniture_maps()
+
+
+def _build_yolo_id_map() -> Dict[int, Furniture]:
+  """
+  yolo_id -> Furniture 매핑 딕셔너리 (_build_furniture_maps 캐시 사용)
+  """
+  return _get_furniture_maps().by_yolo_id
 
 
 def map_to_furniture(yolo_class_id: int) -> Optional[Furniture]:
@@ -45,8 +124,61 @@ def map_to_furniture(yolo_class_id: int) -> Optional[Furniture]:
   return mp.get(yolo_class_id)
 
 
+def map_to_outdoor_furniture(yolo_class_id: int) -> Optional[Furniture]:
+  """
+  에어컨 YOLO class id -> 실외기 Furniture (에어컨이 아니거나 실외기 데이터 없으면 None)
+  """
+  outdoor_name_en = OUTDOOR_UNIT_BY_YOLO_ID.get(yolo_class_id)
+  if outdoor_name_en is None:
+    return None
+  return _get_furniture_maps().by_name_en_without_yolo.get(outdoor_name_en)
+
+
+def get_furniture_payload(furniture: Furniture) -> Mapping[str, Any]:
+  """
+  Furniture -> detection 응답용 가구 필드 (캐시에 없는 가구면 새로 생성)
+  """
+  payload = _get_furniture_maps().payloads.get(furniture.id)
+  if payload is None:
+    payload = _build_furniture_payload(furniture)
+  return payload
+
+
+def get_furniture_payload_by_id(furniture_id: int) -> Optional[Mapping[str, Any]]:
+  """
+  Furniture.id -> detection 응답용 가구 필드 (packed 저장 읽기용, 삭제된 가구면 None)
+  매핑 캐시에 없는 가구(같은 yolo_id 중복 등)만 DB 조회
+  """
+  payload = _get_furniture_maps().payloads.get(furniture_id)
+  if payload is None:
+    furniture = Furniture.objects.filter(id=furniture_id).first()
+    if furniture is not None:
+      payload = _build_furniture_payload(furniture)
+  return payload
+
+
+# 현재 프로세스 캐시가 만들어진 기준 정책 버전 (policy.versioning)
+_loaded_version: Optional[int] = None
+
+
+def ensure_furniture_cache_fresh() -> None:
+  """
+  요청 시작 시 호출: 가구 정책 버전이 바뀌었으면(다른 프로세스의 수정/로드 포함) 캐시 비우기
+  버전 확인은 Django cache 조회 1번 (cache miss일 때만 DB 조회)
+  """
+  global _loaded_version
+  version = versioning.get_version(versioning.FURNITURE)
+  if version != _loaded_version:
+    # 버전을 먼저 읽고 캐시를 비우므로, 그 사이 변경이 있어도 다음 요청에서 다시 갱신됨
+    _build_furniture_maps.cache_clear()
+    _loaded_version = version
+
+
 def invalidate_furniture_cache() -> None:
   """
-  Furniture 데이터가 바뀌었을 때(관리자 수정/CSV 재로드 등) 캐시를 비우고 싶으면 호출.
+  현재 프로세스의 캐시만 비움
+  Furniture 변경은 signal로 정책 버전이 올라가므로 다른 worker들도 ensure_furniture_cache_fresh()에서 갱신됨
   """
-  _build_yolo_id_map.cache_clear()
+  global _loaded_version
+  _build_furniture_maps.cache_clear()
+  _loaded_version = None
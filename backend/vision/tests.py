@@ -1,3 +1,1538 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from PIL import Image
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from config import metrics
+from estimates.models import Estimate, EstimateRoom
+from policy import versioning
+from policy.models import Furniture
+from vision.models import VisionDetection, VisionDetectionCache, VisionImage, VisionUploadJob
+from vision.services import (
+  backends,
+  batch_scheduler,
+  cleanup,
+  detection_cache,
+  fake_model,
+  file_path_utils,
+  fusion,
+  image_io,
+  inference_server,
+  ingest,
+  jobs,
+  model_inference,
+  pipeline,
+  tiling,
+  yolo_to_furniture,
+)
+from vision.services.detection_cache import build_cache_key
+from vision.services.detection_storage import (
+  convert_packed_to_rows,
+  get_detections_many,
+  pack_rows,
+  packed_count,
+  packed_to_dicts,
+  serialize_detection,
+  unpack_rows,
+)
+from vision.services.detections import DetectionArrays
+from vision.services.pipeline import process_rooms_upload
+from vision.services.video import SampledVideo
+from vision.services.yolo_to_furniture import invalidate_furniture_cache
+
+
+_FAKE_DETECTIONS = [
+  {"yolo_id": 5, "yolo_class": "sofa_sm", "confidence": 0.9, "bbox": {"x": 0.5, "y": 0.5, "w": 0.2, "h": 0.2}},
+  {"yolo_id": 5, "yolo_class": "sofa_sm", "confidence": 0.8, "bbox": {"x": 0.2, "y": 0.5, "w": 0.2, "h": 0.2}},
+  {"yolo_id": 1, "yolo_class": "air_conditioner_wall", "confidence": 0.7, "bbox": {"x": 0.5, "y": 0.1, "w": 0.3, "h": 0.1}},
+]
+
+
+def _fake_detections(sources, batch_size=None, columnar=False):
+  # 이미지마다 소파 2개 + 벽걸이 에어컨 1개 (실외기 1개 추가됨)
+  if not columnar:
+    return [list(_FAKE_DETECTIONS) for _ in sources]
+
+  arrays = DetectionArrays.from_json({
+    "yolo_id": [d["yolo_id"] for d in _FAKE_DETECTIONS],
+    "yolo_class": [d["yolo_class"] for d in _FAKE_DETECTIONS],
+    "confidence": [d["confidence"] for d in _FAKE_DETECTIONS],
+    "bbox": [[d["bbox"][k] for k in ("x", "y", "w", "h")] for d in _FAKE_DETECTIONS],
+  })
+  return [arrays for _ in sources]
+
+
+class ProcessRoomsUploadQueryCountTests(TestCase):
+
+  @classmethod
+  def setUpTestData(cls):
+    common = {"category": "GENERAL_FURNITURE", "width_cm": 100, "depth_cm": 50, "height_cm": 80}
+    Furniture.objects.create(name_en="sofa_sm", name_kr="소파(소형)", yolo_id=5, **common)
+    Furniture.objects.create(name_en="air_conditioner_wall", name_kr="벽걸이 에어컨", yolo_id=1, **common)
+    Furniture.objects.create(name_en="ac_outdoor_wall", name_kr="실외기(벽걸이)", yolo_id=None, **common)
+
+  def setUp(self):
+    self.media_root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    settings_override = override_settings(MEDIA_ROOT=self.media_root, VISION_DETECTION_CACHE=False, VISION_STORE_NORMALIZE=False)
+    settings_override.enable()
+    self.addCleanup(settings_override.disable)
+
+    cache.clear()
+    invalidate_furniture_cache()
+    self.addCleanup(invalidate_furniture_cache)
+
+    for target, side_effect in (
+      ("vision.services.pipeline.decode_images", lambda datas: list(datas)),
+      ("vision.services.pipeline.run_vision_inference_batch", _fake_detections),
+    ):
+      patcher = mock.patch(target, side_effect=side_effect)
+      patcher.start()
+      self.addCleanup(patcher.stop)
+
+    self.request = RequestFactory().post("/api/vision/")
+
+  def _upload(self, n):
+    files = [
+      SimpleUploadedFile(f"room{i}.jpg", f"image-{i}".encode(), content_type="image/jpeg")
+      for i in range(n)
+    ]
+    rooms = [{"room_type": f"ROOM{i + 1}", "file_index": i, "sort_order": i} for i in range(n)]
+
+    with CaptureQueriesContext(connection) as ctx:
+      payload = process_rooms_upload(request=self.request, rooms=rooms, files=files)
+    return payload, len(ctx.captured_queries)
+
+  def test_query_count_does_not_grow_with_images_or_detections(self):
+    # 가구 캐시 워밍 (프로세스당 1번만 발생하는 쿼리는 비교에서 제외)
+    self._upload(1)
+
+    _, one_image_queries = self._upload(1)
+    payload, ten_image_queries = self._upload(10)
+
+    self.assertEqual(one_image_queries, ten_image_queries)
+    self.assertEqual(len(payload["results"]), 10)
+    for room in payload["results"]:
+      self.assertEqual(len(room["detections"]), 4)
+      self.assertTrue(all(d["detection_id"] for d in room["detections"]))
+
+  def test_furniture_map_rebuilt_after_policy_version_bump(self):
+    self._upload(1)
+
+    # 다른 프로세스에서 수정된 상황: signal 없이 데이터 변경 + 버전 증가
+    Furniture.objects.filter(name_en="sofa_sm").update(name_kr="소파(변경)")
+    versioning.bump_version(versioning.FURNITURE)
+
+    payload, _ = self._upload(1)
+    self.assertEqual(payload["results"][0]["detections"][0]["name_kr"], "소파(변경)")
+
+  def test_outdoor_unit_added_for_air_conditioner(self):
+    payload, _ = self._upload(1)
+
+    names = [d["name_en"] for d in payload["results"][0]["detections"]]
+    self.assertEqual(names, ["sofa_sm", "sofa_sm", "air_conditioner_wall", "ac_outdoor_wall"])
+
+    vision_image = VisionImage.objects.get(id=payload["results"][0]["vision_image_id"])
+    self.assertEqual(VisionDetection.objects.filter(vision_image=vision_image).count(), 4)
+
+  def test_upload_view_returns_server_timing(self):
+    files = [SimpleUploadedFile(f"room{i}.jpg", f"image-{i}".encode(), content_type="image/jpeg") for i in range(2)]
+    rooms = [{"room_type": f"ROOM{i + 1}", "file_index": i, "sort_order": i} for i in range(2)]
+
+    with self.assertLogs("vision.timing", level="INFO") as logs:
+      response = self.client.post("/api/vision/", {"rooms": json.dumps(rooms), "files": files})
+
+    self.assertEqual(response.status_code, 201)
+    metrics = {part.split(";")[0].strip() for part in response["Server-Timing"].split(",")}
+    self.assertTrue({"parse", "storage", "inference", "db_images", "db_detections", "total"} <= metrics)
+
+    record = json.loads(logs.records[-1].getMessage().split(" ", 1)[1])
+    self.assertEqual(record["status"], 201)
+    self.assertEqual([r["room"] for r in record["rooms"]], [0, 1])
+
+  def test_video_upload_merges_keyframe_detections(self):
+    sofa = {"yolo_id": 5, "yolo_class": "sofa_sm", "confidence": 0.9, "bbox": {"x": 0.5, "y": 0.5, "w": 0.2, "h": 0.2}}
+    ac = {"yolo_id": 1, "yolo_class": "air_conditioner_wall", "confidence": 0.7, "bbox": {"x": 0.5, "y": 0.1, "w": 0.3, "h": 0.1}}
+    # keyframe마다 같은 소파가 반복해서 찍힘 -> 한 프레임 최대 개수(2)만 인정
+    # 에어컨은 저장되지 않는 f0에서만 보임 -> bbox 없음
+    per_source = {"f0": [sofa, ac], "f1": [sofa, dict(sofa, confidence=0.6)], "f2": [sofa]}
+    batch_calls = []
+
+    def fake_batch(sources, batch_size=None, columnar=False):
+      batch_calls.append(list(sources))
+      return [per_source.get(s, list(_FAKE_DETECTIONS)) for s in sources]
+
+    sampled = SampledVideo(frames=["f1", "f0", "f2"], keyframe="f1", frame_indices=[15, 0, 30])
+    files = [
+      SimpleUploadedFile("room0.jpg", b"image-0", content_type="image/jpeg"),
+      SimpleUploadedFile("room1.mp4", b"video-1", content_type="video/mp4"),
+    ]
+    rooms = [{"room_type": f"ROOM{i + 1}", "file_index": i, "sort_order": i} for i in range(2)]
+
+    with (
+      override_settings(VISION_VIDEO_ENABLED=True),
+      mock.patch("vision.services.video.cv2"),
+      mock.patch("vision.services.pipeline.run_vision_inference_batch", side_effect=fake_batch),
+      mock.patch("vision.services.video.sample_keyframes_from_upload", return_value=sampled),
+      mock.patch("vision.services.video.encode_keyframe", return_value=b"keyframe"),
+      mock.patch("vision.services.pipeline.read_upload", wraps=pipeline.read_upload) as read_upload,
+    ):
+      payload = process_rooms_upload(request=self.request, rooms=rooms, files=files)
+
+    # 영상은 전체 bytes로 읽지 않음 (hash는 chunk 단위)
+    self.assertEqual([c.args[0].name for c in read_upload.call_args_list], ["room0.jpg"])
+
+    # 사진 + 영상 keyframe을 한 번에 batch 추론
+    self.assertEqual(batch_calls, [[b"image-0", "f1", "f0", "f2"]])
+
+    video_room = payload["results"][1]
+    names = [d["name_en"] for d in video_room["detections"]]
+    self.assertEqual(names, ["air_conditioner_wall", "ac_outdoor_wall", "sofa_sm", "sofa_sm"])
+    self.assertEqual([d["bbox"] is not None for d in video_room["detections"]], [False, False, True, True])
+    self.assertEqual(VisionImage.objects.get(id=video_room["vision_image_id"]).image_file_name, "room1.mp4")
+
+  def test_video_without_opencv_is_rejected(self):
+    files = [SimpleUploadedFile("room0.mp4", b"video-0", content_type="video/mp4")]
+    rooms = [{"room_type": "ROOM1", "file_index": 0}]
+
+    with mock.patch("vision.services.video.cv2", None):
+      # 기본값: opencv가 없으면 영상 비활성
+      with self.assertRaisesMessage(ValueError, "video upload is not supported"):
+        process_rooms_upload(request=self.request, rooms=rooms, files=files)
+      with override_settings(VISION_VIDEO_ENABLED=True):
+        with self.assertRaisesMessage(ValueError, "video upload is not supported"):
+          process_rooms_upload(request=self.request, rooms=rooms, files=files)
+
+      response = self.client.post("/api/vision/", {"rooms": json.dumps(rooms), "files": files})
+    self.assertEqual(response.status_code, 400)
+    self.assertEqual(response.json()["detail"], "video upload is not supported")
+    self.assertFalse(VisionImage.objects.exists())
+
+  @override_settings(VISION_VIDEO_ENABLED=True, VISION_VIDEO_MAX_BYTES=4)
+  def test_video_over_max_bytes_is_rejected_before_sampling(self):
+    files = [SimpleUploadedFile("room0.mp4", b"video-0", content_type="video/mp4")]
+
+    with (
+      mock.patch("vision.services.video.cv2"),
+      mock.patch("vision.services.video.sample_keyframes_from_upload") as sample,
+    ):
+      with self.assertRaisesMessage(ValueError, "video too large: 7 bytes (max=4)"):
+        process_rooms_upload(request=self.request, rooms=[{"room_type": "ROOM1", "file_index": 0}], files=files)
+    sample.assert_not_called()
+
+  def test_fused_rooms_merge_photos_of_same_group(self):
+    files = [SimpleUploadedFile(f"room{i}.jpg", f"image-{i}".encode(), content_type="image/jpeg") for i in range(3)]
+    rooms = [
+      {"room_type": "LIVING", "file_index": 0, "group": "living-1"},
+      {"room_type": "LIVING", "file_index": 1, "group": "living-1"},
+      {"room_type": "LIVING", "file_index": 2},
+    ]
+    payload = process_rooms_upload(request=self.request, rooms=rooms, files=files)
+
+    self.assertEqual(len(payload["results"]), 3)
+    [fused] = payload["fused_rooms"]
+    first, second = payload["results"][0], payload["results"][1]
+    self.assertEqual(fused["vision_image_ids"], [first["vision_image_id"], second["vision_image_id"]])
+
+    # 두 장에 같은 가구가 찍혔으므로 한 장 분량만 남고, 다른 장의 탐지는 source_detection_ids로 연결
+    self.assertEqual([d["name_en"] for d in fused["detections"]], ["sofa_sm", "sofa_sm", "air_conditioner_wall", "ac_outdoor_wall"])
+    second_ids = {d["detection_id"] for d in second["detections"]}
+    for detection in fused["detections"]:
+      self.assertEqual(len(detection["source_detection_ids"]), 2)
+      self.assertIn(detection["source_detection_ids"][1], second_ids)
+
+    with override_settings(VISION_FUSION_RULES={"sofa_sm": "sum"}):
+      payload = process_rooms_upload(request=self.request, rooms=rooms, files=files)
+    names = [d["name_en"] for d in payload["fused_rooms"][0]["detections"]]
+    self.assertEqual(names.count("sofa_sm"), 4)
+
+  @override_settings(VISION_DETECTION_CACHE=True, VISION_STORE_NORMALIZE=True)
+  def test_async_job_caches_only_results_from_original_uploads(self):
+    vision_images = [
+      VisionImage.objects.create(
+        room_type=f"ROOM{i + 1}",
+        image=SimpleUploadedFile(f"room{i}.webp", b"normalized"),
+        image_file_name=f"room{i}.jpg",
+        content_sha256=f"{i}" * 64,
+      )
+      for i in range(2)
+    ]
+    job = VisionUploadJob.objects.create(
+      rooms_total=2,
+      rooms=[{"vision_image_id": v.id, "room_type": v.room_type, "image_url": "", "status": "PENDING"} for v in vision_images],
+    )
+
+    # 첫 번째만 원본 업로드가 남아 있음 -> 두 번째는 정규화된 저장 이미지로 추론, 캐시 저장 안 함
+    with mock.patch("vision.services.file_path_utils.decode_image", side_effect=lambda data: data):
+      pipeline.run_upload_job(job, uploads={vision_images[0].id: b"original"})
+
+    self.assertEqual(list(VisionDetectionCache.objects.values_list("content_sha256", flat=True)), ["0" * 64])
+
+  @override_settings(VISION_DETECTION_STORAGE="packed")
+  def test_packed_storage_matches_read_api_and_converts_back_to_rows(self):
+    payload, _ = self._upload(3)
+    ids = [room["vision_image_id"] for room in payload["results"]]
+
+    self.assertFalse(VisionDetection.objects.exists())
+    stored = get_detections_many(VisionImage.objects.filter(id__in=ids))
+    for room in payload["results"]:
+      self.assertEqual(stored[room["vision_image_id"]], room["detections"])
+      self.assertEqual(
+        [d["name_en"] for d in room["detections"]],
+        ["sofa_sm", "sofa_sm", "air_conditioner_wall", "ac_outdoor_wall"],
+      )
+      self.assertEqual(room["detections"][0]["confidence"], 0.9)
+      # VisionDetection id(양수)와 겹치지 않는 음수 정수 id
+      self.assertEqual(room["detections"][0]["detection_id"], -room["vision_image_id"] * 65536)
+      self.assertEqual(room["detections"][1]["detection_id"], -room["vision_image_id"] * 65536 - 1)
+
+    rows = [(5, 1, 0.9, (0.5, 0.5, 0.2, 0.2)), (None, 3, None, (None,) * 4)]
+    self.assertEqual(unpack_rows(pack_rows(rows)), [(5, 1, 0.9, (0.5, 0.5, 0.2, 0.2)), (None, 3, None, (None,) * 4)])
+    self.assertEqual(packed_count(pack_rows(rows)), 2)
+    with self.assertRaisesMessage(ValueError, "Too many detections to pack: 65536 (max=65535)"):
+      pack_rows([rows[0]] * 65536)
+
+    # 행으로 되돌려도 detection_id 외에는 같은 dict
+    self.assertEqual(convert_packed_to_rows(VisionImage, VisionDetection, Furniture), 3)
+    self.assertEqual(VisionDetection.objects.count(), 12)
+    restored = get_detections_many(VisionImage.objects.filter(id__in=ids))
+    strip = lambda dets: [{k: v for k, v in d.items() if k != "detection_id"} for d in dets]
+    for image_id in ids:
+      self.assertEqual(strip(restored[image_id]), strip(stored[image_id]))
+
+
+class VisionImageAdminTests(TestCase):
+
+  @classmethod
+  def setUpTestData(cls):
+    cls.sofa = Furniture.objects.create(
+      name_en="sofa_sm", name_kr="소파(소형)", yolo_id=5, category="GENERAL_FURNITURE",
+      width_cm=100, depth_cm=50, height_cm=80,
+    )
+    cls.rows_image = VisionImage.objects.create(room_type="ROOM1", image_file_name="rows.jpg")
+    for _ in range(2):
+      VisionDetection.objects.create(
+        vision_image=cls.rows_image, furniture=cls.sofa, yolo_id=5, confidence=0.9,
+        bbox_x=0.5, bbox_y=0.5, bbox_w=0.1, bbox_h=0.1,
+      )
+    cls.packed_image = VisionImage.objects.create(
+      room_type="ROOM2", image_file_name="packed.jpg",
+      detections_packed=pack_rows([(5, cls.sofa.id, 0.8, (0.5, 0.5, 0.2, 0.2))] * 3),
+    )
+    cls.admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+
+  def setUp(self):
+    invalidate_furniture_cache()
+    self.addCleanup(invalidate_furniture_cache)
+    self.client.force_login(self.admin_user)
+
+  def test_changelist_counts_rows_and_packed_detections(self):
+    response = self.client.get("/admin/vision/visionimage/")
+
+    self.assertEqual(response.status_code, 200)
+    counts = {obj.id: obj for obj in response.context["cl"].result_list}
+    model_admin = response.context["cl"].model_admin
+    self.assertEqual(model_admin.detections_count(counts[self.rows_image.id]), 2)
+    self.assertEqual(model_admin.detections_count(counts[self.packed_image.id]), 3)
+
+  def test_change_page_shows_detections_from_storage(self):
+    response = self.client.get(f"/admin/vision/visionimage/{self.packed_image.id}/change/")
+
+    self.assertEqual(response.status_code, 200)
+    self.assertContains(response, "소파(소형) (sofa_sm)", count=3)
+    self.assertContains(response, f"<td>{-self.packed_image.id * 65536 - 2}</td>", html=True)
+
+
+class UploadJobAPITests(TestCase):
+
+  @classmethod
+  def setUpTestData(cls):
+    common = {"category": "GENERAL_FURNITURE", "width_cm": 100, "depth_cm": 50, "height_cm": 80}
+    Furniture.objects.create(name_en="sofa_sm", name_kr="소파(소형)", yolo_id=5, **common)
+    Furniture.objects.create(name_en="air_conditioner_wall", name_kr="벽걸이 에어컨", yolo_id=1, **common)
+    Furniture.objects.create(name_en="ac_outdoor_wall", name_kr="실외기(벽걸이)", yolo_id=None, **common)
+
+  def setUp(self):
+    self.media_root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    settings_override = override_settings(MEDIA_ROOT=self.media_root, VISION_DETECTION_CACHE=False, VISION_STORE_NORMALIZE=False)
+    settings_override.enable()
+    self.addCleanup(settings_override.disable)
+
+    invalidate_furniture_cache()
+    self.addCleanup(invalidate_furniture_cache)
+
+    # worker pool 대신 commit 시점에 바로 실행 (테스트 DB 연결은 닫지 않음)
+    executor = mock.Mock()
+    executor.submit.side_effect = lambda fn, *args: fn(*args)
+    self.inference = mock.Mock(side_effect=_fake_detections)
+    for patcher in (
+      mock.patch.object(jobs, "_get_executor", return_value=executor),
+      mock.patch.object(jobs, "connection"),
+      mock.patch.object(jobs, "close_old_connections"),
+      mock.patch("vision.services.pipeline.run_vision_inference_batch", self.inference),
+      mock.patch("vision.services.file_path_utils.decode_image", side_effect=lambda data: data),
+    ):
+      patcher.start()
+      self.addCleanup(patcher.stop)
+
+  def _post_async(self, n, execute=True):
+    data = {
+      "rooms": json.dumps([{"room_type": f"ROOM{i + 1}", "file_index": i} for i in range(n)]),
+      "files": [SimpleUploadedFile(f"room{i}.jpg", f"image-{i}".encode(), content_type="image/jpeg") for i in range(n)],
+      "async": "true",
+    }
+    with self.captureOnCommitCallbacks(execute=execute):
+      response = self.client.post("/api/vision/", data)
+    self.assertEqual(response.status_code, 202)
+    return response.json()
+
+  def _get_job(self, job_id):
+    return self.client.get(f"/api/vision/jobs/{job_id}/")
+
+  def test_accepted_then_done_with_results(self):
+    accepted = self._post_async(2)
+
+    self.assertEqual(accepted["status"], VisionUploadJob.Status.PENDING)
+    self.assertEqual(accepted["status_url"], f"http://testserver/api/vision/jobs/{accepted['job_id']}/")
+
+    body = self._get_job(accepted["job_id"]).json()
+    self.assertEqual((body["status"], body["rooms_total"], body["rooms_done"]), ("DONE", 2, 2))
+    self.assertEqual([len(room["detections"]) for room in body["results"]], [4, 4])
+    self.assertEqual({room["status"] for room in body["rooms"]}, {"DONE"})
+
+  @override_settings(VISION_DETECTION_STORAGE="packed")
+  def test_done_results_are_read_from_detection_storage(self):
+    accepted = self._post_async(2)
+
+    # job.result에는 방별 detections를 다시 저장하지 않음
+    job = VisionUploadJob.objects.get(job_id=accepted["job_id"])
+    self.assertNotIn("detections", job.result["results"][0])
+
+    body = self._get_job(accepted["job_id"]).json()
+    ids = [room["vision_image_id"] for room in body["results"]]
+    stored = get_detections_many(VisionImage.objects.filter(id__in=ids))
+    self.assertEqual([room["detections"] for room in body["results"]], [stored[i] for i in ids])
+    self.assertEqual(body["results"][0]["detections"][0]["detection_id"], -ids[0] * 65536)
+
+  def test_legacy_results_with_detections_are_returned_as_is(self):
+    legacy = [{"vision_image_id": 1, "room_type": "ROOM1", "image_url": None, "detections": [{"detection_id": 3}]}]
+    job = VisionUploadJob.objects.create(
+      status=VisionUploadJob.Status.DONE, rooms_total=1, rooms_done=1, result={"results": legacy, "fused_rooms": []},
+    )
+
+    body = self._get_job(job.job_id).json()
+    self.assertEqual(body["results"], legacy)
+
+  def test_pending_and_running_have_no_results(self):
+    accepted = self._post_async(1, execute=False)
+
+    body = self._get_job(accepted["job_id"]).json()
+    self.assertEqual((body["status"], body["results"]), ("PENDING", None))
+
+    VisionUploadJob.objects.filter(job_id=accepted["job_id"]).update(status=VisionUploadJob.Status.RUNNING)
+    body = self._get_job(accepted["job_id"]).json()
+    self.assertEqual((body["status"], body["results"]), ("RUNNING", None))
+
+  def test_failed_job_reports_error(self):
+    self.inference.side_effect = RuntimeError("model exploded")
+
+    with self.assertLogs(jobs.logger, level="ERROR"):
+      accepted = self._post_async(1)
+
+    body = self._get_job(accepted["job_id"]).json()
+    self.assertEqual((body["status"], body["error"], body["results"]), ("FAILED", "RuntimeError: model exploded", None))
+
+  @override_settings(VISION_VIDEO_ENABLED=True)
+  def test_video_is_sampled_in_job(self):
+    sampled = SampledVideo(frames=["f1", "f0"], keyframe="f1", frame_indices=[15, 0])
+    spooled = []
+
+    def fake_sample(path):
+      spooled.append((path, Path(path).read_bytes()))
+      return sampled
+
+    rooms = [{"room_type": "ROOM1", "file_index": 0}, {"room_type": "ROOM2", "file_index": 1}]
+    data = {
+      "rooms": json.dumps(rooms),
+      "files": [
+        SimpleUploadedFile("room0.jpg", b"image-0", content_type="image/jpeg"),
+        SimpleUploadedFile("room1.mp4", b"video-1", content_type="video/mp4"),
+      ],
+      "async": "true",
+    }
+    with (
+      mock.patch("vision.services.video.cv2"),
+      mock.patch("vision.services.video.sample_keyframes", side_effect=fake_sample) as sample,
+      mock.patch("vision.services.video.encode_keyframe", return_value=b"keyframe"),
+    ):
+      with self.captureOnCommitCallbacks(execute=False) as callbacks:
+        response = self.client.post("/api/vision/", data)
+
+      # 요청 안에서는 샘플링하지 않고 임시파일로 복사만 함
+      self.assertEqual(response.status_code, 202)
+      sample.assert_not_called()
+      job_id = response.json()["job_id"]
+      body = self._get_job(job_id).json()
+      self.assertEqual(body["rooms"][1]["image_url"], None)
+
+      for callback in callbacks:
+        callback()
+
+    self.assertEqual(spooled[0][1], b"video-1")
+    self.assertFalse(Path(spooled[0][0]).exists())
+    self.assertEqual(self.inference.call_args.args[0], [b"image-0", "f1", "f0"])
+
+    body = self._get_job(job_id).json()
+    self.assertEqual(body["status"], "DONE")
+    vision_image = VisionImage.objects.get(id=body["rooms"][1]["vision_image_id"])
+    self.assertTrue(vision_image.image.name.endswith("room1_keyframe.jpg"))
+    self.assertEqual(body["rooms"][1]["image_url"], f"http://testserver{vision_image.image.url}")
+    self.assertEqual(body["results"][1]["image_url"], body["rooms"][1]["image_url"])
+
+  def test_unknown_job_is_404(self):
+    self.assertEqual(self._get_job("00000000-0000-0000-0000-000000000000").status_code, 404)
+
+  @override_settings(VISION_ASYNC_CHUNK_SIZE=1)
+  def test_progress_is_saved_per_chunk(self):
+    seen = []
+
+    def fake_batch(sources, batch_size=None, columnar=False):
+      # 추론 시점에 다른 요청(GET)이 보는 진행 상황
+      job = VisionUploadJob.objects.get()
+      seen.append((job.rooms_done, [room["status"] for room in job.rooms]))
+      return _fake_detections(sources, batch_size, columnar)
+
+    self.inference.side_effect = fake_batch
+    self._post_async(3)
+
+    self.assertEqual(seen, [
+      (0, ["RUNNING", "PENDING", "PENDING"]),
+      (1, ["DONE", "RUNNING", "PENDING"]),
+      (2, ["DONE", "DONE", "RUNNING"]),
+    ])
+
+
+class GcVisionImagesTests(TestCase):
+
+  def setUp(self):
+    self.media_root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    settings_override = override_settings(MEDIA_ROOT=self.media_root)
+    settings_override.enable()
+    self.addCleanup(settings_override.disable)
+
+  def _image(self, name, days_old):
+    vision_image = VisionImage.objects.create(
+      room_type="LIVING",
+      image=SimpleUploadedFile(f"{name}.jpg", b"x" * 100),
+      thumbnail=SimpleUploadedFile(f"{name}_thumb.jpg", b"x" * 10),
+    )
+    VisionImage.objects.filter(id=vision_image.id).update(created_at=timezone.now() - timedelta(days=days_old))
+    return vision_image
+
+  def test_deletes_only_old_images_without_estimate(self):
+    orphan = self._image("orphan", days_old=10)
+    recent = self._image("recent", days_old=1)
+    used = self._image("used", days_old=10)
+    estimate = Estimate.objects.create(
+      move_type=Estimate.MoveType.values[0], area=20, origin_address="서울", origin_floor=1,
+    )
+    EstimateRoom.objects.create(estimate=estimate, vision_image=used, room_type="LIVING")
+    VisionDetection.objects.create(vision_image=orphan, yolo_id=5, yolo_class="sofa_sm")
+
+    out = StringIO()
+    call_command("gc_vision_images", "--ttl-days", "7", "--dry-run", "--json", stdout=out)
+    self.assertEqual(json.loads(out.getvalue())["images"], 1)
+    self.assertTrue(VisionImage.objects.filter(id=orphan.id).exists())
+
+    # 파일은 commit 후 삭제 -> 삭제된 용량도 그때 집계됨
+    with self.captureOnCommitCallbacks(execute=True):
+      stats = cleanup.collect_orphan_images(ttl=timedelta(days=7), batch_size=1)
+
+    self.assertEqual(
+      set(VisionImage.objects.values_list("id", flat=True)),
+      {recent.id, used.id},
+    )
+    self.assertFalse(VisionDetection.objects.filter(vision_image_id=orphan.id).exists())
+    storage = VisionImage._meta.get_field("image").storage
+    self.assertFalse(storage.exists(orphan.image.name))
+    self.assertFalse(storage.exists(orphan.thumbnail.name))
+    self.assertTrue(storage.exists(recent.image.name))
+    self.assertEqual((stats.images, stats.detections, stats.files, stats.bytes_reclaimed), (1, 1, 2, 110))
+
+  def test_image_referenced_after_scan_keeps_its_files(self):
+    orphan = self._image("orphan", days_old=10)
+    raced = self._image("raced", days_old=10)
+    estimate = Estimate.objects.create(
+      move_type=Estimate.MoveType.values[0], area=20, origin_address="서울", origin_floor=1,
+    )
+    orphan_images = cleanup.orphan_images
+    calls = []
+
+    def orphan_images_with_race(cutoff):
+      # 잠금 조회 후, 삭제 직전 확인 전에 견적 저장이 commit된 상황
+      calls.append(cutoff)
+      if len(calls) == 2:
+        EstimateRoom.objects.create(estimate=estimate, vision_image=raced, room_type="LIVING")
+      return orphan_images(cutoff)
+
+    with (
+      mock.patch.object(cleanup, "orphan_images", side_effect=orphan_images_with_race),
+      self.captureOnCommitCallbacks(execute=True),
+    ):
+      stats = cleanup.collect_orphan_images(ttl=timedelta(days=7), batch_size=10, max_batches=1)
+
+    self.assertEqual(list(VisionImage.objects.values_list("id", flat=True)), [raced.id])
+    storage = VisionImage._meta.get_field("image").storage
+    self.assertFalse(storage.exists(orphan.image.name))
+    self.assertTrue(storage.exists(raced.image.name))
+    self.assertTrue(storage.exists(raced.thumbnail.name))
+    self.assertEqual((stats.images, stats.files, stats.bytes_reclaimed), (1, 2, 110))
+
+
+@override_settings(VISION_ASYNC_KEEP_UPLOAD_BUDGET_BYTES=100)
+class UploadJobBudgetTests(TestCase):
+
+  def setUp(self):
+    self.executor = mock.Mock()
+    for patcher in (
+      mock.patch.object(jobs, "_get_executor", return_value=self.executor),
+      mock.patch.object(jobs, "_upload_budget", jobs._ByteBudget()),
+      mock.patch.object(jobs, "connection"),
+      mock.patch.object(jobs, "close_old_connections"),
+    ):
+      patcher.start()
+      self.addCleanup(patcher.stop)
+
+  def test_jobs_over_budget_read_from_storage_until_released(self):
+    jobs.submit_upload_job(1, uploads={1: b"x" * 60}, upload_nbytes=60)
+    jobs.submit_upload_job(2, uploads={2: b"x" * 60}, upload_nbytes=60)
+
+    first, second = (c.args for c in self.executor.submit.call_args_list)
+    self.assertEqual(first[2:], ({1: b"x" * 60}, 60))
+
+    # 예산을 넘은 job은 원본을 임시파일로 옮겨서 등록 (정규화된 저장 이미지로 추론하지 않음)
+    spilled, nbytes = second[2:]
+    self.assertEqual(nbytes, 0)
+    self.assertEqual(spilled[2].read_bytes(), b"x" * 60)
+
+    # 실행이 끝나면(여기서는 job 없음) 예산 반납 + 임시파일 삭제
+    with self.assertLogs(jobs.logger, level="ERROR"):
+      first[0](*first[1:])
+      second[0](*second[1:])
+    self.assertEqual(jobs._upload_budget.held, 0)
+    self.assertFalse(spilled[2].exists())
+
+  @override_settings(VISION_ASYNC_KEEP_UPLOAD_MAX_BYTES=10)
+  def test_jobs_over_per_job_limit_spill_video_frames(self):
+    frames = [np.full((4, 6, 3), i, dtype=np.uint8) for i in range(3)]
+    jobs.submit_upload_job(1, uploads={1: frames}, upload_nbytes=sum(f.nbytes for f in frames))
+
+    _, _, spilled, nbytes = self.executor.submit.call_args.args
+    self.assertEqual(nbytes, 0)
+    restored = pipeline._load_spilled(spilled[1])
+    self.assertEqual([f.tolist() for f in restored], [f.tolist() for f in frames])
+    pipeline.discard_uploads(spilled)
+    self.assertFalse(spilled[1].exists())
+
+
+class DetectionCacheKeyTests(SimpleTestCase):
+
+  def test_key_changes_with_tiling_and_decode_size(self):
+    keys = set()
+    for overrides in (
+      {"VISION_TILE_ENABLED": False},
+      {"VISION_TILE_ENABLED": False, "VISION_DECODE_SIZE": 1280},
+      {"VISION_TILE_ENABLED": True},
+      {"VISION_TILE_ENABLED": True, "VISION_TILE_OVERLAP": 0.3},
+      {"VISION_TILE_ENABLED": True, "VISION_TILE_MIN_SIDE": 2560},
+    ):
+      with override_settings(**overrides):
+        keys.add(build_cache_key("0" * 64))
+    self.assertEqual(len(keys), 5)
+
+
+@override_settings(VISION_DETECTION_CACHE=True, VISION_MODEL_VERSION="v1")
+class DetectionCacheTests(TestCase):
+
+  def setUp(self):
+    cache.clear()
+    self.addCleanup(cache.clear)
+    model_inference.reset_model()
+    self.addCleanup(model_inference.reset_model)
+
+  def test_hit_miss_and_reuse_from_db(self):
+    arrays = _fake_detections([None], columnar=True)[0]
+    detection_cache.store_detections_many([("a" * 64, arrays)])
+    before = detection_cache.get_cache_stats()["process"]
+
+    found = detection_cache.get_cached_detections_many(["a" * 64, "b" * 64, "a" * 64])
+    self.assertEqual(found, [arrays.to_json(), None, arrays.to_json()])
+
+    # Django cache가 비어도 DB에서 다시 채움
+    cache.clear()
+    self.assertEqual(detection_cache.get_cached_detections("a" * 64), arrays.to_json())
+
+    after = detection_cache.get_cache_stats()["process"]
+    self.assertEqual((after["hits"] - before["hits"], after["misses"] - before["misses"]), (3, 1))
+    self.assertEqual(VisionDetectionCache.objects.get().hit_count, 2)
+
+  @override_settings(VISION_MODEL_VERSION=None)
+  def test_version_follows_loaded_model_and_replaced_file(self):
+    tmp_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+    path = f"{tmp_dir}/best.pt"
+    with open(path, "wb") as f:
+      f.write(b"weights-1")
+
+    with override_settings(VISION_MODEL_PATH=path, VISION_BACKEND="torch", VISION_PRECISION="fp32"):
+      # 로딩 전: 조회 시점의 파일 기준
+      v1 = detection_cache.get_model_version()
+      with mock.patch.object(model_inference, "_load_model", return_value=object()):
+        model_inference._get_model()
+
+      # 파일이 바뀌어도 로딩된 weight는 그대로 -> 키 유지
+      with open(path, "wb") as f:
+        f.write(b"weights-2-reexported")
+      self.assertEqual(detection_cache.get_model_version(), v1)
+
+      # 다시 로딩하면 새 파일 기준
+      model_inference.reset_model()
+      v2 = detection_cache.get_model_version()
+      self.assertNotEqual(v2, v1)
+      with mock.patch.object(model_inference, "_load_model", return_value=object()):
+        model_inference._get_model()
+      self.assertEqual(detection_cache.get_model_version(), v2)
+
+
+@override_settings(VISION_MODEL_LOAD_BACKOFF=0)
+class ModelLoaderTests(SimpleTestCase):
+
+  def setUp(self):
+    model_inference.reset_model()
+    self.addCleanup(model_inference.reset_model)
+
+  def test_concurrent_callers_share_one_load(self):
+    calls = []
+
+    def slow_load():
+      calls.append(threading.get_ident())
+      time.sleep(0.05)
+      return object()
+
+    with mock.patch.object(model_inference, "_load_model", side_effect=slow_load):
+      with ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(lambda _: model_inference._get_model(), range(8)))
+
+    self.assertEqual(len(calls), 1)
+    self.assertEqual(len({id(m) for m in models}), 1)
+    self.assertIsNotNone(model_inference.get_model_status()["model_load_ms"])
+
+  @override_settings(VISION_MODEL_LOAD_RETRIES=1)
+  def test_failed_load_is_retried_and_not_cached(self):
+    model = object()
+    side_effects = [OSError("weights not ready"), OSError("weights not ready"), model]
+
+    with mock.patch.object(model_inference, "_load_model", side_effect=side_effects) as load:
+      with self.assertRaises(OSError), self.assertLogs(model_inference.logger, level="WARNING"):
+        model_inference._get_model()
+      self.assertEqual(load.call_count, 2)
+
+      # 실패는 저장되지 않으므로 다음 호출에서 다시 로딩
+      self.assertIs(model_inference._get_model(), model)
+      self.assertIs(model_inference._get_model(), model)
+      self.assertEqual(load.call_count, 3)
+
+  def test_readiness_without_warmup_does_not_wait_for_model(self):
+    from vision.views import VisionReadinessAPIView
+
+    view = VisionReadinessAPIView.as_view()
+    request = RequestFactory().get("/api/vision/ready/")
+
+    with override_settings(VISION_WARMUP=False):
+      response = view(request)
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual((response.data["ready"], response.data["warmup"]), (True, False))
+
+    with override_settings(VISION_WARMUP=True):
+      self.assertEqual(view(request).status_code, 503)
+
+
+@override_settings(VISION_MICROBATCH_ENABLED=False, VISION_TILE_ENABLED=False, VISION_INFERENCE_MODE="local")
+class BatchInferenceTests(SimpleTestCase):
+
+  def setUp(self):
+    self.model = fake_model.FakeYOLO(names={0: "sofa_sm", 1: "bed_single"})
+    self.chunks = []
+    predict = self.model.predict
+
+    def recording_predict(source=None, **kwargs):
+      self.chunks.append(len(source))
+      return predict(source=source, **kwargs)
+
+    self.model.predict = recording_predict
+    patcher = mock.patch.object(model_inference, "_get_model", return_value=self.model)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def _images(self, n):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (48, 64, 3), dtype=np.uint8) for _ in range(n)]
+
+  @override_settings(VISION_BATCH_SIZE=2)
+  def test_chunks_at_batch_size_and_keeps_input_order(self):
+    images = self._images(5)
+
+    batched = model_inference.run_vision_inference_batch(images)
+    self.assertEqual(self.chunks, [2, 2, 1])
+
+    # 이미지 1장씩 추론한 결과와 같은 순서/내용
+    self.assertEqual(batched, [model_inference.run_vision_inference(image) for image in images])
+
+    self.chunks.clear()
+    model_inference.run_vision_inference_batch(images, batch_size=4)
+    self.assertEqual(self.chunks, [4, 1])
+    self.assertEqual(model_inference.run_vision_inference_batch([]), [])
+
+  def test_result_count_mismatch_raises(self):
+    predict = self.model.predict
+    self.model.predict = lambda source=None, **kwargs: predict(source=source, **kwargs)[:-1]
+
+    with self.assertRaisesMessage(RuntimeError, "result count mismatch: expected=3, got=2"):
+      model_inference.run_vision_inference_batch(self._images(3))
+
+
+class InferenceServerTests(SimpleTestCase):
+
+  def setUp(self):
+    tmp_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+    self.address = f"{tmp_dir}/inference.sock"
+
+    settings_override = override_settings(
+      VISION_INFERENCE_SOCKET=self.address,
+      VISION_INFERENCE_TIMEOUT=5,
+      VISION_MICROBATCH_ENABLED=False,
+      VISION_TILE_ENABLED=False,
+    )
+    settings_override.enable()
+    self.addCleanup(settings_override.disable)
+
+    self.model = fake_model.FakeYOLO(names={0: "sofa_sm"})
+    patcher = mock.patch.object(model_inference, "_get_model", return_value=self.model)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def _start_server(self):
+    stop = threading.Event()
+    thread = threading.Thread(target=inference_server.serve_forever, args=(self.address, stop), daemon=True)
+    thread.start()
+
+    def _stop():
+      # accept 대기 중인 서버를 연결 1개로 깨워서 종료
+      stop.set()
+      inference_server.is_listening(self.address)
+      thread.join(timeout=5)
+
+    self.addCleanup(_stop)
+    for _ in range(200):
+      if inference_server.is_listening(self.address):
+        return
+      time.sleep(0.01)
+    self.fail("inference server did not start")
+
+  def test_round_trip_matches_local_inference(self):
+    self._start_server()
+    images = [np.full((32, 48, 3), i * 40, dtype=np.uint8) for i in range(3)]
+
+    with override_settings(VISION_INFERENCE_MODE="server"):
+      remote = model_inference.run_vision_inference_batch(images, columnar=True)
+      status = inference_server.ping()
+    local = model_inference.run_vision_inference_batch(images, columnar=True)
+
+    self.assertEqual([r.to_json() for r in remote], [r.to_json() for r in local])
+    self.assertIn("pid", status)
+
+  def test_unreachable_server_raises(self):
+    with self.assertRaises(inference_server.InferenceServerError):
+      inference_server.ping()
+
+  def test_second_server_does_not_take_over_live_socket(self):
+    self._start_server()
+
+    with self.assertRaisesMessage(inference_server.InferenceServerError, "already running"):
+      inference_server.serve_forever(self.address)
+    self.assertIn("pid", inference_server.ping())
+
+  def test_stale_socket_file_is_replaced(self):
+    open(self.address, "w").close()
+
+    self._start_server()
+    self.assertIn("pid", inference_server.ping())
+
+
+def _jpeg(img, orientation=None):
+  buf = BytesIO()
+  exif = Image.Exif()
+  if orientation:
+    exif[0x0112] = orientation
+  img.save(buf, "JPEG", quality=95, exif=exif.tobytes())
+  return buf.getvalue()
+
+
+def _bright_bbox(arr):
+  # 밝은 사각형의 normalized (x1, y1, x2, y2) -> 탐지 bbox가 orig_shape 기준으로 정규화되는 것과 같은 계산
+  ys, xs = np.nonzero(arr.mean(axis=2) > 128)
+  h, w = arr.shape[:2]
+  return np.array([xs.min() / w, ys.min() / h, (xs.max() + 1) / w, (ys.max() + 1) / h])
+
+
+class DecodeImageTests(SimpleTestCase):
+
+  def setUp(self):
+    self.img = Image.new("RGB", (1600, 1200))
+    self.img.paste((255, 255, 255), (400, 300, 800, 900))
+
+  def _decode(self, data, draft):
+    with override_settings(VISION_DECODE_DRAFT=draft):
+      return image_io.decode_image(data, target_size=320)
+
+  def test_draft_keeps_normalized_bbox(self):
+    data = _jpeg(self.img)
+    full, reduced = self._decode(data, False), self._decode(data, True)
+
+    self.assertEqual(full.shape, (1200, 1600, 3))
+    # 짧은 변이 요청 크기 이상이 되는 가장 작은 배율 (1/2)
+    self.assertEqual(reduced.shape, (600, 800, 3))
+    np.testing.assert_allclose(_bright_bbox(reduced), _bright_bbox(full), atol=2 / 300)
+
+  def test_exif_rotation_applied_with_and_without_draft(self):
+    # orientation 6: 카메라가 90도 돌아간 사진 -> 세로 사진으로 보여야 함
+    data = _jpeg(self.img, orientation=6)
+    expected = _bright_bbox(np.asarray(self.img.transpose(Image.Transpose.ROTATE_270)))
+
+    for draft in (False, True):
+      arr = self._decode(data, draft)
+      self.assertGreater(arr.shape[0], arr.shape[1])
+      np.testing.assert_allclose(_bright_bbox(arr), expected, atol=2 / 300)
+
+  def test_non_jpeg_reduce_keeps_aspect(self):
+    buf = BytesIO()
+    self.img.save(buf, "PNG")
+    arr = self._decode(buf.getvalue(), True)
+
+    self.assertEqual(arr.shape, (400, 534, 3))
+    np.testing.assert_allclose(_bright_bbox(arr), [0.25, 0.25, 0.5, 0.75], atol=2 / 400)
+
+
+@override_settings(VISION_MODEL_PATH="/models/best.pt", VISION_ONNX_MODEL_PATH=None, VISION_OPENVINO_MODEL_PATH=None)
+class BackendSettingsTests(SimpleTestCase):
+
+  def test_defaults(self):
+    with override_settings():
+      from django.conf import settings
+      for name in ("VISION_BACKEND", "VISION_PRECISION"):
+        if hasattr(settings, name):
+          delattr(settings, name)
+      self.assertEqual(backends.get_backend(), "torch")
+      self.assertEqual(backends.get_precision(), "fp32")
+
+  def test_resolution_is_case_insensitive(self):
+    with override_settings(VISION_BACKEND="OpenVINO", VISION_PRECISION="INT8"):
+      self.assertEqual(backends.get_backend(), "openvino")
+      self.assertEqual(backends.get_precision(), "int8")
+
+  def test_invalid_values(self):
+    with override_settings(VISION_BACKEND="tensorrt"):
+      with self.assertRaisesMessage(ValueError, "Invalid VISION_BACKEND: tensorrt"):
+        backends.get_backend()
+    with override_settings(VISION_PRECISION="fp16"):
+      with self.assertRaisesMessage(ValueError, "Invalid VISION_PRECISION: fp16"):
+        backends.get_precision()
+
+  def test_torch_artifact_path(self):
+    self.assertEqual(backends.get_model_artifact_path("torch", "fp32"), Path("/models/best.pt"))
+    with self.assertRaisesMessage(ValueError, "VISION_PRECISION=int8 requires"):
+      backends.get_model_artifact_path("torch", "int8")
+
+  def test_onnx_artifact_path(self):
+    self.assertEqual(backends.get_model_artifact_path("onnxruntime", "fp32"), Path("/models/best.onnx"))
+    self.assertEqual(backends.get_model_artifact_path("onnxruntime", "int8"), Path("/models/best.int8.onnx"))
+
+    with override_settings(VISION_ONNX_MODEL_PATH="/srv/yolo.onnx"):
+      self.assertEqual(backends.get_model_artifact_path("onnxruntime", "fp32"), Path("/srv/yolo.onnx"))
+      self.assertEqual(backends.get_model_artifact_path("onnxruntime", "int8"), Path("/srv/yolo.int8.onnx"))
+
+  def test_openvino_artifact_path(self):
+    self.assertEqual(
+      backends.get_model_artifact_path("openvino", "fp32"), Path("/models/best_openvino_model"),
+    )
+    self.assertEqual(
+      backends.get_model_artifact_path("openvino", "int8"), Path("/models/best_int8_openvino_model"),
+    )
+
+    with override_settings(VISION_OPENVINO_MODEL_PATH="/srv/yolo_openvino_model"):
+      self.assertEqual(
+        backends.get_model_artifact_path("openvino", "int8"), Path("/srv/yolo_int8_openvino_model"),
+      )
+
+  def test_artifact_path_uses_settings(self):
+    with override_settings(VISION_BACKEND="onnxruntime", VISION_PRECISION="int8"):
+      self.assertEqual(backends.get_model_artifact_path(), Path("/models/best.int8.onnx"))
+
+  def test_load_missing_exported_model(self):
+    yolo_cls = mock.Mock()
+    with self.assertRaisesMessage(RuntimeError, "--backend onnxruntime --int8"):
+      backends.load_model(yolo_cls, "onnxruntime", "int8")
+    yolo_cls.assert_not_called()
+
+
+class FurniturePayloadTests(TestCase):
+
+  @classmethod
+  def setUpTestData(cls):
+    cls.sofa = Furniture.objects.create(
+      name_en="sofa_sm", name_kr="소파(소형)", yolo_id=5, category="GENERAL_FURNITURE",
+      width_cm=100, depth_cm=50, height_cm=80,
+    )
+
+  def setUp(self):
+    invalidate_furniture_cache()
+    self.addCleanup(invalidate_furniture_cache)
+
+  def _assert_independent(self, first, second):
+    first["name_kr"] = "변경"
+    first["guide_size_cm"]["width_cm"] = 1
+
+    self.assertEqual(second["name_kr"], "소파(소형)")
+    self.assertEqual(second["guide_size_cm"]["width_cm"], 100)
+
+    payload = yolo_to_furniture.get_furniture_payload(self.sofa)
+    self.assertEqual(payload["name_kr"], "소파(소형)")
+    self.assertEqual(payload["guide_size_cm"]["width_cm"], 100)
+    with self.assertRaises(TypeError):
+      payload["name_kr"] = "변경"
+
+  def test_serialized_rows_do_not_share_payload(self):
+    rows = [
+      VisionDetection(id=i, yolo_id=5, confidence=0.9, bbox_x=0.5, bbox_y=0.5, bbox_w=0.1, bbox_h=0.1)
+      for i in (1, 2)
+    ]
+    first, second = (serialize_detection(vd, self.sofa) for vd in rows)
+
+    self.assertEqual([first["detection_id"], second["detection_id"]], [1, 2])
+    self._assert_independent(first, second)
+
+  def test_packed_dicts_do_not_share_payload(self):
+    data = pack_rows([(5, self.sofa.id, 0.9, (0.5, 0.5, 0.1, 0.1))] * 2)
+    first, second = packed_to_dicts(7, data)
+
+    self.assertEqual([first["detection_id"], second["detection_id"]], [-7 * 65536, -7 * 65536 - 1])
+    self._assert_independent(first, second)
+
+
+def _arrays(boxes):
+  # [(x1, y1, x2, y2, cls, conf), ...] -> result_arrays 형태
+  if not boxes:
+    return np.zeros((0, 4), np.float32), np.zeros((0,), np.int64), np.zeros((0,), np.float32)
+  arr = np.asarray(boxes, dtype=np.float32)
+  return arr[:, :4], arr[:, 4].astype(np.int64), arr[:, 5]
+
+
+class TilingTests(SimpleTestCase):
+
+  cfg = tiling.TileSettings(min_side=1920, tile_size=1280, overlap=0.2, nms_iou=0.5)
+
+  def test_plan_tiles_covers_non_divisible_image(self):
+    img_h, img_w = 1701, 2503
+    rects = tiling.plan_tiles(img_h, img_w, self.cfg)
+
+    covered = np.zeros((img_h, img_w), dtype=bool)
+    for x1, y1, x2, y2 in rects:
+      self.assertTrue(0 <= x1 < x2 <= img_w and 0 <= y1 < y2 <= img_h)
+      # 이미지가 tile보다 크면 모든 tile이 tile_size 그대로 (마지막 tile은 끝에 맞춰 앞으로 당김)
+      self.assertEqual((x2 - x1, y2 - y1), (1280, 1280))
+      covered[y1:y2, x1:x2] = True
+
+    self.assertTrue(covered.all())
+    self.assertEqual(len(rects), 3 * 2)
+
+  def test_plan_tiles_small_axis_uses_single_tile(self):
+    rects = tiling.plan_tiles(900, 2000, self.cfg)
+
+    self.assertEqual([(r[1], r[3]) for r in rects], [(0, 900)] * len(rects))
+    self.assertEqual(rects[-1][2], 2000)
+
+  def test_merge_suppresses_cross_tile_duplicates(self):
+    img_w, img_h = 2400, 1280
+    rects = [(0, 0, 1280, 1280), (1120, 0, 2400, 1280)]
+    # 겹침 영역(1120~1280) 안의 같은 물체가 두 tile에서 모두 탐지됨 (tile 좌표)
+    tile_arrays = [
+      _arrays([(1150, 100, 1250, 200, 3, 0.9)]),
+      _arrays([(30, 102, 131, 201, 3, 0.8), (1, 500, 100, 600, 3, 0.7)]),
+    ]
+
+    xyxy, cls, conf = tiling.merge_tiled(_arrays([]), tile_arrays, rects, img_w, img_h, self.cfg)
+
+    # 중복은 confidence 높은 박스만 남고, 두번째 tile 왼쪽 경계에 잘린 박스는 버림
+    self.assertEqual(cls.tolist(), [3])
+    np.testing.assert_allclose(conf, [0.9])
+    np.testing.assert_allclose(xyxy, [[1150, 100, 1250, 200]])
+
+  def test_merge_suppresses_tile_duplicate_of_full_image_box(self):
+    rects = [(0, 0, 1280, 1280)]
+    full = _arrays([(100, 100, 300, 300, 1, 0.6)])
+    tiles = [_arrays([(101, 99, 301, 300, 1, 0.95)])]
+
+    xyxy, cls, conf = tiling.merge_tiled(full, tiles, rects, 2400, 1280, self.cfg)
+
+    self.assertEqual(len(xyxy), 1)
+    np.testing.assert_allclose(conf, [0.95])
+
+  def test_nms_keeps_overlapping_boxes_of_different_classes(self):
+    xyxy, cls, conf = _arrays([
+      (100, 100, 300, 300, 1, 0.9),
+      (100, 100, 300, 300, 2, 0.8),
+      (105, 105, 300, 300, 1, 0.7),
+    ])
+
+    keep = tiling.nms_per_class(xyxy, cls, conf, 0.5)
+
+    self.assertEqual(keep.tolist(), [0, 1])
+
+  def test_nms_empty(self):
+    self.assertEqual(tiling.nms_per_class(*_arrays([]), 0.5).tolist(), [])
+
+
+def _legacy_detections(xyxy, cls, confs, names, img_w, img_h):
+  # 벡터화 이전 박스별 loop (model_inference._arrays_to_detections)
+  out = []
+  for (x1, y1, x2, y2), c, cf in zip(xyxy.tolist(), cls.tolist(), confs.tolist()):
+    class_id = int(c)
+    w = max(0.0, x2 - x1)
+    h = max(0.0, y2 - y1)
+    out.append({
+      "yolo_id": class_id,
+      "yolo_class": names.get(class_id, str(class_id)),
+      "confidence": float(cf),
+      "bbox": {
+        "x": float((x1 + w / 2) / img_w),
+        "y": float((y1 + h / 2) / img_h),
+        "w": float(w / img_w),
+        "h": float(h / img_h),
+      },
+    })
+  return out
+
+
+class DetectionArraysTests(SimpleTestCase):
+
+  names = {0: "bed", 5: "sofa_sm"}
+
+  def test_from_xyxy_matches_per_box_loop(self):
+    rng = np.random.default_rng(0)
+    xyxy = (rng.random((50, 4)) * [1600, 1200, 1600, 1200]).astype(np.float32)
+    # 뒤집힌 박스(x2 < x1, y2 < y1)는 w/h 0으로 clip
+    xyxy[:3, 2:] = xyxy[:3, :2] - 10
+    cls = rng.integers(0, 8, 50).astype(np.float32)
+    confs = rng.random(50).astype(np.float32)
+
+    arrays = DetectionArrays.from_xyxy(xyxy, cls, confs, self.names, 1600, 1200)
+    expected = _legacy_detections(xyxy, cls, confs, self.names, 1600, 1200)
+
+    got = arrays.to_dicts()
+    fields = lambda dets: [(d["yolo_id"], d["yolo_class"], d["confidence"]) for d in dets]
+    self.assertEqual(fields(got), fields(expected))
+    for g, e in zip(got, expected):
+      for k in ("x", "y", "w", "h"):
+        self.assertAlmostEqual(g["bbox"][k], e["bbox"][k], places=12)
+    self.assertEqual([d["bbox"]["w"] for d in got[:3]], [0.0] * 3)
+    self.assertEqual([d["bbox"]["h"] for d in got[:3]], [0.0] * 3)
+
+  def test_from_xyxy_empty(self):
+    for xyxy, cls, confs in (
+      (np.zeros((0, 4), np.float32), np.zeros((0,), np.float32), np.zeros((0,), np.float32)),
+      ([], [], []),
+    ):
+      arrays = DetectionArrays.from_xyxy(xyxy, cls, confs, self.names, 640, 480)
+      self.assertEqual(len(arrays), 0)
+      self.assertEqual(arrays.bboxes.shape, (0, 4))
+      self.assertEqual(arrays.to_dicts(), _legacy_detections(np.zeros((0, 4)), np.zeros(0), np.zeros(0), self.names, 640, 480))
+      self.assertEqual(len(DetectionArrays.from_json(json.loads(json.dumps(arrays.to_json())))), 0)
+
+  def test_json_round_trip_keeps_missing_bbox(self):
+    arrays = DetectionArrays(
+      yolo_ids=np.array([5, 0], dtype=np.int64),
+      confidences=np.array([0.9, 0.5], dtype=np.float32),
+      bboxes=np.array([[0.5, 0.5, 0.2, 0.1], [np.nan] * 4]),
+      names=self.names,
+    )
+
+    data = json.loads(json.dumps(arrays.to_json()))
+    self.assertEqual(data["bbox"][1], [None] * 4)
+
+    restored = DetectionArrays.from_json(data)
+    self.assertTrue(np.isnan(restored.bboxes[1]).all())
+    self.assertEqual(list(restored.rows()), list(arrays.rows()))
+    self.assertEqual(list(restored.rows())[1][3], (None,) * 4)
+    self.assertEqual(restored.to_dicts()[0]["yolo_class"], "sofa_sm")
+
+
+class MicroBatchSchedulerTests(SimpleTestCase):
+
+  def setUp(self):
+    self.calls = []
+
+  def _runner(self, sources):
+    self.calls.append(list(sources))
+    return [f"r:{s}" for s in sources]
+
+  def test_flushes_single_request_at_deadline(self):
+    scheduler = batch_scheduler.MicroBatchScheduler(self._runner, max_batch=8, max_wait_ms=50)
+
+    start = time.monotonic()
+    result = scheduler.infer(["a"])
+    elapsed = time.monotonic() - start
+
+    self.assertEqual(result, ["r:a"])
+    self.assertEqual(self.calls, [["a"]])
+    self.assertGreaterEqual(elapsed, 0.045)
+
+  def test_splits_at_max_batch_without_splitting_requests(self):
+    scheduler = batch_scheduler.MicroBatchScheduler(self._runner, max_batch=4, max_wait_ms=300)
+
+    futures = [scheduler.submit(sources) for sources in (["a1", "a2"], ["b1"], ["c1", "c2"])]
+    results = [f.result(timeout=5) for f in futures]
+
+    # a+b(3장)는 max_batch 전에 모였다가 c가 들어오며 flush, c는 다음 batch
+    self.assertEqual(self.calls, [["a1", "a2", "b1"], ["c1", "c2"]])
+    self.assertEqual(results, [["r:a1", "r:a2"], ["r:b1"], ["r:c1", "r:c2"]])
+
+    # max_batch보다 큰 요청은 나누지 않고 단독 처리
+    self.assertEqual(scheduler.infer([f"d{i}" for i in range(6)]), [f"r:d{i}" for i in range(6)])
+    self.assertEqual(self.calls[-1], [f"d{i}" for i in range(6)])
+
+  def test_empty_request_skips_runner(self):
+    scheduler = batch_scheduler.MicroBatchScheduler(self._runner, max_batch=4, max_wait_ms=10)
+
+    self.assertEqual(scheduler.infer([]), [])
+    self.assertEqual(self.calls, [])
+
+  def _assert_all_fail(self, runner, exc_type, message):
+    scheduler = batch_scheduler.MicroBatchScheduler(runner, max_batch=2, max_wait_ms=1000)
+
+    with self.assertLogs("vision.services.batch_scheduler", "ERROR"):
+      futures = [scheduler.submit(["a"]), scheduler.submit(["b"])]
+      for f in futures:
+        with self.assertRaisesMessage(exc_type, message):
+          f.result(timeout=5)
+
+    # 실패 후에도 worker 스레드는 다음 batch를 위해 살아 있음
+    self.assertTrue(scheduler._thread.is_alive())
+
+  def test_runner_exception_reaches_every_request(self):
+    def runner(sources):
+      raise ValueError("model exploded")
+
+    self._assert_all_fail(runner, ValueError, "model exploded")
+
+  def test_result_count_mismatch_reaches_every_request(self):
+    self._assert_all_fail(lambda sources: sources[:1], RuntimeError, "result count mismatch")
+
+
+class MetricsTests(SimpleTestCase):
+
+  def _registry(self):
+    registry = metrics.Registry()
+    requests = registry.counter("vision_requests_total", "요청 수", labelnames=("result",))
+    latency = registry.histogram("vision_latency_seconds", "latency", labelnames=("backend",), buckets=(0.1, 1.0))
+    return registry, requests, latency
+
+  @override_settings(METRICS_MULTIPROC_DIR=None)
+  def test_render_counter_and_histogram(self):
+    registry, requests, latency = self._registry()
+    requests.inc(result="ok")
+    requests.inc(2, result='bad "q"')
+    for value in (0.05, 0.5, 3.0):
+      latency.observe(value, backend="torch")
+
+    lines = registry.render().splitlines()
+
+    self.assertIn("# TYPE vision_requests_total counter", lines)
+    self.assertIn('vision_requests_total{result="ok"} 1', lines)
+    self.assertIn('vision_requests_total{result="bad \\"q\\""} 2', lines)
+    self.assertIn("# TYPE vision_latency_seconds histogram", lines)
+    # bucket은 누적 개수
+    self.assertIn('vision_latency_seconds_bucket{backend="torch",le="0.1"} 1', lines)
+    self.assertIn('vision_latency_seconds_bucket{backend="torch",le="1"} 2', lines)
+    self.assertIn('vision_latency_seconds_bucket{backend="torch",le="+Inf"} 3', lines)
+    self.assertIn('vision_latency_seconds_sum{backend="torch"} 3.55', lines)
+    self.assertIn('vision_latency_seconds_count{backend="torch"} 3', lines)
+
+  def test_multiprocess_files_are_merged(self):
+    directory = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+
+    # 다른 worker가 저장한 파일
+    other, other_requests, other_latency = self._registry()
+    other_requests.inc(3, result="ok")
+    other_requests.inc(result="error")
+    other_latency.observe(0.5, backend="torch")
+    Path(directory, "metrics_1.json").write_text(json.dumps(other.snapshot()), encoding="utf-8")
+    Path(directory, "metrics_2.json").write_text("{broken", encoding="utf-8")
+
+    with override_settings(METRICS_MULTIPROC_DIR=directory, METRICS_FLUSH_INTERVAL=3600):
+      registry, requests, latency = self._registry()
+      requests.inc(result="ok")
+      latency.observe(0.05, backend="torch")
+      lines = registry.render().splitlines()
+
+    self.assertIn('vision_requests_total{result="ok"} 4', lines)
+    self.assertIn('vision_requests_total{result="error"} 1', lines)
+    self.assertIn('vision_latency_seconds_bucket{backend="torch",le="0.1"} 1', lines)
+    self.assertIn('vision_latency_seconds_bucket{backend="torch",le="+Inf"} 2', lines)
+    self.assertIn('vision_latency_seconds_count{backend="torch"} 2', lines)
+    # 자기 프로세스 값도 파일로 저장됨
+    self.assertTrue(Path(directory, f"metrics_{os.getpid()}.json").exists())
+
+  @override_settings(METRICS_TOKEN="s3cret", METRICS_ALLOWED_IPS=["10.0.0.5"])
+  def test_view_requires_token_ip_or_staff(self):
+    factory = RequestFactory()
+
+    def status(user=None, **extra):
+      request = factory.get("/metrics/", **extra)
+      if user is not None:
+        request.user = user
+      return metrics.metrics_view(request).status_code
+
+    self.assertEqual(status(), 403)
+    self.assertEqual(status(HTTP_AUTHORIZATION="Bearer wrong"), 403)
+    self.assertEqual(status(HTTP_AUTHORIZATION="Bearer s3cret"), 200)
+    self.assertEqual(status(REMOTE_ADDR="10.0.0.5"), 200)
+    self.assertEqual(status(user=mock.Mock(is_active=True, is_staff=False)), 403)
+    self.assertEqual(status(user=mock.Mock(is_active=True, is_staff=True)), 200)
+
+  def test_route_denies_anonymous_by_default(self):
+    response = self.client.get("/metrics/")
+
+    self.assertEqual(response.status_code, 403)
+
+
+class _RemoteFile(BytesIO):
+
+  def __init__(self, data):
+    super().__init__(data)
+    self.read_sizes = []
+
+  def read(self, size=-1):
+    self.read_sizes.append(size)
+    return super().read(size)
+
+
+class _RemoteFieldFile:
+  # S3 등 path를 지원하지 않는 스토리지의 FieldFile
+  name = "vision/room.png"
+
+  def __init__(self, data):
+    self.file = _RemoteFile(data)
+    self.opened = 0
+
+  @property
+  def path(self):
+    raise NotImplementedError
+
+  def open(self, mode="rb"):
+    self.opened += 1
+    self.file.seek(0)
+    return self.file
+
+
+@override_settings(VISION_INFER_CHUNK_SIZE=4096, VISION_INFER_SPOOL_MAX_BYTES=10000)
+@mock.patch("vision.services.file_path_utils.decode_image", side_effect=lambda data: ("decoded", data))
+class GetInferPathTests(SimpleTestCase):
+
+  def test_small_remote_file_is_decoded_in_memory(self, decode):
+    data = bytes(range(256)) * 35
+    fieldfile = _RemoteFieldFile(data)
+
+    with mock.patch("tempfile.NamedTemporaryFile") as tmp:
+      with file_path_utils.get_infer_path(fieldfile) as source:
+        self.assertEqual(source, ("decoded", data))
+
+    tmp.assert_not_called()
+    self.assertEqual(set(fieldfile.file.read_sizes), {4096})
+
+  def test_large_remote_file_is_spooled_to_temp_file(self, decode):
+    data = bytes(range(256)) * 200
+    fieldfile = _RemoteFieldFile(data)
+
+    with file_path_utils.get_infer_path(fieldfile) as source:
+      self.assertTrue(source.endswith(".png"))
+      self.assertEqual(Path(source).read_bytes(), data)
+
+    self.assertFalse(Path(source).exists())
+    decode.assert_not_called()
+    # 한 번에 전체를 읽지 않고 chunk 단위로만 읽음
+    self.assertNotIn(-1, fieldfile.file.read_sizes)
+    self.assertLessEqual(max(fieldfile.file.read_sizes), 4096)
+
+  def test_temp_file_removed_on_error(self, decode):
+    fieldfile = _RemoteFieldFile(b"x" * 50000)
+
+    with self.assertRaises(RuntimeError):
+      with file_path_utils.get_infer_path(fieldfile) as source:
+        raise RuntimeError("inference failed")
+
+    self.assertFalse(Path(source).exists())
+
+  def test_upload_bytes_skip_storage(self, decode):
+    fieldfile = _RemoteFieldFile(b"stored")
+
+    with file_path_utils.get_infer_path(fieldfile, upload=b"uploaded") as source:
+      self.assertEqual(source, ("decoded", b"uploaded"))
+
+    upload = SimpleUploadedFile("room.jpg", b"in-memory")
+    upload.read()
+    with file_path_utils.get_infer_path(fieldfile, upload=upload) as source:
+      self.assertEqual(source, ("decoded", b"in-memory"))
+
+    self.assertEqual(fieldfile.opened, 0)
+
+  def test_temporary_upload_uses_its_path(self, decode):
+    fieldfile = _RemoteFieldFile(b"stored")
+    upload = TemporaryUploadedFile("room.jpg", "image/jpeg", 5, None)
+    self.addCleanup(upload.close)
+
+    with file_path_utils.get_infer_path(fieldfile, upload=upload) as source:
+      self.assertEqual(source, upload.temporary_file_path())
+
+    self.assertEqual(fieldfile.opened, 0)
+    decode.assert_not_called()
+
+
+@override_settings(
+  VISION_STORE_NORMALIZE=True,
+  VISION_STORE_FORMAT="WEBP",
+  VISION_STORE_MAX_SIDE=2048,
+  VISION_THUMBNAIL_SIZE=320,
+)
+class NormalizeImageTests(SimpleTestCase):
+
+  def _open(self, data):
+    img = Image.open(BytesIO(data))
+    img.load()
+    return img
+
+  def test_exif_rotation_applied_and_stripped(self):
+    img = Image.new("RGB", (1600, 1200))
+    img.paste((255, 255, 255), (0, 0, 400, 300))
+
+    out = ingest.normalize_image(_jpeg(img, orientation=6), "room.jpg")
+
+    stored = self._open(out.data)
+    self.assertEqual(stored.format, "WEBP")
+    self.assertEqual(stored.size, (1200, 1600))
+    self.assertNotIn(0x0112, stored.getexif())
+    # 왼쪽 위 흰 사각형 -> 90도 회전 후 오른쪽 위
+    arr = np.asarray(stored.convert("RGB"))
+    self.assertGreater(arr[:400, -300:].mean(), 200)
+    self.assertLess(arr[:400, :300].mean(), 50)
+
+  @override_settings(VISION_STORE_MAX_SIDE=1000)
+  def test_resizes_to_max_side(self):
+    out = ingest.normalize_image(_jpeg(Image.new("RGB", (3000, 1500))), "big.jpeg")
+
+    self.assertEqual(out.file_name, "big.webp")
+    self.assertEqual(self._open(out.data).size, (1000, 500))
+
+  @override_settings(VISION_STORE_MAX_SIDE=1000)
+  def test_small_image_not_upscaled(self):
+    buf = BytesIO()
+    Image.new("RGB", (400, 300)).save(buf, "PNG")
+
+    out = ingest.normalize_image(buf.getvalue(), "small.png")
+
+    self.assertEqual(self._open(out.data).size, (400, 300))
+
+  def test_thumbnail(self):
+    out = ingest.normalize_image(_jpeg(Image.new("RGB", (1600, 800))), "room.jpg")
+
+    self.assertEqual(out.thumbnail_name, "room_thumb.webp")
+    thumb = self._open(out.thumbnail)
+    self.assertEqual(thumb.format, "WEBP")
+    self.assertEqual(thumb.size, (320, 160))
+
+    with override_settings(VISION_THUMBNAIL_SIZE=0, VISION_STORE_FORMAT="jpg"):
+      out = ingest.normalize_image(_jpeg(Image.new("RGB", (1600, 800))), "room.jpg")
+    self.assertEqual((out.thumbnail, out.thumbnail_name), (None, None))
+    self.assertEqual(out.file_name, "room.jpg")
+    self.assertEqual(self._open(out.data).format, "JPEG")
+
+  def test_undecodable_file_kept_as_is(self):
+    with self.assertLogs("vision.services.ingest", "WARNING"):
+      out = ingest.normalize_image(b"not an image", "room.heic")
+
+    self.assertEqual(out, ingest.NormalizedImage(data=b"not an image", file_name="room.heic"))
+
+  @override_settings(VISION_STORE_NORMALIZE=False)
+  def test_disabled(self):
+    data = _jpeg(Image.new("RGB", (3000, 1500)))
+
+    self.assertEqual(ingest.normalize_image(data, "room.jpg"), ingest.NormalizedImage(data=data, file_name="room.jpg"))
+
+
+class FusionRulesTests(SimpleTestCase):
+
+  @override_settings(VISION_FUSION_RULES={"chair": "sum"}, VISION_FUSION_DEFAULT_RULE="max")
+  def test_valid_rules(self):
+    self.assertEqual(fusion.get_rules(), ({"chair": "sum"}, "max"))
+
+  def test_invalid_rules_are_configuration_errors(self):
+    for overrides in (
+      {"VISION_FUSION_RULES": {"chair": "avg"}},
+      {"VISION_FUSION_RULES": ["chair"]},
+      {"VISION_FUSION_DEFAULT_RULE": "min"},
+    ):
+      with self.subTest(**overrides), override_settings(**overrides):
+        with self.assertRaises(ImproperlyConfigured):
+          fusion.get_rules()
+
+  @override_settings(VISION_FUSION_RULES={"chair": "avg"}, VISION_WARMUP=False)
+  def test_checked_at_startup(self):
+    with self.assertRaisesMessage(ImproperlyConfigured, "chair"):
+      apps.get_app_config("vision").ready()
+
+    with override_settings(VISION_FUSION_ENABLED=False):
+      apps.get_app_config("vision").ready()
+
+  @override_settings(VISION_FUSION_RULES={"chair": "avg"})
+  def test_upload_with_bad_rules_is_not_a_client_error(self):
+    results = [{"room_type": "LIVING", "vision_image_id": 1, "detections": []}]
+
+    with self.assertRaises(ImproperlyConfigured):
+      fusion.fuse_rooms(results, ["g"])
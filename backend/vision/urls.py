@@ -1,6 +1,14 @@
 from django.urls import path
-from .views import VisionUploadAPIView
+from .views import (
+  VisionUploadAPIView,
+  VisionUploadJobAPIView,
+  VisionDetectionCacheStatsAPIView,
+  VisionReadinessAPIView,
+)
 
 urlpatterns = [
-  path("", VisionUploadAPIView.as_view()),
+  path("", VisionUploadAPIView.as_view(), name="vision-upload"),
+  path("jobs/<uuid:job_id>/", VisionUploadJobAPIView.as_view(), name="vision-upload-job"),
+  path("cache-stats/", VisionDetectionCacheStatsAPIView.as_view(), name="vision-cache-stats"),
+  path("ready/", VisionReadinessAPIView.as_view(), name="vision-ready"),
 ]
@@ -1,5 +1,9 @@
 import json
 
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
@@ -8,7 +12,36 @@ from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from vision.services.pipeline import process_rooms_upload
+from vision.models import VisionUploadJob
+from vision.services.pipeline import process_rooms_upload, enqueue_rooms_upload, load_job_results
+from vision.services.detection_cache import get_cache_stats
+from vision.services.inference_server import InferenceServerError, is_server_mode, ping
+from vision.services.model_inference import get_model_status
+from vision.services import timing
+
+
+def _is_async_request(request) -> bool:
+  """
+  form-data async=true 이면 비동기 처리 (없으면 settings.VISION_UPLOAD_ASYNC 기본값)
+  """
+  raw = request.data.get("async")
+  if raw is None:
+    return bool(getattr(settings, "VISION_UPLOAD_ASYNC", False))
+  return str(raw).strip().lower() in ("true", "t", "1", "y", "yes")
+
+
+def _serialize_job(job: VisionUploadJob) -> dict:
+  done = job.status == VisionUploadJob.Status.DONE
+  return {
+    "job_id": str(job.job_id),
+    "status": job.status,
+    "rooms_total": job.rooms_total,
+    "rooms_done": job.rooms_done,
+    "rooms": job.rooms,
+    "results": load_job_results(job) if done else None,
+    "fused_rooms": (job.result or {}).get("fused_rooms") if done else None,
+    "error": job.error or None,
+  }
 
 
 
@@ -24,16 +57,33 @@ class VisionUploadAPIView(APIView):
       "JSON 문자열"
       "\n예시: [{\"room_type\":\"LIVING\",\"file_index\":0,\"sort_order\":1}]"
       "\nfile_index는 form-data files의 배열 인덱스 (0부터)"
+      "\n같은 방을 여러 장 찍었으면 같은 group 값 지정 -> fused_rooms에 방 단위로 합친 결과 (선택)"
+      "\nfiles에는 사진 대신 방 하나를 찍은 짧은 영상(mp4, mov 등)도 가능 -> keyframe을 뽑아 하나의 결과로 합침"
+    ),
+  )
+
+  async_param = openapi.Parameter(
+    name="async",
+    in_=openapi.IN_FORM,
+    type=openapi.TYPE_BOOLEAN,
+    required=False,
+    description=(
+      "true면 이미지 저장 후 바로 job_id 반환 (202)"
+      "\n추론 결과는 GET /api/vision/jobs/{job_id}/ 로 조회"
     ),
   )
 
   @swagger_auto_schema(
     tags=["Vision"],
-    manual_parameters=[rooms_param],
+    manual_parameters=[rooms_param, async_param],
     consumes=["multipart/form-data"],
     responses={
       201: openapi.Response(
-        description="업로드 결과",
+        description=(
+          "업로드 결과"
+          "\ndetection_id: 항상 정수. VISION_DETECTION_STORAGE=rows(기본)면 VisionDetection id (양수),"
+          " packed면 -(vision_image_id * 65536 + 박스 순번) (음수, VisionDetection id와 겹치지 않음)"
+        ),
         examples={
           "application/json": {
             "results": [
@@ -41,6 +91,7 @@ class VisionUploadAPIView(APIView):
                 "vision_image_id": 1,
                 "room_type": "LIVING",
                 "image_url": "https://...",
+                "thumbnail_url": "https://...",
                 "detections": [
                   {
                     "detection_id": 1001,
@@ -55,16 +106,54 @@ class VisionUploadAPIView(APIView):
                   }
                 ]
               }
+            ],
+            "fused_rooms": [
+              {
+                "room_type": "LIVING",
+                "group": "living-1",
+                "vision_image_ids": [1, 2],
+                "detections": [
+                  {
+                    "detection_id": 1001,
+                    "vision_image_id": 1,
+                    "source_detection_ids": [1001, 1007],
+                    "furniture_id": 5,
+                    "name_en": "sofa_sm",
+                    "confidence": 0.92,
+                  }
+                ]
+              }
             ]
           }
         },
-      )
+      ),
+      202: openapi.Response(
+        description="비동기 업로드 접수",
+        examples={
+          "application/json": {
+            "job_id": "0b7c5a1e-...",
+            "status": "PENDING",
+            "status_url": "https://.../api/vision/jobs/0b7c5a1e-.../",
+          }
+        },
+      ),
     },
   )
   
   def post(self, request):
+    # 단계별 소요 시간 -> Server-Timing 헤더 + vision.timing 로그 (services/timing.py)
+    with timing.track("vision_upload", path=request.path) as timer:
+      response = self._post(request)
+      timer.context["status"] = response.status_code
+    return timing.apply_server_timing(response, timer)
+
+  def _post(self, request):
+    # multipart 파싱은 request.data/FILES 첫 접근 시점에 일어남
+    with timing.stage("parse"):
+      rooms_raw = request.data.get("rooms")
+      files = request.FILES.getlist("files")
+
     # json rooms 파싱
-    rooms_raw = request.data.get("rooms")
     if not rooms_raw:
       return Response({"detail": "rooms is required"}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -75,11 +164,30 @@ class VisionUploadAPIView(APIView):
     except Exception:
       return Response({"detail": "rooms must be a JSON list string"}, status=status.HTTP_400_BAD_REQUEST)
     
-    # files 파싱
-    files = request.FILES.getlist("files")
+    # files 확인
     if not files:
       return Response({"detail": "files is required"}, status=status.HTTP_400_BAD_REQUEST)
 
+    # 비동기: 이미지 저장 + job 등록까지만 하고 바로 응답
+    if _is_async_request(request):
+      try:
+        job = enqueue_rooms_upload(
+          request = request,
+          rooms = rooms,
+          files = files
+        )
+      except ValueError as e :
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+      return Response(
+        {
+          "job_id": str(job.job_id),
+          "status": job.status,
+          "status_url": request.build_absolute_uri(reverse("vision-upload-job", kwargs={"job_id": job.job_id})),
+        },
+        status=status.HTTP_202_ACCEPTED,
+      )
+
     # 서비스 로직 호출
     try:
       payload = process_rooms_upload(
@@ -90,4 +198,106 @@ class VisionUploadAPIView(APIView):
     except ValueError as e :
       return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    return Response(payload, status=status.HTTP_201_CREATED)
\ No newline at end of file
+    return Response(payload, status=status.HTTP_201_CREATED)
+
+
+
+class VisionUploadJobAPIView(APIView):
+
+  @swagger_auto_schema(
+    tags=["Vision"],
+    responses={
+      200: openapi.Response(
+        description="비동기 업로드 진행 상황 (status=DONE이면 results 포함, 형태와 detection_id는 업로드 201 응답과 동일)",
+        examples={
+          "application/json": {
+            "job_id": "0b7c5a1e-...",
+            "status": "RUNNING",
+            "rooms_total": 2,
+            "rooms_done": 1,
+            "rooms": [
+              {"vision_image_id": 1, "room_type": "LIVING", "image_url": "https://...", "thumbnail_url": "https://...", "status": "DONE", "detections_count": 3},
+              {"vision_image_id": 2, "room_type": "KITCHEN", "image_url": "https://...", "thumbnail_url": "https://...", "status": "PENDING"}
+            ],
+            "results": None,
+            "error": None
+          }
+        },
+      )
+    },
+  )
+
+  def get(self, request, job_id):
+    job = get_object_or_404(VisionUploadJob, job_id=job_id)
+    return Response(_serialize_job(job), status=status.HTTP_200_OK)
+
+
+
+
+class VisionDetectionCacheStatsAPIView(APIView):
+
+  @swagger_auto_schema(
+    tags=["Vision"],
+    responses={
+      200: openapi.Response(
+        description="탐지 결과 캐시 hit/miss 카운터",
+        examples={
+          "application/json": {
+            "enabled": True,
+            "model_version": "best.pt:6250000:1769500000",
+            "process": {"hits": 12, "misses": 30, "hit_ratio": 0.2857},
+            "shared": {"hits": 40, "misses": 95, "hit_ratio": 0.2963}
+          }
+        },
+      )
+    },
+  )
+
+  def get(self, request):
+    return Response(get_cache_stats(), status=status.HTTP_200_OK)
+
+
+
+
+class VisionReadinessAPIView(APIView):
+
+  @swagger_auto_schema(
+    tags=["Vision"],
+    responses={
+      200: openapi.Response(
+        description="모델 warm-up 완료 (VISION_WARMUP=False인 local 모드는 첫 요청에서 로딩하므로 항상 ready)",
+        examples={
+          "application/json": {
+            "ready": True,
+            "mode": "local",
+            "warmup": True,
+            "model": {"warm": True, "warming": False, "duration_ms": 2310.5, "warmed_at": "2026-10-18T10:00:00+09:00", "error": None}
+          }
+        },
+      ),
+      503: openapi.Response(description="warm-up 완료 전 또는 추론 서버 연결 실패"),
+    },
+  )
+
+  def get(self, request):
+    if is_server_mode():
+      try:
+        model = ping()
+      except InferenceServerError as e:
+        return Response(
+          {"ready": False, "mode": "server", "warmup": True, "model": None, "detail": str(e)},
+          status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+      mode = "server"
+      warmup = True
+    else:
+      model = get_model_status()
+      mode = "local"
+      # warm-up을 끈 경우 모델은 첫 요청에서 로딩 -> warm을 기다리면 트래픽이 오지 않아 계속 503
+      warmup = bool(getattr(settings, "VISION_WARMUP", False))
+
+    ready = bool(model.get("warm")) or not warmup
+    return Response(
+      {"ready": ready, "mode": mode, "warmup": warmup, "model": model},
+      status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )